@@ -1,13 +1,34 @@
-from typing import List, Optional, Tuple, Dict, Any
+from typing import List, Optional, Tuple, Dict, Any, Callable
 import random
 import math
 from squad import Squad
 from unit import Unit
-from utils.constants import UnitType, SCREEN_SIZE, CELL_SIZE, GRID_SIZE
+from systems.pathfinding import Pathfinder
+from systems.influence import InfluenceMap
+from systems.occupancy import OccupancyGrid
+from systems.visibility import VisibilityMap
+from systems.history import UndoHistory
+from systems.combat import resolve_attack
+from systems.combat_model import CombatModel, CombatForecast
+from systems.factory import create_units
+from systems.worldgen import WorldGenerator
+from systems.turns import TurnPipeline
+from systems.battles import BattleResolver
+from systems.statistics import StatisticsService
+from systems.unit_index import UnitIndex
+from utils.constants import (
+    UnitType, SCREEN_SIZE, CELL_SIZE, GRID_SIZE, TERRAIN_TYPES, DEFAULT_TERRAIN, FLOW_FIELD_MIN_SQUADS,
+    TURN_REPORT_THRESHOLD
+)
 
 class GameState:
     def __init__(self, save_data: dict = None):
         self.player_pos = [GRID_SIZE // 2, GRID_SIZE // 2]  # Starting at center
+        self.width = GRID_SIZE
+        self.height = GRID_SIZE
+        # Terrain of each cell, as terrain[y][x] (cells share the TERRAIN_TYPES dicts)
+        self.terrain = [[TERRAIN_TYPES[DEFAULT_TERRAIN]] * self.width for _ in range(self.height)]
+        self.world: Optional[dict] = None  # Settings of a generated world, to regenerate its terrain
         self.player_color = (255, 0, 0)  # Red
         self.menu_open = False
         self.selected_option = 0
@@ -16,11 +37,25 @@ class GameState:
         self.current_turn = 1
         self.highlighted_tiles: set[tuple[int, int]] = set()  # Tiles that can be moved to
         self.combat_log: list[str] = []  # Combat log messages
+        self.listeners: List[Callable[[str, Squad], None]] = []  # Squad change observers
+        self.occupancy = OccupancyGrid(self)
+        self.pathfinder = Pathfinder(self)
+        self.influence = InfluenceMap(self)
+        self.visibility = VisibilityMap(self)
+        self.history = UndoHistory(self)
+        self.combat_model = CombatModel()
+        self.turns = TurnPipeline(self)
+        self.battle_resolver = BattleResolver()
+        self.statistics = StatisticsService(self)
+        self.unit_index = UnitIndex(self)
+        self.pending_battles: List[Tuple[Squad, Squad]] = []  # Resolved by the turn pipeline's combat phase
+        self.promotion_ready: List[Tuple[Squad, Unit]] = []    # Filled by its promotion phase
         
         if save_data:
             self.load_game(save_data)
         else:
             self.initialize_game()
+        self.history.reset()
     
     def initialize_game(self):
         """Initialize the game with starting squads."""
@@ -30,9 +65,10 @@ class GameState:
             radius = min(GRID_SIZE, GRID_SIZE) // 3
             
             # Create 3 starting squads
+            extra_units = []  # (squad, unit type, level), rolled together below
             for i in range(3):
                 # Calculate position in a circle
-                angle = (2 * 3.14159 * i) / 3  # 0, 120, 240 degrees
+                angle = (2 * math.pi * i) / 3  # 0, 120, 240 degrees
                 x = int(center_x + radius * math.cos(angle))
                 y = int(center_y + radius * math.sin(angle))
                 
@@ -53,22 +89,60 @@ class GameState:
                         UnitType.APPRENTICE, 
                         UnitType.SCOUT
                     ])
-                    squad.add_unit(Unit(unit_type, random.randint(1, 3)))
+                    extra_units.append((squad, unit_type, random.randint(1, 3)))
+            
+            units = create_units([unit_type for _, unit_type, _ in extra_units],
+                                 [level for _, _, level in extra_units])
+            for (squad, _, _), unit in zip(extra_units, units):
+                squad.add_unit(unit)
             
             # Select the first squad by default
             if self.squads:
                 self.selected_squad = self.squads[0]
                 self.selected_squad.selected = True
     
+    def generate_world(self, width: int, height: int, squads: int, factions: int, seed: int = 0,
+                       spacing: float = 6.0):
+        """
+        Replace the map with a generated world of the given size, seeded with seed.
+        The terrain is noise-based and the squads are split into factions and spaced
+        at least `spacing` cells apart (see WorldGenerator).
+        """
+        generator = WorldGenerator(width, height, seed)
+        indices, self.squads = generator.generate(squads, factions, spacing)
+        self.world = {'width': width, 'height': height, 'seed': seed}
+        self._set_terrain(indices)
+        self.selected_squad = self.squads[0] if self.squads else None
+        if self.selected_squad:
+            self.selected_squad.selected = True
+        self.player_pos = [width // 2, height // 2]
+        self.highlighted_tiles.clear()
+        self.history.reset()
+
+    def _set_terrain(self, indices) -> None:
+        """Install terrain indices (see WorldGenerator) as the map, resizing it to match."""
+        self.height, self.width = indices.shape
+        self.terrain = WorldGenerator.terrain_cells(indices)
+        self.pathfinder.invalidate_terrain()  # Occupancy rebuilds lazily for the new size
+
+    def _load_world(self, world: Optional[dict]) -> None:
+        """Regenerate the terrain of a saved generated world (squads are loaded separately)."""
+        self.world = world
+        if world:
+            generator = WorldGenerator(world['width'], world['height'], world['seed'])
+            self._set_terrain(generator.terrain_indices())
+    
     def load_game(self, save_data: dict):
         """Load game state from a dictionary."""
         self.player_pos = save_data.get('player_pos', [GRID_SIZE // 2, GRID_SIZE // 2])
         self.player_color = tuple(save_data.get('player_color', (255, 0, 0)))
         self.current_turn = save_data.get('current_turn', 1)
         self.combat_log = save_data.get('combat_log', [])
+        self._load_world(save_data.get('world'))
         
         # Clear existing squads
         self.squads = []
+        self.pending_battles = []
         
         # Rebuild squads from save data
         for squad_data in save_data.get('squads', []):
@@ -76,13 +150,16 @@ class GameState:
                 x=squad_data['x'],
                 y=squad_data['y'],
                 color=tuple(squad_data['color']),
-                name=squad_data['name']
+                name=squad_data['name'],
+                id=squad_data.get('id')
             )
             
             # Restore squad state
             squad.selected = squad_data.get('selected', False)
             squad.has_acted = squad_data.get('has_acted', False)
             squad.formation = squad_data.get('formation', squad._get_default_formation())
+            destination = squad_data.get('destination')
+            squad.destination = tuple(destination) if destination else None
             
             # Add units to squad
             for unit_data in squad_data.get('units', []):
@@ -95,6 +172,8 @@ class GameState:
         selected_squad_index = save_data.get('selected_squad_index', -1)
         if 0 <= selected_squad_index < len(self.squads):
             self.selected_squad = self.squads[selected_squad_index]
+        
+        self.history.reset()
     
     def create_random_squad(self, x: int, y: int, name: str = None) -> Squad:
         """
@@ -126,21 +205,85 @@ class GameState:
         num_units = random.randint(1, 3)
         starting_classes = [UnitType.RECRUIT, UnitType.APPRENTICE, UnitType.SCOUT]
         
-        for _ in range(num_units):
-            unit_type = random.choice(starting_classes)
-            level = 1  # Start at level 1
-            squad.add_unit(Unit(unit_type, level))
+        unit_types = [random.choice(starting_classes) for _ in range(num_units)]
+        for unit in create_units(unit_types, 1):  # Start at level 1
+            squad.add_unit(unit)
         
         return squad
     
     def end_turn(self):
-        """End the current turn and reset squad actions for the next turn."""
-        self.current_turn += 1
-        print(f"\n=== TURN {self.current_turn} ===")
-        
-        # Reset squad actions
+        """End the current turn by running the turn pipeline (see TurnPipeline)."""
+        return self._report_turn(self.turns.run())
+
+    async def end_turn_async(self):
+        """end_turn for an asyncio event loop, which keeps running meanwhile (see TurnPipeline.run_async)."""
+        return self._report_turn(await self.turns.run_async())
+
+    def _report_turn(self, report):
+        if report.total >= TURN_REPORT_THRESHOLD:
+            print(report.format())
+        return report
+
+    def queue_attack(self, attacker: Squad, defender: Squad) -> bool:
+        """Declare an attack, resolved with the other queued battles when the turn ends."""
+        if attacker.has_acted or not attacker.is_alive() or not defender.is_alive():
+            return False
+        self.pending_battles.append((attacker, defender))
+        attacker.has_acted = True
+        self.notify('changed', attacker)
+        return True
+            
+    def order_move(self, squad: Squad, destination: Tuple[int, int]) -> bool:
+        """
+        Order a squad to march to a (possibly distant) destination over the next turns.
+        Returns False (and leaves the order unchanged) if no route exists.
+        """
+        if self.pathfinder.find_path(squad, destination) is None:
+            return False
+        squad.destination = tuple(destination)
+        self.notify('changed', squad)
+        return True
+    
+    def advance_orders(self):
+        """
+        Move every squad with a destination along its route, as far as its move range allows.
+        Squads sharing a destination follow one shared flow field, others use their own A* route.
+        """
+        groups: Dict[Tuple[int, int], List[Squad]] = {}
         for squad in self.squads:
-            squad.has_acted = False
+            if squad.destination is not None and squad.is_alive():
+                groups.setdefault(squad.destination, []).append(squad)
+        
+        for destination, squads in groups.items():
+            use_field = len(squads) >= FLOW_FIELD_MIN_SQUADS
+            for squad in squads:
+                if use_field:
+                    path = self.pathfinder.get_field_path(squad)
+                else:
+                    path = self.pathfinder.find_path(squad, destination) or []
+                if self.pathfinder.advance_squad(squad, path, squad.get_effective_move_range()):
+                    self.notify('moved', squad)
+                if (squad.x, squad.y) == destination:
+                    squad.destination = None
+    
+    def add_listener(self, callback: Callable[[str, Squad], None]) -> None:
+        """
+        Register a callback that is invoked as callback(event, squad) whenever a squad changes.
+        
+        Events are 'added', 'moved', 'changed' (HP, units or stats) and 'removed'.
+        """
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+    
+    def remove_listener(self, callback: Callable[[str, Squad], None]) -> None:
+        """Unregister a previously added squad change callback."""
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+    
+    def notify(self, event: str, squad: Squad) -> None:
+        """Tell all listeners that a squad has changed."""
+        for callback in list(self.listeners):
+            callback(event, squad)
             
     def get_squad_at(self, x: int, y: int) -> Optional[Squad]:
         """Get the squad at the given position, if any."""
@@ -240,73 +383,33 @@ class GameState:
                 self.highlighted_tiles.clear()
                 return True
             return False  # Can't move to ally square
+        
+        # The whole formation, not just the leader's cell, must fit at the destination
+        if not self.occupancy.fits(squad, new_x, new_y):
+            return False
             
         # Move the squad
         squad.x = new_x
         squad.y = new_y
         squad.has_acted = True
         self.highlighted_tiles.clear()
+        self.notify('moved', squad)
         return True
     
     def start_combat(self, attacker: Squad, defender: Squad):
         """Start combat between two squads with detailed unit-by-unit resolution."""
-        self.combat_log.append(f"Combat: {attacker} vs {defender}")
-        
-        # Get all living units from both squads
-        attackers = [u for u in attacker.units if u.is_alive()]
-        defenders = [u for u in defender.units if u.is_alive()]
-        
-        # Each living unit in the attacking squad gets to attack
-        for attack_unit in attackers:
-            if not defenders:  # No more defenders
-                break
-                
-            # Choose a random defender to attack
-            defend_unit = random.choice(defenders)
-            
-            # Calculate hit chance based on agility difference
-            hit_chance = 80 + (attack_unit.agility - defend_unit.agility) // 2
-            hit_chance = max(30, min(95, hit_chance))  # Clamp between 30-95%
-            
-            if random.randint(1, 100) <= hit_chance:
-                # Calculate damage
-                attack_power = attack_unit.get_attack_power()
-                defense = defend_unit.get_defense()
-                
-                # Apply terrain defense bonus
-                terrain_bonus = self.terrain[defender.y][defender.x]['defense_bonus']
-                defense = int(defense * (1 + terrain_bonus))
-                
-                damage = max(1, attack_power - defense // 2)
-                is_dead = defend_unit.take_damage(damage)
-                
-                self.combat_log.append(
-                    f"  {attack_unit.unit_type.value} hits {defend_unit.unit_type.value} "
-                    f"for {damage} damage ({'defeated' if is_dead else f'{defend_unit.current_hp}/{defend_unit.max_hp} HP'})"
-                )
-                
-                # Grant experience
-                if is_dead:
-                    attack_unit.add_experience(50 + defend_unit.level * 10)
-                    attack_unit.kills += 1
-                    defenders.remove(defend_unit)
-            
-            # Attacker gains experience for participating
-            attack_unit.battles += 1
-        
-        # Clean up defeated units
-        defender.units = [u for u in defender.units if u.is_alive()]
-        
-        # If defender was defeated, award bonus experience
-        if not any(u.is_alive() for u in defender.units):
-            self.combat_log.append(f"  {defender} was completely defeated!")
-            # Additional XP for each surviving attacker
-            for unit in attackers:
-                if unit.is_alive():
-                    unit.add_experience(25)  # Bonus for victory
+        terrain_bonus = self.terrain[defender.y][defender.x]['defense_bonus']
+        resolve_attack(attacker, defender, terrain_bonus, log=self.combat_log)
         
         attacker.has_acted = True
+        self.notify('changed', attacker)
+        self.notify('changed', defender)
         return True
+
+    def forecast_combat(self, attacker: Squad, defender: Squad) -> CombatForecast:
+        """Get the expected outcome of start_combat without rolling any dice."""
+        terrain_bonus = self.terrain[defender.y][defender.x]['defense_bonus']
+        return self.combat_model.forecast(attacker, defender, terrain_bonus)
         
     def to_dict(self) -> dict:
         """Convert game state to a dictionary for saving."""
@@ -316,6 +419,7 @@ class GameState:
             'current_turn': self.current_turn,
             'combat_log': self.combat_log[-10:],  # Keep last 10 combat log entries
             'squads': [squad.to_dict() for squad in self.squads],
+            'world': self.world,
             'selected_squad_index': self.squads.index(self.selected_squad) if self.selected_squad else -1
         }
         
@@ -327,6 +431,7 @@ class GameState:
         game_state.player_color = tuple(data['player_color'])
         game_state.current_turn = data['current_turn']
         game_state.combat_log = data.get('combat_log', [])
+        game_state._load_world(data.get('world'))
         
         # Rebuild squads
         game_state.squads = []
@@ -338,15 +443,28 @@ class GameState:
         selected_index = data.get('selected_squad_index', -1)
         if 0 <= selected_index < len(game_state.squads):
             game_state.selected_squad = game_state.squads[selected_index]
-            
+        
+        game_state.history.reset()
         return game_state
         
     def save_to_file(self, filename: str = 'savegame.json') -> bool:
         """Save the current game state to a file."""
+        return self.write_file(filename, self.to_dict())
+
+    @staticmethod
+    def write_file(filename: str, data: dict) -> bool:
+        """
+        Write save data (from to_dict) to a file. Only touches data, so it can run in a
+        worker thread while the game goes on. Missing directories are created.
+        """
         import json
+        import os
         try:
+            directory = os.path.dirname(filename)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
             with open(filename, 'w') as f:
-                json.dump(self.to_dict(), f, indent=2)
+                json.dump(data, f, indent=2)
             return True
         except Exception as e:
             print(f"Error saving game: {e}")
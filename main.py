@@ -1,4 +1,5 @@
 import sys
+import asyncio
 import pygame
 import random
 import time
@@ -10,17 +11,36 @@ pygame.init()
 # Import game components
 from game_state import GameState
 from ui.menu import Menu, ArmyInterface, SaveDialog
+from ui.camera import Camera
+from ui.lod import LODRenderer, LOD_DETAIL
+from ui.sprites import UnitSpriteCache
+from ui.scheduler import FrameScheduler
+from ui.overlays import ThreatOverlay, FogOverlay
 from utils.constants import *
-from unit import Unit
+from systems.factory import create_units
+from systems.memory import MemoryTracker, memory_report
+from systems.runtime import SimulationRuntime
 
 # Create game window
 screen = pygame.display.set_mode((SCREEN_SIZE, SCREEN_SIZE))
 pygame.display.set_caption("Opus Battle")
-clock = pygame.time.Clock()
+
+# Paces the main loop: renders only when needed and idles when nothing happens
+scheduler = FrameScheduler(target_fps=FPS, idle_fps=IDLE_FPS, idle_after=IDLE_AFTER)
 
 # Initialize game state
 game_state = None
 
+# Advances the simulation on its own fixed timestep: input submits commands to it
+runtime = SimulationRuntime(game_state)
+runtime.add_listener(scheduler.invalidate)
+
+# Zoomable view of the grid and the aggregated squad layer used when zoomed out
+camera = Camera((SCREEN_SIZE, SCREEN_SIZE))
+lod_renderer = LODRenderer(camera)
+threat_overlay = ThreatOverlay(camera)
+fog_overlay = FogOverlay(camera)
+
 def load_game(filename='savegame.json'):
     """Load a saved game from file."""
     global game_state
@@ -31,6 +51,11 @@ def load_game(filename='savegame.json'):
     else:
         print("No saved game found or error loading, starting new game.")
         game_state = GameState()
+    camera.set_grid_size(game_state.width, game_state.height)
+    lod_renderer.layer.bind(game_state)
+    runtime.bind(game_state)
+    game_state.add_listener(scheduler.invalidate)
+    scheduler.invalidate()
 
 # Try to load a saved game, or start a new one if none exists
 load_game()
@@ -42,11 +67,12 @@ def create_main_menu() -> Menu:
         menu.toggle_visibility()
     
     def change_color():
-        game_state.player_color = (
+        color = (
             random.randint(50, 255),
             random.randint(50, 255),
             random.randint(50, 255)
         )
+        runtime.submit(lambda: setattr(game_state, 'player_color', color))
     
     def show_army():
         if game_state.squads:  # Only proceed if there are squads
@@ -55,27 +81,36 @@ def create_main_menu() -> Menu:
             army_interface.visible = True
             menu.visible = False
     
-    def recruit_unit():
+    def recruit():
         if game_state.squads:
             squad = game_state.squads[0]  # Add to first squad for now
             unit_types = [UnitType.RECRUIT, UnitType.APPRENTICE, UnitType.SCOUT]
             if len(squad.units) < 9:  # Max 9 units per squad
                 unit_type = random.choice(unit_types)
-                squad.add_unit(Unit(unit_type, 1))
+                squad.add_unit(create_units([unit_type])[0])
+                game_state.notify('changed', squad)
+                game_state.history.commit("Recruit")
                 print(f"Recruited a new {unit_type.value} to squad!")
     
+    def recruit_unit():
+        runtime.submit(recruit)
+    
+    def on_saved(saved):
+        print("Game saved successfully!" if saved else "Failed to save game!")
+    
     def save_game():
-        if game_state.save_to_file('savegame.json'):
-            print("Game saved successfully!")
-        else:
-            print("Failed to save game!")
+        runtime.save('savegame.json', on_done=on_saved)
     
-    def load_game_menu():
+    def load():
         load_game('savegame.json')
+        army_interface.bind(game_state)
+    
+    def load_game_menu():
+        runtime.submit(load)
         menu.visible = False
     
     def end_turn():
-        game_state.end_turn()
+        runtime.end_turn(on_done=lambda report: game_state.history.commit("End Turn"))
         menu.visible = False
     
     def quit_game():
@@ -97,14 +132,17 @@ def create_main_menu() -> Menu:
 
 # Create UI instances
 menu = create_main_menu()
-army_interface = ArmyInterface(game_state)
+army_interface = ArmyInterface(game_state, submit=runtime.submit)  # Promotions wait for the simulation
 
 # Create save dialog
 def on_save_selected(slot):
-    game_state.save_to_file(f'savegame_{slot}.json')
-    print(f"Game saved to savegame_{slot}.json")
+    def on_saved(saved):
+        if saved:
+            print(f"Game saved to savegame_{slot}.json")
+        save_dialog.load_save_slots()  # Refresh the save slots
+    
+    runtime.save(f'savegame_{slot}.json', on_done=on_saved)
     save_dialog.hide()
-    save_dialog.load_save_slots()  # Refresh the save slots
 
 def on_save_canceled():
     save_dialog.hide()
@@ -118,24 +156,70 @@ save_dialog = SaveDialog(on_save_selected, on_save_canceled, on_quit_without_sav
 # Font for grid coordinates
 font = pygame.font.Font(None, 16)
 
+# Pre-rendered unit sprites for the detailed grid view
+unit_sprites = UnitSpriteCache(font)
+
+# Allocation tracking for the memory report, started by the first report
+memory_tracker = MemoryTracker()
+
+def print_memory_report():
+    """Print memory use by subsystem, tracking allocations turn by turn from now on."""
+    if not any(phase == memory_tracker.phase for _, phase in game_state.turns.phases):
+        game_state.turns.add_phase('memory', memory_tracker.phase)
+    ui = {
+        'sprites': unit_sprites, 'lod': lod_renderer, 'threat overlay': threat_overlay,
+        'fog overlay': fog_overlay, 'menu': menu, 'army': army_interface, 'save dialog': save_dialog,
+    }
+    print(memory_report(game_state, ui=ui, tracker=memory_tracker).format())
+
 def draw_grid():
     """Draw the game grid."""
-    # Draw grid lines
-    for x in range(0, SCREEN_SIZE, CELL_SIZE):
-        pygame.draw.line(screen, (50, 50, 50), (x, 0), (x, SCREEN_SIZE))
-    for y in range(0, SCREEN_SIZE, CELL_SIZE):
-        pygame.draw.line(screen, (50, 50, 50), (0, y), (SCREEN_SIZE, y))
+    min_x, min_y, max_x, max_y = camera.get_visible_bounds()
+    left, top = camera.grid_to_screen(min_x, min_y)
+    right, bottom = camera.grid_to_screen(max_x, max_y)
+    
+    # Draw grid lines (skipped when zoomed out too far for them to be readable)
+    if camera.cell_size >= 4:
+        for x in range(min_x, max_x + 1):
+            sx = camera.grid_to_screen(x, 0)[0]
+            pygame.draw.line(screen, (50, 50, 50), (sx, top), (sx, bottom))
+        for y in range(min_y, max_y + 1):
+            sy = camera.grid_to_screen(0, y)[1]
+            pygame.draw.line(screen, (50, 50, 50), (left, sy), (right, sy))
+    else:
+        pygame.draw.rect(screen, (50, 50, 50), (left, top, right - left, bottom - top), 1)
     
-    # Draw coordinate labels every 10 cells
-    for x in range(0, GRID_SIZE, 10):
-        for y in range(0, GRID_SIZE, 10):
+    # Draw coordinate labels every 10 cells (further apart when zoomed out)
+    step = 10 * max(1, CELL_SIZE // camera.cell_size)
+    for x in range(min_x - min_x % step, max_x, step):
+        for y in range(min_y - min_y % step, max_y, step):
+            if x < min_x or y < min_y:
+                continue
             coord_text = font.render(f"{x},{y}", True, (100, 100, 100))
-            screen.blit(coord_text, (x * CELL_SIZE + 2, y * CELL_SIZE + 2))
+            sx, sy = camera.grid_to_screen(x, y)
+            screen.blit(coord_text, (sx + 2, sy + 2))
 
 def draw_squads():
     """Draw all squads and their units on the grid."""
+    # With fog of war on, enemy squads outside the viewing faction's sight are skipped
+    viewer = fog_overlay.get_viewer(game_state)
+    is_visible = None
+    if viewer is not None:
+        is_visible = lambda squad: game_state.visibility.is_squad_visible(squad, viewer)
+    
+    # Zoomed out: draw the aggregated heat cells or squad markers instead of units
+    if lod_renderer.get_level() != LOD_DETAIL:
+        lod_renderer.draw(screen, game_state.selected_squad, is_visible)
+        return
+    
+    cell_size = camera.cell_size
+    unit_sprites.set_cell_size(cell_size)
+    batch = []  # (sprite, position) pairs drawn with a single blits() call
+    selected = []
     for squad in game_state.squads:
-        if not squad.is_alive():
+        if not squad.is_alive() or not camera.is_visible(squad.x, squad.y, margin=1):
+            continue
+        if is_visible is not None and not is_visible(squad):
             continue
             
         # Get all living units in the squad
@@ -143,7 +227,7 @@ def draw_squads():
         if not living_units:
             continue
             
-        # Draw each unit in formation
+        # Queue each unit in formation
         for i, unit in enumerate(living_units):
             if i >= 9:  # Max 9 units per squad (3x3 formation)
                 break
@@ -159,38 +243,20 @@ def draw_squads():
             grid_y = squad.y + dy
             
             # Only draw if within bounds
-            if 0 <= grid_x < GRID_SIZE and 0 <= grid_y < GRID_SIZE:
-                x = grid_x * CELL_SIZE + CELL_SIZE // 2
-                y = grid_y * CELL_SIZE + CELL_SIZE // 2
-                
-                # Draw unit circle with class color
-                unit_color = UNIT_COLORS.get(unit.unit_type, (200, 200, 200))
-                pygame.draw.circle(screen, unit_color, (x, y), CELL_SIZE // 2 - 2)
-                
-                # Draw unit level
-                level_text = font.render(str(unit.level), True, (255, 255, 255))
-                text_rect = level_text.get_rect(center=(x, y))
-                screen.blit(level_text, text_rect)
-                
-                # Draw HP bar
-                hp_ratio = unit.current_hp / unit.max_hp
-                hp_bar_width = CELL_SIZE - 4
-                hp_fill = max(2, int(hp_ratio * hp_bar_width))
-                
-                # HP bar background (red)
-                pygame.draw.rect(screen, (150, 0, 0), 
-                               (x - hp_bar_width//2, y + CELL_SIZE//2 + 2, 
-                                hp_bar_width, 2))
-                # HP bar fill (green)
-                pygame.draw.rect(screen, (0, 200, 0), 
-                               (x - hp_bar_width//2, y + CELL_SIZE//2 + 2, 
-                                hp_fill, 2))
+            if 0 <= grid_x < game_state.width and 0 <= grid_y < game_state.height:
+                x, y = camera.grid_to_screen(grid_x, grid_y)
+                sprite, (ox, oy) = unit_sprites.get_sprite(unit)
+                batch.append((sprite, (x + ox, y + oy)))
         
-        # Draw squad selection indicator on the center unit
-        if squad.selected and living_units:
-            x = squad.x * CELL_SIZE + CELL_SIZE // 2
-            y = squad.y * CELL_SIZE + CELL_SIZE // 2
-            pygame.draw.circle(screen, (255, 255, 0), (x, y), CELL_SIZE // 2 + 2, 2)
+        if squad.selected:
+            selected.append(squad)
+    
+    screen.blits(batch, doreturn=False)
+    
+    # Draw squad selection indicators on the center unit
+    for squad in selected:
+        x, y = camera.cell_center(squad.x, squad.y)
+        pygame.draw.circle(screen, (255, 255, 0), (x, y), cell_size // 2 + 2, 2)
 
 def draw_ui():
     """Draw UI elements like turn counter and controls help."""
@@ -198,11 +264,23 @@ def draw_ui():
     turn_text = font.render(f"Turn: {game_state.current_turn}", True, (255, 255, 255))
     screen.blit(turn_text, (10, 10))
     
+    # Show what the simulation is busy with (input is queued meanwhile)
+    if runtime.job_label:
+        job_text = font.render(f"{runtime.job_label}...", True, (255, 255, 0))
+        screen.blit(job_text, (10, 26))
+    
     # Draw controls help
     controls = [
         "TAB: Toggle Menu",
         "ARROWS: Move/Select",
-        "CLICK: Select Squad"
+        "CLICK: Select Squad",
+        "SHIFT+CLICK: March",
+        "H: Enemy Threat",
+        "F: Fog of War",
+        "CTRL+Z/Y: Undo/Redo",
+        "M: Memory Report",
+        "WHEEL: Zoom",
+        "RIGHT DRAG: Pan"
     ]
     
     for i, text in enumerate(controls):
@@ -213,8 +291,54 @@ def draw_ui():
 last_click_time = 0
 DOUBLE_CLICK_DELAY = 0.5  # seconds
 
+# Game commands: submitted by handle_input and applied by the runtime on its next tick
+
+def undo_action():
+    label = game_state.history.undo()
+    if label:
+        print(f"Undid {label}")
+
+def redo_action():
+    label = game_state.history.redo()
+    if label:
+        print(f"Redid {label}")
+
+def move_selected(dx, dy):
+    """Move the selected squad one cell."""
+    squad = game_state.selected_squad
+    if squad is None:
+        return
+    new_x = squad.x + dx
+    new_y = squad.y + dy
+    
+    # Check bounds
+    if 0 <= new_x < game_state.width and 0 <= new_y < game_state.height:
+        if game_state.move_squad(squad, new_x, new_y):
+            game_state.history.commit("Move")
+
+def click_cell(grid_x, grid_y, shift):
+    """Select the squad in a cell, or march/move the selected squad there."""
+    # Check if clicking on a squad
+    clicked_squad = game_state.get_squad_at(grid_x, grid_y)
+    
+    if game_state.selected_squad and shift:
+        # Order the selected squad to march there over the coming turns
+        if game_state.order_move(game_state.selected_squad, (grid_x, grid_y)):
+            game_state.history.commit("March Order")
+            print(f"{game_state.selected_squad.name} marching to ({grid_x}, {grid_y})")
+    elif clicked_squad:
+        # Select the clicked squad
+        game_state.select_squad(grid_x, grid_y)
+    elif game_state.selected_squad:
+        # Try to move selected squad to empty space
+        if game_state.move_squad(game_state.selected_squad, grid_x, grid_y):
+            game_state.history.commit("Move")
+
 def handle_input(event):
-    """Handle a single input event."""
+    """
+    Handle a single input event. UI state (menus, camera, overlays) changes right away;
+    game commands are submitted to the runtime.
+    """
     global last_click_time, running
     
     if event.type == pygame.QUIT:
@@ -238,6 +362,24 @@ def handle_input(event):
             # Toggle menu
             if event.key == pygame.K_TAB:
                 menu.toggle_visibility()
+            
+            # Toggle the enemy threat overlay
+            elif event.key == pygame.K_h:
+                threat_overlay.toggle_visibility()
+            
+            # Toggle fog of war for the selected squad's faction
+            elif event.key == pygame.K_f:
+                fog_overlay.toggle_visibility()
+            
+            # Print the memory report
+            elif event.key == pygame.K_m:
+                runtime.submit(print_memory_report)
+            
+            # Undo/redo the last actions
+            elif event.key == pygame.K_z and event.mod & pygame.KMOD_CTRL:
+                runtime.submit(undo_action)
+            elif event.key == pygame.K_y and event.mod & pygame.KMOD_CTRL:
+                runtime.submit(redo_action)
         
             # Handle movement when menu is closed
             elif not menu.visible and not army_interface.visible and game_state.selected_squad:
@@ -252,19 +394,21 @@ def handle_input(event):
                     dy = 1
                 
                 if dx != 0 or dy != 0:
-                    new_x = game_state.selected_squad.x + dx
-                    new_y = game_state.selected_squad.y + dy
-                    
-                    # Check bounds
-                    if 0 <= new_x < GRID_SIZE and 0 <= new_y < GRID_SIZE:
-                        game_state.move_squad(game_state.selected_squad, new_x, new_y)
+                    runtime.submit(lambda: move_selected(dx, dy))
+        
+        # Zoom around the mouse cursor
+        elif event.type == pygame.MOUSEWHEEL:
+            camera.zoom(event.y, pygame.mouse.get_pos())
+        
+        # Pan while dragging with the right mouse button
+        elif event.type == pygame.MOUSEMOTION and event.buttons[2]:
+            camera.pan(*event.rel)
         
         # Handle mouse click
         elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:  # Left click
             current_time = time.time()
             mouse_x, mouse_y = pygame.mouse.get_pos()
-            grid_x = mouse_x // CELL_SIZE
-            grid_y = mouse_y // CELL_SIZE
+            grid_x, grid_y = camera.screen_to_grid(mouse_x, mouse_y)
             
             # Check for double click
             if (current_time - last_click_time) < DOUBLE_CLICK_DELAY:
@@ -282,76 +426,67 @@ def handle_input(event):
             # Single click handling
             last_click_time = current_time
             
-            if not menu.visible and not army_interface.visible:
-                # Check if clicking on a squad
-                clicked_squad = game_state.get_squad_at(grid_x, grid_y)
-                
-                if clicked_squad:
-                    # Select the clicked squad
-                    game_state.select_squad(grid_x, grid_y)
-                elif game_state.selected_squad:
-                    # Try to move selected squad to empty space
-                    game_state.move_squad(game_state.selected_squad, grid_x, grid_y)
+            in_world = 0 <= grid_x < game_state.width and 0 <= grid_y < game_state.height
+            if in_world and not menu.visible and not army_interface.visible:
+                shift = bool(pygame.key.get_mods() & pygame.KMOD_SHIFT)
+                runtime.submit(lambda: click_cell(grid_x, grid_y, shift))
 
-def main():
-    """Main game loop."""
+def render_frame():
+    """Draw the grid, squads and any open UI on top."""
+    screen.fill(BLACK)
+    draw_grid()
+    threat_overlay.draw(screen, game_state)
+    draw_squads()
+    fog_overlay.draw(screen, game_state)
+    draw_ui()
+    
+    # Draw UI elements on top
+    if menu.visible:
+        menu.draw(screen)
+    if army_interface.visible:
+        army_interface.draw(screen)
+    if save_dialog.visible:
+        save_dialog.draw(screen)
+    
+    # Update display
+    pygame.display.flip()
+
+async def run_game():
+    """
+    Main loop: handles input and renders frames paced by the frame scheduler, while the
+    runtime advances the simulation on its own task of the same event loop.
+    """
     global running
     running = True
+    await runtime.start()
     
     while running:
         # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                # Show save dialog when clicking the window close button
+        for event in scheduler.get_events(block=False):
+            if event.type == pygame.QUIT and not save_dialog.visible:
+                # Show save dialog when clicking the window close button;
+                # closing the window again while it is open quits
                 menu.visible = False
                 save_dialog.show()
-                
-                # Show the save dialog
-                save_dialog.show()
-                
-                # Wait for the dialog to be closed
-                while save_dialog.visible and running:
-                    for e in pygame.event.get():
-                        if e.type == pygame.QUIT:
-                            running = False
-                            break
-                        save_dialog.handle_event(e)
-                    
-                    # Draw everything
-                    screen.fill(BLACK)
-                    draw_grid()
-                    draw_squads()
-                    draw_ui()
-                    menu.draw(screen) if menu.visible else None
-                    army_interface.draw(screen) if army_interface.visible else None
-                    save_dialog.draw(screen)
-                    
-                    pygame.display.flip()
-                    clock.tick(60)
-                
-                if not running:
-                    break
+                continue
             
             # Handle input for the current event
             handle_input(event)
+            if not running:
+                break
         
-        # Draw everything
-        screen.fill(BLACK)
-        draw_grid()
-        draw_squads()
-        draw_ui()
-        
-        # Draw UI elements on top
-        if menu.visible:
-            menu.draw(screen)
-        if army_interface.visible:
-            army_interface.draw(screen)
-        if save_dialog.visible:
-            save_dialog.draw(screen)
+        # Draw only if something changed since the last frame
+        if running and scheduler.should_render():
+            render_frame()
+            scheduler.rendered()
         
-        # Update display
-        pygame.display.flip()
-        clock.tick(60)
+        await scheduler.next_frame()
+    
+    # Let a running save finish before quitting
+    await runtime.stop()
+
+def main():
+    asyncio.run(run_game())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,131 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional
+from net.server import encode
+from utils.constants import SERVER_HOST, SERVER_PORT
+
+
+class GameClient:
+    """
+    Minimal asyncio client for GameServer, used by bots, spectators and local tests.
+
+    Keeps a mirror of every squad record (see net/server.py for the wire format) up to
+    date from the server's snapshots and deltas.
+    """
+
+    def __init__(self, host: str = SERVER_HOST, port: int = SERVER_PORT):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.squads: Dict[int, Dict[str, Any]] = {}
+        self.turn = 0
+        self.tick = 0
+        self.messages = 0
+        self._next_req = 1
+        self._replies: Dict[int, asyncio.Future] = {}
+        self._tick_waiters = []
+        self._reader_task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> None:
+        """Connect and wait for the initial snapshot."""
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self._reader_task = asyncio.create_task(self._read_loop())
+        await self.wait_for_tick(1)
+
+    async def close(self) -> None:
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+        if self._reader_task:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+
+    async def send(self, cmd: str, **args) -> Dict[str, Any]:
+        """Send a command and wait for its reply (which arrives with the state it produced)."""
+        req = self._next_req
+        self._next_req += 1
+        future = asyncio.get_running_loop().create_future()
+        self._replies[req] = future
+        self.writer.write(encode({'cmd': cmd, 'req': req, **args}))
+        return await future
+
+    async def sync(self) -> Dict[str, Any]:
+        """Round-trip a ping; once it returns, the mirror includes every earlier change."""
+        return await self.send('ping')
+
+    async def wait_for_tick(self, tick: int = None) -> None:
+        """
+        Wait until a message for the given tick (default: the next one) has been applied.
+        Idle ticks send nothing, so this only returns once something changes.
+        """
+        target = self.tick + 1 if tick is None else tick
+        if self.tick >= target:
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._tick_waiters.append((target, future))
+        await future
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                self.apply(json.loads(line))
+        except ConnectionError:
+            pass
+        finally:
+            for future in self._replies.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Disconnected from game server"))
+            for _, future in self._tick_waiters:
+                if not future.done():
+                    future.set_exception(ConnectionError("Disconnected from game server"))
+
+    def apply(self, message: Dict[str, Any]) -> None:
+        """Apply one server message to the mirror."""
+        self.messages += 1
+        kind = message['type']
+        if kind == 'reply':
+            future = self._replies.pop(message.get('req'), None)
+            if future is not None and not future.done():
+                future.set_result(message)
+            return
+
+        if kind == 'snapshot':
+            self.squads = {int(squad_id): record for squad_id, record in message['squads'].items()}
+        elif kind == 'delta':
+            for squad_id, changes in message['squads'].items():
+                self.apply_squad_delta(int(squad_id), changes)
+            for squad_id in message.get('removed', ()):
+                self.squads.pop(squad_id, None)
+        self.turn = message['turn']
+        self.tick = message['tick']
+
+        waiting = []
+        for target, future in self._tick_waiters:
+            if self.tick >= target:
+                if not future.done():
+                    future.set_result(None)
+            else:
+                waiting.append((target, future))
+        self._tick_waiters = waiting
+
+    def apply_squad_delta(self, squad_id: int, changes: Dict[str, Any]) -> None:
+        record = self.squads.get(squad_id)
+        if record is None:
+            self.squads[squad_id] = changes  # New squads arrive as full records
+            return
+        for key, value in changes.items():
+            if key not in ('units', 'count'):
+                record[key] = value
+        if 'units' in changes:
+            units = record['units']
+            count = changes.get('count', len(units))
+            del units[count:]
+            units.extend([None] * (count - len(units)))
+            for index, unit in changes['units'].items():
+                units[int(index)] = unit
@@ -0,0 +1,460 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Set
+from game_state import GameState
+from squad import Squad
+from unit import Unit
+from utils.constants import (
+    UnitType, SERVER_HOST, SERVER_PORT, SERVER_TICK_RATE, SERVER_MAX_CLIENT_BUFFER
+)
+
+# Wire format: one compact JSON object per line, in both directions.
+#
+# Client -> server commands (every command may carry a "req" number echoed in the reply):
+#   {"cmd": "ping"}
+#   {"cmd": "select", "x": 10, "y": 12}
+#   {"cmd": "move", "squad": 3, "x": 14, "y": 12}      (squad defaults to the client's selection)
+#   {"cmd": "end_turn"}
+#   {"cmd": "recruit", "squad": 3, "type": "Scout"}    (type defaults to a random starting class)
+#   {"cmd": "promote", "squad": 3, "unit": 0, "type": "Soldier"}
+#
+# Server -> client messages:
+#   {"type": "snapshot", "tick": .., "turn": .., "squads": {id: full record}}
+#   {"type": "delta", "tick": .., "turn": .., "squads": {id: changed fields}, "removed": [ids]}
+#   {"type": "reply", "req": .., "ok": true/false, ...}
+#
+# A full squad record is {"name", "color", "formation", "x", "y", "acted", "dest", "units"}
+# where each unit is [type, level, hp, max_hp, experience]. A delta only carries the fields
+# that changed since the previous tick; "units" in a delta maps unit index -> new unit record,
+# plus "count" (the new number of units) when units were added or removed.
+
+STARTING_CLASSES = [UnitType.RECRUIT, UnitType.APPRENTICE, UnitType.SCOUT]
+
+
+def encode(message: dict) -> bytes:
+    """Encode a message as one line of compact JSON."""
+    return json.dumps(message, separators=(',', ':')).encode() + b'\n'
+
+
+class DeltaEncoder:
+    """
+    Tracks the last broadcast state of every squad and turns changes into compact deltas.
+
+    Squads are identified by their stable Squad.id, the id saves, state_diff and the
+    analytics snapshots use, so deltas can be matched against them. Changed squads are
+    collected from GameState listener events, so each tick only re-reads the squads that
+    were touched instead of serializing the whole state.
+    """
+
+    def __init__(self, game_state: GameState):
+        self.game_state = game_state
+        self.squads: Dict[int, Squad] = {}  # Broadcast squads by id
+        self.sent: Dict[int, Dict[str, Any]] = {}  # Last broadcast record per squad id
+        self.dirty: Set[Squad] = set()
+        self.turn = game_state.current_turn
+        self._squads_ref = None
+        game_state.add_listener(self.on_squad_event)
+
+    def on_squad_event(self, event: str, squad: Squad) -> None:
+        """GameState listener: remember which squads need re-encoding."""
+        self.dirty.add(squad)
+
+    def mark_all_dirty(self) -> None:
+        """Re-check every squad on the next tick (e.g. after a turn reset has_acted)."""
+        self.dirty.update(self.game_state.squads)
+
+    @staticmethod
+    def get_id(squad: Squad) -> int:
+        """Get the id a squad goes by on the wire."""
+        return squad.id
+
+    def get_squad(self, squad_id) -> Optional[Squad]:
+        """Get a live squad by id."""
+        squad = self.squads.get(squad_id)
+        return squad if squad is not None and squad_id in self.sent else None
+
+    @staticmethod
+    def encode_unit(unit: Unit) -> List:
+        return [unit.unit_type.value, unit.level, unit.current_hp, unit.max_hp, unit.experience]
+
+    def encode_squad(self, squad: Squad) -> Dict[str, Any]:
+        """Get the full wire record of a squad."""
+        return {
+            'name': squad.name,
+            'color': list(squad.color),
+            'formation': [list(offset) for offset in squad.formation],
+            'x': squad.x,
+            'y': squad.y,
+            'acted': squad.has_acted,
+            'dest': list(squad.destination) if squad.destination else None,
+            'units': [self.encode_unit(unit) for unit in squad.units]
+        }
+
+    @staticmethod
+    def diff_records(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the fields of new that differ from old, with units diffed by index."""
+        changes = {}
+        for key, value in new.items():
+            if key == 'units':
+                continue
+            if old.get(key) != value:
+                changes[key] = value
+
+        old_units, new_units = old['units'], new['units']
+        unit_changes = {}
+        for i, unit in enumerate(new_units):
+            if i >= len(old_units) or old_units[i] != unit:
+                unit_changes[str(i)] = unit
+        if unit_changes or len(old_units) != len(new_units):
+            changes['units'] = unit_changes
+            if len(old_units) != len(new_units):
+                changes['count'] = len(new_units)
+        return changes
+
+    def snapshot(self, tick: int) -> Dict[str, Any]:
+        """Get a full snapshot message of the current state (as already broadcast)."""
+        return {
+            'type': 'snapshot', 'tick': tick, 'turn': self.turn,
+            'squads': {str(squad_id): record for squad_id, record in self.sent.items()}
+        }
+
+    def collect(self, tick: int) -> Optional[Dict[str, Any]]:
+        """
+        Fold every change since the last call into the broadcast state.
+        Returns the delta message, or None if nothing visible changed.
+        """
+        squads = self.game_state.squads
+        current = {squad.id: squad for squad in squads}
+        if self._squads_ref is not squads:
+            # The squad list was replaced (first tick or a load): diff everything
+            self._squads_ref = squads
+            self.dirty.update(squads)
+            self.dirty.update(squad for squad in self.squads.values() if current.get(squad.id) is not squad)
+
+        changed: Dict[str, Dict[str, Any]] = {}
+        removed: List[int] = []
+        for squad in self.dirty:
+            squad_id = squad.id
+            live = current.get(squad_id)
+            if live is not None and live is not squad:
+                continue  # Replaced by a squad with the same id (e.g. loaded), which is diffed instead
+            old = self.sent.get(squad_id)
+            if live is None or not squad.is_alive():
+                if old is not None:
+                    del self.sent[squad_id]
+                    removed.append(squad_id)
+                self.squads.pop(squad_id, None)
+                continue
+
+            self.squads[squad_id] = squad
+            record = self.encode_squad(squad)
+            if old is None:
+                changed[str(squad_id)] = record
+            else:
+                delta = self.diff_records(old, record)
+                if not delta:
+                    continue
+                changed[str(squad_id)] = delta
+            self.sent[squad_id] = record
+        self.dirty.clear()
+
+        turn_changed = self.turn != self.game_state.current_turn
+        self.turn = self.game_state.current_turn
+        if not changed and not removed and not turn_changed:
+            return None
+        message = {'type': 'delta', 'tick': tick, 'turn': self.turn, 'squads': changed}
+        if removed:
+            message['removed'] = removed
+        return message
+
+
+class ServerMetrics:
+    """Throughput and latency counters for a GameServer."""
+
+    def __init__(self, window: int = 1000):
+        self.started = time.perf_counter()
+        self.ticks = 0
+        self.commands = 0
+        self.messages_out = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.writes = 0     # Socket writes (one per client per tick at most)
+        self.resyncs = 0    # Snapshots sent to clients that fell behind
+        self.command_latency = deque(maxlen=window)  # Seconds from receipt to reply flush
+        self.tick_time = deque(maxlen=window)        # Seconds spent encoding and flushing a tick
+
+    @staticmethod
+    def _percentile(samples, fraction: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def report(self) -> Dict[str, float]:
+        """Get a summary of throughput (per second) and latency (milliseconds)."""
+        elapsed = max(1e-9, time.perf_counter() - self.started)
+        return {
+            'uptime': elapsed,
+            'ticks': self.ticks,
+            'commands': self.commands,
+            'commands_per_sec': self.commands / elapsed,
+            'messages_per_sec': self.messages_out / elapsed,
+            'bytes_out_per_sec': self.bytes_out / elapsed,
+            'bytes_in_per_sec': self.bytes_in / elapsed,
+            'messages_per_write': self.messages_out / self.writes if self.writes else 0.0,
+            'resyncs': self.resyncs,
+            'latency_p50_ms': self._percentile(self.command_latency, 0.5) * 1000,
+            'latency_p95_ms': self._percentile(self.command_latency, 0.95) * 1000,
+            'tick_p50_ms': self._percentile(self.tick_time, 0.5) * 1000,
+            'tick_p95_ms': self._percentile(self.tick_time, 0.95) * 1000,
+        }
+
+
+class ClientSession:
+    """One connected client: its socket, pending output and selected squad."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.pending: List[bytes] = []
+        self.received: List[float] = []  # Receipt times of commands whose replies are pending
+        self.selected: Optional[int] = None
+        self.needs_snapshot = True
+
+    def queue(self, data: bytes) -> None:
+        self.pending.append(data)
+
+
+class GameServer:
+    """
+    Authoritative asyncio TCP server for one GameState.
+
+    Commands are applied as they arrive, in arrival order. Every tick the changes they
+    caused are encoded once as a delta, and each client's delta plus pending replies go out
+    in a single socket write, so replies arrive together with the state they produced.
+
+    Ending a turn runs the turn pipeline on the event loop (GameState.end_turn_async), so
+    clients keep being read and ticked meanwhile. Other commands wait for the turn to
+    finish, and no deltas are encoded until it has, so clients never see a half-ended turn.
+    """
+
+    def __init__(self, game_state: GameState = None, host: str = SERVER_HOST, port: int = SERVER_PORT,
+                 tick_rate: int = SERVER_TICK_RATE):
+        self.game_state = game_state or GameState()
+        self.host = host
+        self.port = port
+        self.tick_interval = 1.0 / tick_rate
+        self.encoder = DeltaEncoder(self.game_state)
+        self.metrics = ServerMetrics()
+        self.clients: Set[ClientSession] = set()
+        self.tick = 0
+        self.command_lock = asyncio.Lock()  # Held while a command runs (only awaited across a turn end)
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._tick_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start listening and ticking (port 0 picks a free port, stored back in self.port)."""
+        self.encoder.collect(self.tick)  # Assign ids and baseline records before anyone connects
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self._tick_task = asyncio.create_task(self.run_ticks())
+
+    async def stop(self) -> None:
+        """Stop ticking, disconnect every client and close the listening socket."""
+        if self._tick_task:
+            self._tick_task.cancel()
+            try:
+                await self._tick_task
+            except asyncio.CancelledError:
+                pass
+        for client in list(self.clients):
+            client.writer.close()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        print(f"Game server listening on {self.host}:{self.port}")
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+    # Connections
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        client = ClientSession(reader, writer)
+        self.clients.add(client)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.metrics.bytes_in += len(line)
+                client.received.append(time.perf_counter())
+                try:
+                    command = json.loads(line)
+                    async with self.command_lock:
+                        reply = await self.handle_command(client, command)
+                except (ValueError, KeyError, TypeError) as e:
+                    command, reply = {}, {'ok': False, 'error': f"Bad command: {e}"}
+                reply['type'] = 'reply'
+                if isinstance(command, dict) and 'req' in command:
+                    reply['req'] = command['req']
+                client.queue(encode(reply))
+                self.metrics.commands += 1
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients.discard(client)
+            writer.close()
+
+    # Commands
+
+    async def handle_command(self, client: ClientSession, command: dict) -> Dict[str, Any]:
+        """Apply one client command to the game state and return the reply fields."""
+        name = command['cmd']
+        game_state = self.game_state
+
+        if name == 'ping':
+            return {'ok': True, 'tick': self.tick}
+
+        if name == 'select':
+            squad = game_state.get_squad_at(int(command['x']), int(command['y']))
+            if squad is None:
+                return {'ok': False, 'error': "No squad there"}
+            client.selected = self.encoder.get_id(squad)
+            return {'ok': True, 'squad': client.selected}
+
+        if name == 'end_turn':
+            await game_state.end_turn_async()
+            self.encoder.mark_all_dirty()
+            return {'ok': True, 'turn': game_state.current_turn}
+
+        squad = self.encoder.get_squad(command.get('squad', client.selected))
+        if squad is None:
+            return {'ok': False, 'error': "Unknown squad"}
+
+        if name == 'move':
+            if squad.has_acted:
+                return {'ok': False, 'error': "Squad has already acted"}
+            # The anchor must be reachable this turn and the whole formation must fit there
+            x, y = int(command['x']), int(command['y'])
+            reachable = game_state.pathfinder.get_reachable_cells(squad, squad.get_effective_move_range())
+            if (x, y) == (squad.x, squad.y) or (x, y) not in reachable or not game_state.occupancy.fits(squad, x, y):
+                return {'ok': False, 'error': "Invalid move"}
+            squad.x, squad.y = x, y
+            squad.has_acted = True
+            game_state.notify('moved', squad)
+            return {'ok': True}
+
+        if name == 'recruit':
+            unit_type = UnitType(command['type']) if 'type' in command else random.choice(STARTING_CLASSES)
+            if unit_type not in STARTING_CLASSES:
+                return {'ok': False, 'error': "Only starting classes can be recruited"}
+            if not squad.add_unit(Unit(unit_type, 1)):
+                return {'ok': False, 'error': "Squad is full"}
+            game_state.notify('changed', squad)
+            return {'ok': True, 'type': unit_type.value}
+
+        if name == 'promote':
+            index = int(command['unit'])
+            if not 0 <= index < len(squad.units):
+                return {'ok': False, 'error': "Unknown unit"}
+            unit = squad.units[index]
+            options = unit.get_promotion_options()
+            if not unit.can_promote() or unit.future_points < 100 or not options:
+                return {'ok': False, 'error': "Unit cannot be promoted"}
+            new_type = UnitType(command['type']) if 'type' in command else options[0]
+            if new_type not in options or not unit.promote(new_type):
+                return {'ok': False, 'error': "Invalid promotion"}
+            game_state.notify('changed', squad)
+            return {'ok': True, 'type': new_type.value}
+
+        return {'ok': False, 'error': f"Unknown command {name!r}"}
+
+    # Ticks
+
+    async def run_ticks(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            self.broadcast_tick()
+            next_tick += self.tick_interval
+            delay = next_tick - loop.time()
+            if delay < 0:
+                next_tick = loop.time()  # Fell behind: don't try to catch up with a burst of ticks
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def broadcast_tick(self) -> None:
+        """Encode this tick's delta once and flush every client's batched output."""
+        started = time.perf_counter()
+        self.tick += 1
+        # Commands only hold the lock across a tick while a turn is ending: keep its changes for later
+        delta = None if self.command_lock.locked() else self.encoder.collect(self.tick)
+        delta_bytes = encode(delta) if delta else None
+        snapshot_bytes = None
+
+        for client in list(self.clients):
+            transport = client.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > SERVER_MAX_CLIENT_BUFFER:
+                # The client isn't keeping up: stop queuing deltas and resync it once it drains
+                if not client.needs_snapshot:
+                    client.needs_snapshot = True
+                    self.metrics.resyncs += 1
+                continue
+
+            # State goes ahead of the replies, so a client sees a command's effects by the time it
+            # reads its reply (a snapshot already includes this tick's changes)
+            if client.needs_snapshot:
+                if snapshot_bytes is None:
+                    snapshot_bytes = encode(self.encoder.snapshot(self.tick))
+                client.pending.insert(0, snapshot_bytes)
+                client.needs_snapshot = False
+            elif delta_bytes is not None:
+                client.pending.insert(0, delta_bytes)
+
+            if client.pending:
+                data = b''.join(client.pending)
+                client.writer.write(data)
+                self.metrics.writes += 1
+                self.metrics.messages_out += len(client.pending)
+                self.metrics.bytes_out += len(data)
+                client.pending.clear()
+                now = time.perf_counter()
+                self.metrics.command_latency.extend(now - received for received in client.received)
+                client.received.clear()
+
+        self.metrics.ticks += 1
+        self.metrics.tick_time.append(time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local OpusBattle game server.")
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--tick-rate', type=int, default=SERVER_TICK_RATE)
+    parser.add_argument('--load', metavar='SAVEFILE', help="Start from a saved game")
+    args = parser.parse_args()
+
+    game_state = GameState.load_from_file(args.load) if args.load else GameState()
+    server = GameServer(game_state, args.host, args.port, args.tick_rate)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for key, value in server.metrics.report().items():
+            print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == '__main__':
+    main()
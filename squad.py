@@ -4,7 +4,10 @@ from unit import Unit
 from utils.constants import UnitType, UNIT_COLORS, UNIT_STATS
 
 class Squad:
+    _next_id = 1  # Next unused squad id
+    
     def __init__(self, x: int, y: int, color: Tuple[int, int, int] = None, name: str = None, **kwargs):
+        self.id = Squad.allocate_id(kwargs.get('id'))  # Stable across saves, used to diff states
         self.units: List[Unit] = []
         self.x = x
         self.y = y
@@ -13,6 +16,8 @@ class Squad:
         self.selected = kwargs.get('selected', False)
         self.has_acted = kwargs.get('has_acted', False)
         self.formation = kwargs.get('formation', self._get_default_formation())
+        destination = kwargs.get('destination')
+        self.destination = tuple(destination) if destination else None  # Ordered march target
         self.leader = None  # Will be set when adding units
         
         # Load units if provided
@@ -20,6 +25,14 @@ class Squad:
             for unit_data in kwargs['units']:
                 self.add_unit(Unit.from_dict(unit_data))
 
+    @classmethod
+    def allocate_id(cls, squad_id: int = None) -> int:
+        """Get a new squad id, or reserve a saved one so new ids never collide with it."""
+        if squad_id is None:
+            squad_id = cls._next_id
+        cls._next_id = max(cls._next_id, squad_id + 1)
+        return squad_id
+
     def _generate_squad_color(self) -> Tuple[int, int, int]:
         """Generate a random but pleasant color for the squad."""
         # Generate colors in a more controlled range for better visibility
@@ -33,7 +46,8 @@ class Squad:
             b = min(255, b + 50)
         return (r, g, b)
 
-    def _get_default_formation(self) -> List[Tuple[int, int]]:
+    @staticmethod
+    def _get_default_formation() -> List[Tuple[int, int]]:
         """Get the default formation positions for units in the squad."""
         return [
             (-1, -1), (0, -1), (1, -1),
@@ -238,6 +252,7 @@ class Squad:
     def to_dict(self) -> dict:
         """Convert squad to a dictionary for saving."""
         return {
+            'id': self.id,
             'x': self.x,
             'y': self.y,
             'color': self.color,
@@ -245,6 +260,7 @@ class Squad:
             'selected': self.selected,
             'has_acted': self.has_acted,
             'formation': self.formation,
+            'destination': self.destination,
             'units': [unit.to_dict() for unit in self.units]
         }
         
@@ -252,6 +268,7 @@ class Squad:
     def from_dict(cls, data: dict) -> 'Squad':
         """Create a Squad instance from a dictionary."""
         return cls(
+            id=data.get('id'),
             x=data['x'],
             y=data['y'],
             color=tuple(data['color']),
@@ -259,6 +276,7 @@ class Squad:
             selected=data.get('selected', False),
             has_acted=data.get('has_acted', False),
             formation=data.get('formation'),
+            destination=data.get('destination'),
             units=data.get('units', [])
         )
     
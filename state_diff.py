@@ -0,0 +1,300 @@
+"""
+Structural diffs between game states.
+
+A snapshot is a cheap, immutable copy of the diffable fields of a GameState, keyed by the
+stable squad and unit ids. diff_states compares two snapshots (or live game states) and
+returns a minimal patch; apply_patch applies a patch to a live GameState in place.
+
+Patches are plain JSON-compatible dicts, so they can be sent over the network or journaled:
+
+    {
+        'game': {field: value},            # Changed game fields (current_turn, player_pos, ...)
+        'log': [entries],                  # Combat log entries appended (or 'combat_log' in 'game' if rewritten)
+        'add': [squad.to_dict()],          # New squads, with their units
+        'remove': [squad ids],
+        'squads': [[squad id, {            # Changed squads
+            'set': {field: value},
+            'add': [unit.to_dict()],
+            'remove': [unit ids],
+            'units': [[unit id, {field: value}]],
+            'order': [unit ids]            # Only if units were reordered
+        }]],
+        'order': [squad ids]               # Only if squads were reordered
+    }
+
+Stats derived from the unit type, level and base stats (max_hp, strength, move, ...) are not
+part of the patch; they are recomputed with Unit.update_stats when applied.
+"""
+import copy
+from typing import Any, Dict, List, Optional, Tuple
+from squad import Squad
+from unit import Unit
+from utils.constants import UnitType
+
+SQUAD_FIELDS = ('x', 'y', 'color', 'name', 'selected', 'has_acted', 'formation', 'destination')
+UNIT_FIELDS = ('unit_type', 'level', 'experience', 'kills', 'battles', 'damage_dealt', 'abilities',
+               'future_points', 'base_stats', 'current_hp')
+GAME_FIELDS = ('player_pos', 'player_color', 'current_turn', 'selected_squad')
+
+# Unit fields that Unit.update_stats derives other stats from
+UNIT_STAT_FIELDS = {'unit_type', 'level', 'base_stats'}
+
+
+class StateSnapshot:
+    """
+    Immutable copy of a game state's diffable fields.
+
+    squads maps squad id -> (field values, unit ids in order, {unit id: field values}),
+    with every list and dict copied into tuples so snapshots never alias the live state.
+    """
+
+    def __init__(self, game: Tuple, combat_log: Tuple[str, ...], squads: Dict[int, Tuple]):
+        self.game = game
+        self.combat_log = combat_log
+        self.squads = squads
+
+
+def _thaw(name: str, value):
+    """Turn a captured field value back into its JSON-compatible form."""
+    if name == 'base_stats':
+        return dict(value)  # Captured as a tuple of items
+    if name == 'unit_type':
+        return value.value
+    if isinstance(value, tuple):
+        return [list(item) if isinstance(item, tuple) else item for item in value]
+    return value
+
+
+def capture_unit(unit: Unit) -> Tuple:
+    return (
+        unit.unit_type, unit.level, unit.experience, unit.kills, unit.battles, unit.damage_dealt,
+        tuple(unit.abilities), unit.future_points, tuple(unit.base_stats.items()), unit.current_hp
+    )
+
+
+def capture_squad(squad: Squad) -> Tuple:
+    fields = (
+        squad.x, squad.y, tuple(squad.color), squad.name, squad.selected, squad.has_acted,
+        tuple(map(tuple, squad.formation)), tuple(squad.destination) if squad.destination else None
+    )
+    unit_ids = tuple(unit.id for unit in squad.units)
+    units = {unit.id: capture_unit(unit) for unit in squad.units}
+    return (fields, unit_ids, units)
+
+
+def capture_game(game_state) -> Tuple:
+    """Capture the GAME_FIELDS of a game state."""
+    selected = game_state.selected_squad.id if game_state.selected_squad else None
+    return (tuple(game_state.player_pos), tuple(game_state.player_color), game_state.current_turn, selected)
+
+
+def capture_state(game_state) -> StateSnapshot:
+    """Take a snapshot of a game state for later diffing."""
+    squads = {squad.id: capture_squad(squad) for squad in game_state.squads}
+    return StateSnapshot(capture_game(game_state), tuple(game_state.combat_log), squads)
+
+
+def diff_fields(names: Tuple[str, ...], old: Tuple, new: Tuple) -> Dict[str, Any]:
+    """Get {name: new value} for the captured fields that differ."""
+    return {name: _thaw(name, value) for name, old_value, value in zip(names, old, new) if old_value != value}
+
+
+def _diff_order(old_ids, new_ids, new_set, added: List) -> Optional[List]:
+    """Get the new id order if appending the added ids to the surviving ones doesn't reproduce it."""
+    expected = [item for item in old_ids if item in new_set] + added
+    return None if expected == list(new_ids) else list(new_ids)
+
+
+def diff_squad(old: Tuple, new: Tuple) -> Dict[str, Any]:
+    """Get the patch turning one captured squad into another (empty if they are equal)."""
+    patch: Dict[str, Any] = {}
+    fields = diff_fields(SQUAD_FIELDS, old[0], new[0])
+    if fields:
+        patch['set'] = fields
+
+    old_ids, old_units = old[1], old[2]
+    new_ids, new_units = new[1], new[2]
+    if old_units == new_units and old_ids == new_ids:
+        return patch
+
+    removed = [unit_id for unit_id in old_ids if unit_id not in new_units]
+    added = [unit_id for unit_id in new_ids if unit_id not in old_units]
+    changed = []
+    for unit_id in new_ids:
+        old_unit = old_units.get(unit_id)
+        new_unit = new_units[unit_id]
+        if old_unit is not None and old_unit != new_unit:
+            changed.append([unit_id, diff_fields(UNIT_FIELDS, old_unit, new_unit)])
+    if added:
+        patch['add'] = [unit_record(unit_id, new_units[unit_id]) for unit_id in added]
+    if removed:
+        patch['remove'] = removed
+    if changed:
+        patch['units'] = changed
+    order = _diff_order(old_ids, new_ids, new_units, added)
+    if order is not None:
+        patch['order'] = order
+    return patch
+
+
+def unit_record(unit_id: int, captured: Tuple) -> Dict[str, Any]:
+    """Rebuild a Unit.to_dict() record from a captured unit."""
+    record = {'id': unit_id}
+    record.update((name, _thaw(name, value)) for name, value in zip(UNIT_FIELDS, captured))
+    return record
+
+
+def squad_record(squad_id: int, captured: Tuple) -> Dict[str, Any]:
+    """Rebuild a Squad.to_dict() record from a captured squad."""
+    record = {'id': squad_id}
+    record.update((name, _thaw(name, value)) for name, value in zip(SQUAD_FIELDS, captured[0]))
+    record['units'] = [unit_record(unit_id, captured[2][unit_id]) for unit_id in captured[1]]
+    return record
+
+
+def diff_states(old, new) -> Dict[str, Any]:
+    """
+    Get the minimal patch turning old into new.
+    Both may be StateSnapshots or live GameStates (which are captured first).
+    """
+    if not isinstance(old, StateSnapshot):
+        old = capture_state(old)
+    if not isinstance(new, StateSnapshot):
+        new = capture_state(new)
+
+    patch: Dict[str, Any] = {}
+    game = diff_fields(GAME_FIELDS, old.game, new.game)
+    if game:
+        patch['game'] = game
+
+    old_log, new_log = old.combat_log, new.combat_log
+    if old_log != new_log:
+        if new_log[:len(old_log)] == old_log:
+            patch['log'] = list(new_log[len(old_log):])
+        else:
+            patch.setdefault('game', {})['combat_log'] = list(new_log)
+
+    old_squads, new_squads = old.squads, new.squads
+    removed = [squad_id for squad_id in old_squads if squad_id not in new_squads]
+    added = []
+    changed = []
+    for squad_id, captured in new_squads.items():
+        old_captured = old_squads.get(squad_id)
+        if old_captured is None:
+            added.append(squad_id)
+        elif old_captured != captured:
+            squad_patch = diff_squad(old_captured, captured)
+            if squad_patch:
+                changed.append([squad_id, squad_patch])
+    if added:
+        patch['add'] = [squad_record(squad_id, new_squads[squad_id]) for squad_id in added]
+    if removed:
+        patch['remove'] = removed
+    if changed:
+        patch['squads'] = changed
+    order = _diff_order(old_squads, new_squads, new_squads, added)
+    if order is not None:
+        patch['order'] = order
+    return patch
+
+
+def _set_unit_fields(unit: Unit, fields: Dict[str, Any]) -> None:
+    for name, value in fields.items():
+        if name == 'unit_type':
+            value = UnitType(value)
+        elif name in ('abilities', 'base_stats'):
+            value = copy.deepcopy(value)  # Don't alias the patch, it may be applied again
+        setattr(unit, name, value)
+    if UNIT_STAT_FIELDS.intersection(fields):
+        current_hp = unit.current_hp
+        abilities = unit.abilities
+        unit.update_stats()
+        unit.current_hp = fields.get('current_hp', current_hp)
+        unit.abilities = fields.get('abilities', abilities)
+
+
+def _set_squad_fields(squad: Squad, fields: Dict[str, Any]) -> None:
+    for name, value in fields.items():
+        if name == 'color':
+            value = tuple(value)
+        elif name == 'formation':
+            value = [tuple(offset) for offset in value]
+        elif name == 'destination':
+            value = tuple(value) if value else None
+        setattr(squad, name, value)
+
+
+def _reorder(items: List, order: List[int]) -> List:
+    by_id = {item.id: item for item in items}
+    if len(order) != len(by_id) or any(item_id not in by_id for item_id in order):
+        raise ValueError("Patch order does not match the state it is applied to")
+    return [by_id[item_id] for item_id in order]
+
+
+def apply_squad_patch(squad: Squad, patch: Dict[str, Any]) -> None:
+    """Apply one squad's patch in place."""
+    if 'set' in patch:
+        _set_squad_fields(squad, patch['set'])
+    if 'remove' in patch:
+        removed = set(patch['remove'])
+        squad.units = [unit for unit in squad.units if unit.id not in removed]
+    if 'units' in patch:
+        units = {unit.id: unit for unit in squad.units}
+        for unit_id, fields in patch['units']:
+            if unit_id not in units:
+                raise ValueError(f"Patch does not apply: {squad.name} has no unit {unit_id}")
+            _set_unit_fields(units[unit_id], fields)
+    for data in patch.get('add', ()):
+        # Bypass add_unit's size limit: the patch reproduces a state, it doesn't recruit
+        squad.units.append(Unit.from_dict(copy.deepcopy(data)))
+    if 'order' in patch:
+        squad.units = _reorder(squad.units, patch['order'])
+
+
+def apply_patch(game_state, patch: Dict[str, Any]) -> None:
+    """
+    Apply a patch from diff_states to a live game state in place.
+    Listeners are notified of every added, moved, changed and removed squad.
+    """
+    squads = {squad.id: squad for squad in game_state.squads}
+    events = []
+
+    for squad_id in patch.get('remove', ()):
+        squad = squads.pop(squad_id, None)
+        if squad is None:
+            raise ValueError(f"Patch does not apply: no squad {squad_id}")
+        events.append(('removed', squad))
+    if 'remove' in patch:
+        game_state.squads[:] = [squad for squad in game_state.squads if squad.id in squads]
+
+    for squad_id, squad_patch in patch.get('squads', ()):
+        squad = squads.get(squad_id)
+        if squad is None:
+            raise ValueError(f"Patch does not apply: no squad {squad_id}")
+        apply_squad_patch(squad, squad_patch)
+        fields = squad_patch.get('set', {})
+        events.append(('moved' if 'x' in fields or 'y' in fields else 'changed', squad))
+
+    for data in patch.get('add', ()):
+        squad = Squad.from_dict(dict(data, units=[]))
+        squad.units = [Unit.from_dict(copy.deepcopy(unit_data)) for unit_data in data['units']]
+        game_state.squads.append(squad)
+        squads[squad.id] = squad
+        events.append(('added', squad))
+
+    if 'order' in patch:
+        game_state.squads[:] = _reorder(game_state.squads, patch['order'])
+
+    game = patch.get('game', {})
+    for name, value in game.items():
+        if name == 'selected_squad':
+            game_state.selected_squad = squads.get(value) if value is not None else None
+        elif name == 'player_color':
+            game_state.player_color = tuple(value)
+        else:
+            setattr(game_state, name, value)
+    if 'log' in patch:
+        game_state.combat_log.extend(patch['log'])
+
+    for event, squad in events:
+        game_state.notify(event, squad)
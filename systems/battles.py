@@ -0,0 +1,147 @@
+import asyncio
+import os
+import pickle
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Generator, List, Optional, Sequence, Tuple
+from systems.combat import resolve_attack
+from utils.constants import BATTLE_PARALLEL_MIN
+
+# (battle index, attacker, defender, terrain defense bonus, seed)
+BattleTask = Tuple[int, object, object, float, str]
+# (battle index, attacker, defender, combat log lines) after the battle
+BattleResult = Tuple[int, object, object, List[str]]
+
+
+def battle_seed(turn_seed: int, index: int) -> str:
+    """Seed of the index-th battle of a turn: independent of which process resolves it."""
+    return f"{turn_seed}:{index}"
+
+
+def plan_waves(battles: Sequence[Tuple[object, object]]) -> List[List[int]]:
+    """
+    Split battles (by index) into waves in which no squad fights twice.
+
+    A battle goes in the wave after the last one involving either of its squads, so
+    battles sharing a squad still happen in the order they were declared.
+    """
+    last_wave: Dict[int, int] = {}
+    waves: List[List[int]] = []
+    for index, (attacker, defender) in enumerate(battles):
+        wave = max(last_wave.get(id(attacker), -1), last_wave.get(id(defender), -1)) + 1
+        if wave == len(waves):
+            waves.append([])
+        waves[wave].append(index)
+        last_wave[id(attacker)] = last_wave[id(defender)] = wave
+    return waves
+
+
+def resolve_battle(task: BattleTask) -> BattleResult:
+    """Worker task: fight one battle with its own seeded RNG."""
+    index, attacker, defender, defense_bonus, seed = task
+    log: List[str] = []
+    resolve_attack(attacker, defender, defense_bonus, rng=random.Random(seed), log=log)
+    return index, attacker, defender, log
+
+
+def merge_squad(squad, result) -> None:
+    """Copy a worker's copy of a squad back into the original, keeping the Unit objects."""
+    units = {unit.id: unit for unit in squad.units}
+    for copy in result.units:
+        units[copy.id].__dict__.update(copy.__dict__)
+    squad.units = [units[copy.id] for copy in result.units]
+
+
+class BattleResolver:
+    """
+    Resolves a turn's queued battles, in parallel worker processes when there are many.
+
+    Every battle uses its own RNG seeded from the turn seed and its index, and battles
+    that share no squad are resolved concurrently, wave by wave (see plan_waves).
+    Results are merged back in declaration order, so the outcome and combat log are
+    the same as resolving the battles one after another with the same seeds.
+    """
+
+    def __init__(self, workers: Optional[int] = None, min_parallel: int = BATTLE_PARALLEL_MIN):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel = min_parallel
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def _map(self, tasks: List[BattleTask]) -> List[BattleResult]:
+        if len(tasks) < self.min_parallel or self.workers < 2:
+            return [resolve_battle(task) for task in tasks]
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        chunksize = max(1, len(tasks) // (self.workers * 4))
+        return list(self.executor.map(resolve_battle, tasks, chunksize=chunksize))
+
+    def _map_copies(self, tasks: List[BattleTask]) -> List[BattleResult]:
+        """_map on copies of the tasks' squads, leaving the originals untouched."""
+        if len(tasks) < self.min_parallel or self.workers < 2:
+            tasks = pickle.loads(pickle.dumps(tasks))
+        return self._map(tasks)
+
+    def _waves(self, game_state, battles: Sequence[Tuple[object, object]],
+               turn_seed: int) -> Generator[List[BattleTask], List[BattleResult], int]:
+        """
+        Resolve battles wave by wave: yields the tasks of each wave and takes back their
+        results, so resolve and resolve_async only differ in how the tasks are run.
+        """
+        logs: Dict[int, List[str]] = {}
+        for wave in plan_waves(battles):
+            tasks = []
+            for index in wave:
+                attacker, defender = battles[index]
+                if attacker.is_alive() and defender.is_alive():
+                    defense_bonus = game_state.terrain[defender.y][defender.x]['defense_bonus']
+                    tasks.append((index, attacker, defender, defense_bonus, battle_seed(turn_seed, index)))
+            results = yield tasks
+            for index, attacker, defender, log in results:
+                original_attacker, original_defender = battles[index]
+                if attacker is not original_attacker:  # Resolved in another process or on a copy
+                    merge_squad(original_attacker, attacker)
+                    merge_squad(original_defender, defender)
+                logs[index] = log
+
+        for index in sorted(logs):
+            game_state.combat_log.extend(logs[index])
+            attacker, defender = battles[index]
+            game_state.notify('changed', attacker)
+            game_state.notify('changed', defender)
+        return len(logs)
+
+    def resolve(self, game_state, battles: Sequence[Tuple[object, object]], turn_seed: int) -> int:
+        """
+        Resolve battles between squads of game_state, appending to its combat log and
+        notifying its listeners. Battles whose squads are already wiped out are skipped.
+        Returns the number of battles fought.
+        """
+        waves = self._waves(game_state, battles, turn_seed)
+        try:
+            tasks = next(waves)
+            while True:
+                tasks = waves.send(self._map(tasks))
+        except StopIteration as done:
+            return done.value
+
+    async def resolve_async(self, game_state, battles: Sequence[Tuple[object, object]], turn_seed: int) -> int:
+        """
+        resolve for an asyncio event loop: each wave is fought off the loop's thread, which
+        keeps running meanwhile, and merged back on it. Waves too small for worker processes
+        are fought in a worker thread on copies of their squads, so the originals only
+        change when the results are merged. The squads must not change until the battles
+        are resolved. The outcome is the same as resolve.
+        """
+        loop = asyncio.get_running_loop()
+        waves = self._waves(game_state, battles, turn_seed)
+        try:
+            tasks = next(waves)
+            while True:
+                tasks = waves.send(await loop.run_in_executor(None, self._map_copies, tasks))
+        except StopIteration as done:
+            return done.value
@@ -0,0 +1,71 @@
+import random
+from typing import List, Optional
+
+
+def resolve_attack(attacker, defender, defense_bonus: float = 0.0, rng=random,
+                   log: Optional[List[str]] = None) -> None:
+    """
+    Resolve one attack of a squad on another, unit by unit.
+
+    Every living attacker strikes a random living defender. The hit chance is 80% plus
+    half the agility difference, clamped to 30-95%, and damage is attack power minus half
+    the defense (raised by the defender's terrain defense_bonus), at least 1. Kills and
+    a wiped-out defender grant experience, and dead defenders are removed from the squad.
+
+    rng supplies choice/randint (the random module by default, or a seeded random.Random)
+    and log, if given, receives the combat log lines.
+    """
+    if log is not None:
+        log.append(f"Combat: {attacker} vs {defender}")
+
+    # Get all living units from both squads
+    attackers = [u for u in attacker.units if u.is_alive()]
+    defenders = [u for u in defender.units if u.is_alive()]
+
+    # Each living unit in the attacking squad gets to attack
+    for attack_unit in attackers:
+        if not defenders:  # No more defenders
+            break
+
+        # Choose a random defender to attack
+        defend_unit = rng.choice(defenders)
+
+        # Calculate hit chance based on agility difference
+        hit_chance = 80 + (attack_unit.agility - defend_unit.agility) // 2
+        hit_chance = max(30, min(95, hit_chance))  # Clamp between 30-95%
+
+        if rng.randint(1, 100) <= hit_chance:
+            # Calculate damage, with the terrain defense bonus applied
+            attack_power = attack_unit.get_attack_power()
+            defense = int(defend_unit.get_defense() * (1 + defense_bonus))
+
+            damage = max(1, attack_power - defense // 2)
+            attack_unit.damage_dealt += min(damage, defend_unit.current_hp)
+            is_dead = defend_unit.take_damage(damage)
+
+            if log is not None:
+                log.append(
+                    f"  {attack_unit.unit_type.value} hits {defend_unit.unit_type.value} "
+                    f"for {damage} damage ({'defeated' if is_dead else f'{defend_unit.current_hp}/{defend_unit.max_hp} HP'})"
+                )
+
+            # Grant experience
+            if is_dead:
+                attack_unit.add_experience(50 + defend_unit.level * 10)
+                attack_unit.kills += 1
+                defenders.remove(defend_unit)
+
+        # Attacker gains experience for participating
+        attack_unit.battles += 1
+
+    # Clean up defeated units
+    defender.units = [u for u in defender.units if u.is_alive()]
+
+    # If defender was defeated, award bonus experience
+    if not any(u.is_alive() for u in defender.units):
+        if log is not None:
+            log.append(f"  {defender} was completely defeated!")
+        # Additional XP for each surviving attacker
+        for unit in attackers:
+            if unit.is_alive():
+                unit.add_experience(25)  # Bonus for victory
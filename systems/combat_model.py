@@ -0,0 +1,167 @@
+import copy
+import random
+from functools import lru_cache
+from typing import Dict, List, Tuple
+import numpy as np
+from systems.combat import resolve_attack
+
+Signature = Tuple[str, int, int, int, int]  # (unit type, level, strength, agility, intelligence)
+
+
+def unit_signature(unit) -> Signature:
+    """Everything resolve_attack reads from a unit, besides its HP."""
+    return (unit.unit_type.value, unit.level, unit.strength, unit.agility, unit.intelligence)
+
+
+class CombatForecast:
+    """
+    Expected outcome of one squad attacking another (one start_combat exchange).
+    Forecasts are memoized and shared between callers, so their arrays are read-only.
+    """
+
+    def __init__(self, expected_damage: float, damage_variance: float, expected_kills: float,
+                 wipe_chance: float, survival: np.ndarray, expected_hp: np.ndarray,
+                 attacker_kills: np.ndarray):
+        self.expected_damage = expected_damage  # HP removed from the defender in total
+        self.damage_variance = damage_variance
+        self.expected_kills = expected_kills
+        self.wipe_chance = wipe_chance          # Chance no defender survives
+        self.survival = survival                # Per living defender: chance it survives
+        self.expected_hp = expected_hp          # Per living defender: expected HP afterwards
+        self.attacker_kills = attacker_kills    # Per living attacker: expected kills
+        for array in (survival, expected_hp, attacker_kills):
+            array.setflags(write=False)
+
+    def __repr__(self):
+        return (f"CombatForecast(damage={self.expected_damage:.1f}±{self.damage_variance ** 0.5:.1f}, "
+                f"kills={self.expected_kills:.2f}, wipe={self.wipe_chance:.1%})")
+
+
+@lru_cache(maxsize=65536)
+def pair_outcome(attacker: Signature, defender: Signature, defense_bonus: float) -> Tuple[float, int]:
+    """
+    Get (hit chance, damage) of one unit striking another, as in resolve_attack.
+    Memoized by the units' signatures, so only new stat combinations are computed.
+    """
+    _, _, a_str, a_agi, _ = attacker
+    _, _, d_str, d_agi, _ = defender
+    hit_chance = max(30, min(95, 80 + (a_agi - d_agi) // 2)) / 100
+    attack_power = (a_str * 2 + a_agi) // 3      # Unit.get_attack_power (melee)
+    defense = int((d_agi + d_str) // 2 * (1 + defense_bonus))  # Unit.get_defense, terrain applied
+    return hit_chance, max(1, attack_power - defense // 2)
+
+
+def _target_chances(alive: np.ndarray) -> np.ndarray:
+    """
+    For each defender, the chance a random strike picks it given it is alive:
+    E[1 / (1 + number of other living defenders)], with defenders alive independently.
+    """
+    count = len(alive)
+    # others[k, s] = chance that exactly s defenders other than k are alive (Poisson binomial)
+    others = np.zeros((count, count))
+    others[:, 0] = 1.0
+    for j in range(count):
+        mask = np.arange(count) != j
+        rows = others[mask]
+        rows[:, 1:] = rows[:, 1:] * (1 - alive[j]) + rows[:, :-1] * alive[j]
+        rows[:, 0] *= 1 - alive[j]
+        others[mask] = rows
+    return others @ (1.0 / np.arange(1, count + 1))
+
+
+@lru_cache(maxsize=4096)
+def _forecast(attackers: Tuple[Signature, ...], defenders: Tuple[Tuple[Signature, int], ...],
+              defense_bonus: float) -> CombatForecast:
+    count = len(defenders)
+    max_hp = max(hp for _, hp in defenders)
+    # hp[k, h] = chance defender k has h HP left
+    hp = np.zeros((count, max_hp + 1))
+    hp[np.arange(count), [hp_left for _, hp_left in defenders]] = 1.0
+    start_hp = np.array([hp_left for _, hp_left in defenders], dtype=float)
+    heights = np.arange(max_hp + 1)
+    attacker_kills = np.zeros(len(attackers))
+    variance = 0.0
+
+    for a, attacker in enumerate(attackers):
+        outcomes = [pair_outcome(attacker, signature, defense_bonus) for signature, _ in defenders]
+        hit_chance = np.array([chance for chance, _ in outcomes])
+        damage = np.array([dmg for _, dmg in outcomes])
+
+        alive = 1.0 - hp[:, 0]
+        struck = _target_chances(alive) * hit_chance  # Chance each living defender is hit
+
+        # Shift every defender's HP distribution down by the damage it would take:
+        # h HP comes from h + damage, and 0 HP from anything up to the damage
+        padded = np.concatenate([hp, np.zeros((count, 1))], axis=1)
+        source = np.minimum(heights[None, :] + damage[:, None], max_hp + 1)
+        shifted = np.take_along_axis(padded, source, axis=1)
+        shifted[:, 0] = hp.cumsum(axis=1)[np.arange(count), np.minimum(damage, max_hp)]
+        # Strikes are nearly independent of each other, so the damage variance is about the
+        # sum of every strike's variance (the HP a hit removes is capped by what is left)
+        removed = np.minimum(heights[None, :], damage[:, None])
+        mean = struck @ (hp * removed).sum(axis=1)
+        variance += struck @ (hp * removed ** 2).sum(axis=1) - mean ** 2
+
+        new_hp = hp * (1 - struck[:, None]) + shifted * struck[:, None]
+        attacker_kills[a] = (new_hp[:, 0] - hp[:, 0]).sum()
+        hp = new_hp
+
+    expected_hp = hp @ heights
+    # Summing strikes overestimates the variance when defenders are sure to die (the total
+    # is capped by their HP), and summing defenders overestimates it when they compete for
+    # strikes: both err upwards, so take the smaller one
+    variance = min(variance, float((hp @ heights ** 2 - expected_hp ** 2).sum()))
+    survival = 1.0 - hp[:, 0]
+    return CombatForecast(
+        expected_damage=float((start_hp - expected_hp).sum()),
+        damage_variance=float(max(variance, 0.0)),
+        expected_kills=float(hp[:, 0].sum()),
+        wipe_chance=float(hp[:, 0].prod()),
+        survival=survival,
+        expected_hp=expected_hp,
+        attacker_kills=attacker_kills,
+    )
+
+
+class CombatModel:
+    """
+    Closed-form expected outcome of resolve_attack, for AI evaluation and UI previews.
+
+    Each living attacker strikes once, in order, at a uniformly random living defender. The
+    model tracks every defender's HP as a probability distribution, and assumes defenders
+    live or die independently when working out how likely each one is to be picked. It
+    ignores attackers leveling up in the middle of an exchange, and has no dodge roll:
+    the get_defense resolve_attack calls doesn't dodge. Forecasts are memoized by
+    the units' signatures and HP, so repeated questions cost a dictionary lookup.
+    """
+
+    def forecast(self, attacker, defender, defense_bonus: float = 0.0) -> CombatForecast:
+        attackers = tuple(unit_signature(u) for u in attacker.units if u.is_alive())
+        defenders = tuple((unit_signature(u), u.current_hp) for u in defender.units if u.is_alive())
+        if not attackers or not defenders:
+            empty = np.zeros(len(defenders))
+            return CombatForecast(0.0, 0.0, 0.0, float(not defenders), empty + 1, empty, np.zeros(len(attackers)))
+        return _forecast(attackers, defenders, float(defense_bonus))
+
+    def simulate(self, attacker, defender, defense_bonus: float = 0.0, runs: int = 2000,
+                 seed: int = 0) -> Dict[str, float]:
+        """Monte Carlo the real resolver on copies of the squads, to validate forecasts."""
+        rng = random.Random(seed)
+        damage: List[float] = []
+        kills = wipes = 0
+        start_hp = sum(u.current_hp for u in defender.units if u.is_alive())
+        for _ in range(runs):
+            a, d = copy.deepcopy(attacker), copy.deepcopy(defender)
+            living = sum(1 for u in d.units if u.is_alive())
+            resolve_attack(a, d, defense_bonus, rng=rng)
+            survivors = [u for u in d.units if u.is_alive()]
+            damage.append(start_hp - sum(u.current_hp for u in survivors))
+            kills += living - len(survivors)
+            wipes += not survivors
+        damage_array = np.array(damage)
+        return {
+            'expected_damage': float(damage_array.mean()),
+            'damage_variance': float(damage_array.var()),
+            'expected_kills': kills / runs,
+            'wipe_chance': wipes / runs,
+        }
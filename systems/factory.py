@@ -0,0 +1,151 @@
+import gc
+import random
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from squad import Squad
+from unit import Unit
+from utils.constants import UnitType, UNIT_STATS
+
+UNIT_TYPES = list(UNIT_STATS)
+TYPE_INDEX = {unit_type: i for i, unit_type in enumerate(UNIT_TYPES)}
+Composition = Sequence[Tuple[UnitType, int]]  # (unit type, level) for each unit of a squad
+
+# Rolled stats: (name in base_stats, UNIT_STATS base key, variation key, growth key, halved growth),
+# mirroring Unit._generate_base_stats and Unit.update_stats
+ROLLED_STATS = [
+    ('max_hp', 'base_hp', 'hp_var', 'growth_hp', False),
+    ('strength', 'base_str', 'str_var', 'growth_str', True),
+    ('agility', 'base_agi', 'agi_var', 'growth_agi', True),
+    ('intelligence', 'base_int', 'int_var', 'growth_int', True),
+]
+
+
+def _table(key: str) -> np.ndarray:
+    return np.array([UNIT_STATS[unit_type][key] for unit_type in UNIT_TYPES], dtype=np.int64)
+
+
+BASE = np.stack([_table(stat[1]) for stat in ROLLED_STATS], axis=1)        # [type, stat]
+VARIATION = np.stack([_table(stat[2]) for stat in ROLLED_STATS], axis=1)
+GROWTH = np.stack([_table(stat[3]) for stat in ROLLED_STATS], axis=1)
+HALVED = np.array([stat[4] for stat in ROLLED_STATS])
+
+
+def default_rng() -> np.random.Generator:
+    """A generator seeded from the random module, so random.seed still makes games repeatable."""
+    return np.random.default_rng(random.getrandbits(64))
+
+
+def roll_units(unit_types: Sequence[UnitType], levels: Union[int, Sequence[int]] = 1,
+               rng: Optional[np.random.Generator] = None) -> Dict[str, np.ndarray]:
+    """
+    Roll N units at once, as compact columns instead of Unit objects.
+
+    All stat variations are drawn with a single RNG call from the same ranges as
+    Unit._generate_base_stats. Returns the 'type' (index into UNIT_TYPES) and 'level'
+    columns, the rolled base stats ('base_max_hp', ...) and the leveled stats
+    ('max_hp', ...) as computed by Unit.update_stats.
+    """
+    rng = rng or default_rng()
+    types = np.fromiter((TYPE_INDEX[unit_type] for unit_type in unit_types), dtype=np.int64,
+                        count=len(unit_types))
+    levels = np.broadcast_to(np.asarray(levels, dtype=np.int64), types.shape)
+    variation = VARIATION[types]
+    base = BASE[types] + rng.integers((-variation) // 2, variation // 2, endpoint=True)
+
+    growth = (levels[:, None] - 1) * GROWTH[types]
+    growth = np.where(HALVED, growth // 2, growth)
+    grown = np.maximum(1, base + growth)
+
+    rows = {'type': types, 'level': levels.copy()}
+    for i, (name, *_) in enumerate(ROLLED_STATS):
+        rows['base_' + name] = base[:, i]
+        rows[name] = grown[:, i]
+    return rows
+
+
+def units_from_rows(rows: Dict[str, np.ndarray]) -> List[Unit]:
+    """
+    Build Unit objects from roll_units columns.
+
+    The units are identical to ones built with Unit(unit_type, level) and the same rolls,
+    but their attributes are filled in directly rather than through update_stats.
+    """
+    count = len(rows['type'])
+    if count == 0:
+        return []
+    first_id = Unit.allocate_id()
+    Unit.allocate_id(first_id + count - 1)  # Reserve the whole block of ids
+
+    columns = [rows[key].tolist() for key in ('type', 'level', 'base_max_hp', 'base_strength',
+                                              'base_agility', 'base_intelligence', 'max_hp',
+                                              'strength', 'agility', 'intelligence')]
+    # Per-type constants shared by every unit, as update_stats would set them
+    constants = [(UNIT_STATS[unit_type]['move'], UNIT_STATS[unit_type]['range'],
+                  UNIT_STATS[unit_type]['abilities']) for unit_type in UNIT_TYPES]
+    new = Unit.__new__
+    units = []
+    # Millions of new objects would trigger cyclic GC passes that find nothing to collect
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for offset, (type_index, level, base_hp, base_str, base_agi, base_int,
+                     max_hp, strength, agility, intelligence) in enumerate(zip(*columns)):
+            move, attack_range, abilities = constants[type_index]
+            # Same attributes, in the same order, as Unit.__init__
+            unit = new(Unit)
+            unit.id = first_id + offset
+            unit.unit_type = UNIT_TYPES[type_index]
+            unit.level = level
+            unit.experience = 0
+            unit.kills = 0
+            unit.battles = 0
+            unit.damage_dealt = 0
+            unit.abilities = abilities
+            unit.future_points = 0
+            unit.base_stats = {'max_hp': base_hp, 'strength': base_str, 'agility': base_agi,
+                               'intelligence': base_int, 'move': move, 'range': attack_range}
+            unit.max_hp = max_hp
+            unit.strength = strength
+            unit.agility = agility
+            unit.intelligence = intelligence
+            unit.move = move
+            unit.range = attack_range
+            unit.speed = 5
+            unit.current_hp = max_hp
+            units.append(unit)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return units
+
+
+def create_units(unit_types: Sequence[UnitType], levels: Union[int, Sequence[int]] = 1,
+                 rng: Optional[np.random.Generator] = None) -> List[Unit]:
+    """Create new units of the given types and levels (one level for all, or one each)."""
+    return units_from_rows(roll_units(unit_types, levels, rng))
+
+
+def create_squads(compositions: Sequence[Composition], positions: Sequence[Tuple[int, int]],
+                  colors: Optional[Sequence[Tuple[int, int, int]]] = None,
+                  names: Optional[Sequence[str]] = None,
+                  rng: Optional[np.random.Generator] = None) -> List[Squad]:
+    """
+    Create one squad per composition, at the matching position.
+
+    The units of every squad are rolled together. Colors and names default to what
+    Squad picks when none are given. Compositions longer than 9 units are cut short,
+    as Squad.add_unit would.
+    """
+    compositions = [list(composition)[:9] for composition in compositions]
+    unit_types = [unit_type for composition in compositions for unit_type, _ in composition]
+    levels = [level for composition in compositions for _, level in composition]
+    units = create_units(unit_types, levels, rng)
+
+    squads = []
+    start = 0
+    for i, (composition, (x, y)) in enumerate(zip(compositions, positions)):
+        squad = Squad(x, y, color=colors[i] if colors else None, name=names[i] if names else None)
+        squad.units = units[start:start + len(composition)]
+        start += len(composition)
+        squads.append(squad)
+    return squads
@@ -0,0 +1,212 @@
+import sys
+from collections import deque
+from typing import Any, Dict, List, Optional, Set, Tuple
+from state_diff import (
+    GAME_FIELDS, capture_game, capture_squad, diff_fields, diff_squad, squad_record, apply_patch
+)
+from utils.constants import UNDO_LIMIT, UNDO_MEMORY_LIMIT
+
+SquadImage = Optional[Tuple]  # A state_diff squad capture, or None if the squad didn't exist
+
+
+class HistoryStep:
+    """One undoable action: before/after images of just the squads it touched."""
+
+    def __init__(self, label: str, squads: Dict[int, Tuple[SquadImage, SquadImage]],
+                 game: Tuple[Tuple, Tuple], log: Tuple[int, List[str]],
+                 order: Optional[Tuple[List[int], List[int]]]):
+        self.label = label
+        self.squads = squads  # Squad id -> (before, after)
+        self.game = game      # (before, after) game fields
+        self.log = log        # (log length before, entries appended)
+        self.order = order    # (ids before, ids after), only if squads were added or removed
+        self.size = _estimate_size(self)
+
+
+def _estimate_size(value, seen: Set[int] = None) -> int:
+    """Approximate bytes held by a step (shared objects are counted once)."""
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_estimate_size(key, seen) + _estimate_size(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_estimate_size(item, seen) for item in value)
+    elif isinstance(value, HistoryStep):
+        size += _estimate_size((value.squads, value.game, value.log, value.order), seen)
+    return size
+
+
+class UndoHistory:
+    """
+    Bounded undo/redo history for a GameState.
+
+    The history keeps a copy-on-write image (a state_diff capture) of every squad. Squads
+    reported by GameState listener events since the last commit are re-captured when an
+    action is committed, and the step stores only their before and after images; the
+    untouched squads are never copied. Steps are dropped oldest first once there are more
+    than limit of them or they hold more than memory_limit bytes.
+    """
+
+    def __init__(self, game_state, limit: int = UNDO_LIMIT, memory_limit: int = UNDO_MEMORY_LIMIT):
+        self.game_state = game_state
+        self.limit = limit
+        self.memory_limit = memory_limit
+        self.undo_stack: deque = deque()
+        self.redo_stack: List[HistoryStep] = []
+        self.memory_used = 0  # Approximate bytes held by both stacks
+        self.images: Dict[int, Tuple] = {}  # Squad id -> image as of the last commit
+        self.order: List[int] = []
+        self.game: Tuple = ()
+        self.log_length = 0
+        self.dirty: Set[object] = set()
+        self._squads_ref = None
+        game_state.add_listener(self.on_squad_event)
+
+    def on_squad_event(self, event: str, squad) -> None:
+        """GameState listener: remember which squads the current action touched."""
+        self.dirty.add(squad)
+
+    def reset(self) -> None:
+        """Forget all history and take a fresh baseline (after a new game or a load)."""
+        self._squads_ref = self.game_state.squads
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.memory_used = 0
+        self.images = {squad.id: capture_squad(squad) for squad in self.game_state.squads}
+        self.order = list(self.images)
+        self.game = capture_game(self.game_state)
+        self.log_length = len(self.game_state.combat_log)
+        self.dirty.clear()
+
+    def commit(self, label: str) -> Optional[HistoryStep]:
+        """
+        Record everything that changed since the last commit as one undoable step.
+        Returns the step, or None if nothing changed.
+        """
+        if self._squads_ref is not self.game_state.squads:
+            self.reset()
+            return None
+
+        squads = self.game_state.squads
+        changed: Dict[int, Tuple[SquadImage, SquadImage]] = {}
+        order = None
+        present = None
+        if len(squads) != len(self.order) or any(squad.id not in self.images for squad in self.dirty):
+            # Squads may have been added or removed: compare membership (an id scan, no captures)
+            current_ids = [squad.id for squad in squads]
+            present = set(current_ids)
+            for squad_id in self.order:
+                if squad_id not in present:
+                    changed[squad_id] = (self.images[squad_id], None)
+            self.dirty.update(squad for squad in squads if squad.id not in self.images)
+            if current_ids != self.order:
+                order = (self.order, current_ids)
+
+        for squad in self.dirty:
+            if squad.id in changed or (present is not None and squad.id not in present):
+                continue  # No longer (or never) in the game
+            before = self.images.get(squad.id)
+            after = capture_squad(squad)
+            if before != after:
+                changed[squad.id] = (before, after)
+        self.dirty.clear()
+
+        game = capture_game(self.game_state)
+        log = self.game_state.combat_log
+        if not changed and game == self.game and len(log) == self.log_length and order is None:
+            return None
+
+        step = HistoryStep(label, changed, (self.game, game), (self.log_length, log[self.log_length:]), order)
+        self._advance(step, forward=True)
+        self.undo_stack.append(step)
+        self.memory_used += step.size
+        for dropped in self.redo_stack:
+            self.memory_used -= dropped.size
+        self.redo_stack.clear()
+        self._trim()
+        return step
+
+    def _advance(self, step: HistoryStep, forward: bool) -> None:
+        """Move the stored images to one side of a step."""
+        side = 1 if forward else 0
+        for squad_id, images in step.squads.items():
+            if images[side] is None:
+                self.images.pop(squad_id, None)
+            else:
+                self.images[squad_id] = images[side]
+        if step.order is not None:
+            self.order = list(step.order[side])
+        self.game = step.game[side]
+        self.log_length = step.log[0] + (len(step.log[1]) if forward else 0)
+
+    def _trim(self) -> None:
+        while self.undo_stack and (len(self.undo_stack) > self.limit or self.memory_used > self.memory_limit):
+            self.memory_used -= self.undo_stack.popleft().size
+
+    def _build_patch(self, step: HistoryStep, forward: bool) -> Dict[str, Any]:
+        """Build the state_diff patch that moves the game across a step."""
+        source, target = (0, 1) if forward else (1, 0)
+        patch: Dict[str, Any] = {}
+        changed, added, removed = [], [], []
+        for squad_id, images in step.squads.items():
+            old, new = images[source], images[target]
+            if old is None:
+                added.append(squad_record(squad_id, new))
+            elif new is None:
+                removed.append(squad_id)
+            else:
+                squad_patch = diff_squad(old, new)
+                if squad_patch:
+                    changed.append([squad_id, squad_patch])
+        if changed:
+            patch['squads'] = changed
+        if added:
+            patch['add'] = added
+        if removed:
+            patch['remove'] = removed
+        if step.order is not None:
+            patch['order'] = list(step.order[target])
+
+        game = diff_fields(GAME_FIELDS, step.game[source], step.game[target])
+        if game:
+            patch['game'] = game
+        log_length, appended = step.log
+        if appended:
+            if forward:
+                patch['log'] = list(appended)
+            else:
+                patch.setdefault('game', {})['combat_log'] = self.game_state.combat_log[:log_length]
+        return patch
+
+    def can_undo(self) -> bool:
+        return bool(self.undo_stack)
+
+    def can_redo(self) -> bool:
+        return bool(self.redo_stack)
+
+    def undo(self) -> Optional[str]:
+        """Revert the last step. Returns its label, or None if there is nothing to undo."""
+        self.commit("Unrecorded changes")  # Don't lose changes made without a commit
+        if not self.undo_stack:
+            return None
+        step = self.undo_stack.pop()
+        apply_patch(self.game_state, self._build_patch(step, forward=False))
+        self._advance(step, forward=False)
+        self.dirty.clear()  # Events from applying the patch aren't a new action
+        self.redo_stack.append(step)
+        return step.label
+
+    def redo(self) -> Optional[str]:
+        """Reapply the last undone step. Returns its label, or None if there is nothing to redo."""
+        if not self.redo_stack or self.commit("Unrecorded changes") is not None:
+            return None  # Anything committed just now cleared the redo stack
+        step = self.redo_stack.pop()
+        apply_patch(self.game_state, self._build_patch(step, forward=True))
+        self._advance(step, forward=True)
+        self.dirty.clear()
+        self.undo_stack.append(step)
+        return step.label
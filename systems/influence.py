@@ -0,0 +1,153 @@
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+Faction = Tuple[int, int, int]
+
+
+class InfluenceMap:
+    """
+    Per-faction threat maps over the grid, backed by NumPy arrays.
+
+    Every living squad stamps a diamond-shaped kernel covering the cells it can
+    reach and hit next turn (effective move range plus maximum attack range),
+    weighted by its total power. Stamps are remembered, so when a squad moves,
+    dies or its range changes, only its old stamp is subtracted and the new one
+    added. Squads belong to the faction of their color, as in move_squad.
+    """
+
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.maps: Dict[Faction, np.ndarray] = {}  # Influence of each faction, as [y, x]
+        self.total: Optional[np.ndarray] = None    # Sum over all factions
+        # Squad -> (faction, x, y, radius, weight) it is currently stamped with
+        self.stamps: Dict[object, Tuple[Faction, int, int, int, float]] = {}
+        self.kernels: Dict[int, np.ndarray] = {}
+        self.version = 0  # Bumped whenever any map changes
+        self._squads_ref = None
+        game_state.add_listener(self.on_squad_event)
+
+    @staticmethod
+    def get_faction(squad) -> Faction:
+        """Get the faction a squad belongs to."""
+        return tuple(squad.color)
+
+    @staticmethod
+    def get_threat_radius(squad) -> int:
+        """Get how far (in Manhattan distance) a squad threatens next turn."""
+        return squad.get_effective_move_range() + squad.get_effective_attack_range()[1]
+
+    def get_kernel(self, radius: int) -> np.ndarray:
+        """Get the (cached) diamond of cells within a Manhattan radius, as a 0/1 array."""
+        kernel = self.kernels.get(radius)
+        if kernel is None:
+            offsets = np.abs(np.arange(-radius, radius + 1))
+            kernel = ((offsets[:, None] + offsets[None, :]) <= radius).astype(np.float32)
+            self.kernels[radius] = kernel
+        return kernel
+
+    # Maintenance
+
+    def sync(self) -> None:
+        """Rebuild if the squad list was replaced (e.g. on load) or the grid was resized."""
+        shape = (self.game_state.height, self.game_state.width)
+        if self._squads_ref is not self.game_state.squads or self.total is None or self.total.shape != shape:
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        """Restamp every squad from scratch."""
+        self._squads_ref = self.game_state.squads
+        self.maps.clear()
+        self.stamps.clear()
+        self.total = np.zeros((self.game_state.height, self.game_state.width), dtype=np.float64)
+        for squad in self.game_state.squads:
+            self.update_squad(squad)
+        self.version += 1
+
+    def on_squad_event(self, event: str, squad) -> None:
+        """GameState listener: restamp the squad that changed."""
+        if self._squads_ref is not self.game_state.squads or self.total is None:
+            return  # Rebuilt lazily on the next query
+        if event == 'removed':
+            self.remove_squad(squad)
+        else:
+            self.update_squad(squad)
+
+    def update_squad(self, squad) -> None:
+        """Replace a squad's stamp if its position, range or power changed."""
+        if not squad.is_alive():
+            self.remove_squad(squad)
+            return
+        stamp = (self.get_faction(squad), squad.x, squad.y, self.get_threat_radius(squad), squad.get_total_power())
+        old = self.stamps.get(squad)
+        if old == stamp:
+            return
+        if old is not None:
+            self._apply(old, -1)
+        self._apply(stamp, 1)
+        self.stamps[squad] = stamp
+        self.version += 1
+
+    def remove_squad(self, squad) -> None:
+        """Remove a dead or removed squad's stamp."""
+        old = self.stamps.pop(squad, None)
+        if old is not None:
+            self._apply(old, -1)
+            self.version += 1
+
+    def _apply(self, stamp: Tuple[Faction, int, int, int, float], sign: int) -> None:
+        faction, x, y, radius, weight = stamp
+        height, width = self.total.shape
+        # Clip the kernel to the grid
+        x0, x1 = max(0, x - radius), min(width, x + radius + 1)
+        y0, y1 = max(0, y - radius), min(height, y + radius + 1)
+        if x0 >= x1 or y0 >= y1:
+            return
+        kernel = self.get_kernel(radius)[y0 - (y - radius):y1 - (y - radius), x0 - (x - radius):x1 - (x - radius)]
+        contribution = kernel * (sign * weight)
+
+        faction_map = self.maps.get(faction)
+        if faction_map is None:
+            faction_map = self.maps[faction] = np.zeros_like(self.total)
+        faction_map[y0:y1, x0:x1] += contribution
+        self.total[y0:y1, x0:x1] += contribution
+
+    # Queries
+
+    def get_influence(self, faction: Faction) -> np.ndarray:
+        """Get a faction's own influence map (read-only)."""
+        self.sync()
+        faction_map = self.maps.get(faction)
+        if faction_map is None:
+            faction_map = np.zeros_like(self.total)
+        view = faction_map.view()
+        view.flags.writeable = False
+        return view
+
+    def get_danger(self, x: int, y: int, faction: Faction) -> float:
+        """Get the total power of enemy squads threatening a cell."""
+        self.sync()
+        own = self.maps.get(faction)
+        danger = self.total[y, x] - (own[y, x] if own is not None else 0.0)
+        return max(0.0, float(danger))
+
+    def get_danger_map(self, faction: Faction) -> np.ndarray:
+        """Get the enemy threat on every cell for a faction."""
+        self.sync()
+        own = self.maps.get(faction)
+        danger = self.total - own if own is not None else self.total.copy()
+        # Subtracting stamps leaves float noise around zero
+        np.maximum(danger, 0.0, out=danger)
+        return danger
+
+    def find_safest_tile(self, squad) -> Tuple[int, int]:
+        """Get the cell the squad can reach this turn with the least enemy threat (nearest on ties)."""
+        self.sync()
+        reachable = self.game_state.pathfinder.get_reachable_cells(squad, squad.get_effective_move_range())
+        cells = list(reachable)
+        xs = np.fromiter((x for x, _ in cells), dtype=np.intp, count=len(cells))
+        ys = np.fromiter((y for _, y in cells), dtype=np.intp, count=len(cells))
+        costs = np.fromiter((reachable[cell] for cell in cells), dtype=np.float32, count=len(cells))
+        own = self.maps.get(self.get_faction(squad))
+        danger = self.total[ys, xs] - (own[ys, xs] if own is not None else 0.0)
+        best = np.lexsort((costs, np.round(danger, 3)))[0]
+        return cells[best]
@@ -0,0 +1,220 @@
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from utils.constants import MEMORY_TRACE_FRAMES, MEMORY_REPORT_TOP, MEMORY_LEAK_TURNS
+
+# Shared by everything (code, not game data): never counted or walked into
+OPAQUE_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+# Allocations of the tracing and reporting machinery itself
+TRACE_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# GameState attributes counted under each subsystem, in the order they claim objects
+SERVICES = ('occupancy', 'pathfinder', 'influence', 'visibility', 'statistics', 'unit_index',
+            'combat_model', 'turns', 'battle_resolver')
+
+
+def surface_bytes(obj) -> int:
+    """Pixel bytes of a pygame Surface (sys.getsizeof only counts the wrapper)."""
+    get_pitch = getattr(type(obj), 'get_pitch', None)
+    if get_pitch is None or not hasattr(obj, 'get_height'):
+        return 0
+    return get_pitch(obj) * obj.get_height()
+
+
+def deep_size(roots: Iterable, seen: Set[int]) -> Tuple[int, int]:
+    """
+    Bytes and count of the objects reachable from roots, skipping those already in seen
+    (the ids of the objects counted are added to it, so objects shared between
+    subsystems are counted once, by the first one that reaches them).
+    """
+    size = count = 0
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, OPAQUE_TYPES):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj) + surface_bytes(obj)
+        count += 1
+        stack.extend(gc.get_referents(obj))
+    return size, count
+
+
+def site(traceback: tracemalloc.Traceback) -> str:
+    """'file:line' of an allocation, relative to the repository when it is in it."""
+    frame = traceback[0]
+    filename = frame.filename
+    if filename.startswith(ROOT):
+        filename = os.path.relpath(filename, ROOT)
+    return f"{filename}:{frame.lineno}"
+
+
+class MemoryTracker:
+    """
+    Allocation tracking with tracemalloc, compared snapshot to snapshot.
+
+    Each snapshot is compared with the previous one, keeping the allocation sites that
+    grew most. A site that grows in leak_turns snapshots in a row is reported as a
+    possible leak. Add tracker.phase to the turn pipeline to take a snapshot every turn
+    (memory reports then reuse the snapshot of the current turn).
+    Tracing slows allocations down, so it only starts with the first snapshot.
+    """
+
+    def __init__(self, frames: int = MEMORY_TRACE_FRAMES, leak_turns: int = MEMORY_LEAK_TURNS,
+                 top: int = MEMORY_REPORT_TOP):
+        self.frames = frames
+        self.leak_turns = leak_turns
+        self.top = top
+        self.previous: Optional[tracemalloc.Snapshot] = None
+        self.turn: Optional[int] = None  # Turn the previous snapshot was taken on
+        self.growth: List[Tuple[str, int, int]] = []  # (site, bytes, blocks) grown since the previous snapshot
+        self.net_growth = 0  # Bytes traced now minus at the previous snapshot
+        self.streaks: Dict[str, int] = {}  # Site -> snapshots in a row it grew in
+        self._started = False
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started = True
+
+    def stop(self) -> None:
+        """Stop tracing (if this tracker started it) and forget the snapshots."""
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+        self.previous = None
+        self.turn = None
+        self.growth = []
+        self.net_growth = 0
+        self.streaks.clear()
+
+    def take(self, turn: Optional[int] = None) -> tracemalloc.Snapshot:
+        """Take a snapshot (of the given turn) and compare it with the previous one."""
+        self.start()
+        snapshot = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+        if self.previous is not None:
+            diffs = snapshot.compare_to(self.previous, 'lineno')
+            grown = [(site(stat.traceback), stat.size_diff, stat.count_diff) for stat in diffs if stat.size_diff > 0]
+            self.growth = grown[:self.top]
+            self.net_growth = sum(stat.size_diff for stat in diffs)
+            self.streaks = {name: self.streaks.get(name, 0) + 1 for name, _, _ in grown}
+        self.previous = snapshot
+        self.turn = turn
+        return snapshot
+
+    def suspects(self) -> List[Tuple[str, int]]:
+        """Sites that grew in at least leak_turns snapshots in a row, with their streak."""
+        return sorted(((name, streak) for name, streak in self.streaks.items() if streak >= self.leak_turns),
+                      key=lambda item: -item[1])
+
+    def phase(self, game_state) -> Dict[str, float]:
+        """Turn pipeline phase taking a snapshot every turn."""
+        self.take(game_state.current_turn)
+        current, peak = tracemalloc.get_traced_memory()
+        return {'traced_kb': round(current / 1024), 'growth_kb': round(self.net_growth / 1024),
+                'suspects': len(self.suspects())}
+
+
+class MemoryReport:
+    """Bytes by subsystem and, when tracing, the biggest and fastest-growing allocation sites."""
+
+    def __init__(self, turn: int):
+        self.turn = turn
+        self.subsystems: Dict[str, Tuple[int, int]] = {}  # Name -> (bytes, objects)
+        self.units = 0
+        self.save_buffer: Optional[int] = None  # Bytes held while saving, if measured
+        self.traced: Optional[Tuple[int, int]] = None  # (current, peak) bytes traced by tracemalloc
+        self.top_files: List[Tuple[str, int]] = []
+        self.growth: List[Tuple[str, int, int]] = []
+        self.suspects: List[Tuple[str, int]] = []
+
+    @property
+    def total(self) -> int:
+        return sum(size for size, _ in self.subsystems.values())
+
+    def to_dict(self) -> dict:
+        return {
+            'turn': self.turn,
+            'subsystems': {name: {'bytes': size, 'objects': count} for name, (size, count) in self.subsystems.items()},
+            'total': self.total, 'units': self.units, 'save_buffer': self.save_buffer,
+            'traced': list(self.traced) if self.traced else None,
+            'top_files': self.top_files, 'growth': self.growth, 'suspects': self.suspects,
+        }
+
+    def format(self) -> str:
+        lines = [f"Memory on turn {self.turn}: {self.total / 2 ** 20:.1f} MB of game objects"]
+        for name, (size, count) in self.subsystems.items():
+            lines.append(f"  {name:<14} {size / 2 ** 20:9.2f} MB  {count:>10,} objects")
+        if self.units:
+            size = self.subsystems['units'][0]
+            lines.append(f"  {self.units:,} units, {size / self.units:.0f} bytes each")
+        if self.save_buffer is not None:
+            lines.append(f"  Saving holds another {self.save_buffer / 2 ** 20:.2f} MB")
+        if self.traced:
+            current, peak = self.traced
+            lines.append(f"Traced: {current / 2 ** 20:.1f} MB now, {peak / 2 ** 20:.1f} MB peak")
+            lines.extend(f"  {size / 1024:10.1f} KB  {name}" for name, size in self.top_files)
+        if self.growth:
+            lines.append("Grown since the last snapshot:")
+            lines.extend(f"  {size / 1024:+10.1f} KB  {blocks:+8} blocks  {name}" for name, size, blocks in self.growth)
+        if self.suspects:
+            lines.append("Possible leaks (growing every snapshot):")
+            lines.extend(f"  {name} ({streak} in a row)" for name, streak in self.suspects)
+        return "\n".join(lines)
+
+
+def memory_report(game_state, ui: Optional[Dict[str, object]] = None, tracker: Optional[MemoryTracker] = None,
+                  include_save: bool = True, top: int = MEMORY_REPORT_TOP) -> MemoryReport:
+    """
+    Break down the memory held by a game by subsystem: units, squads, combat log, terrain,
+    undo history, services, the rest of the game state and the given UI objects (name ->
+    object, e.g. sprite caches). Sizes are deep: everything reachable from a subsystem
+    that no earlier subsystem reached. Works headless; the UI objects are optional.
+
+    include_save also measures what saving holds on top (the save dict and its JSON
+    text), and a tracker adds a tracemalloc snapshot compared with its previous one.
+    """
+    report = MemoryReport(game_state.current_turn)
+    if tracker is not None:
+        # Before walking the objects, so the walk's own bookkeeping isn't in the snapshot
+        snapshot = tracker.previous
+        if snapshot is None or tracker.turn != game_state.current_turn:
+            snapshot = tracker.take(game_state.current_turn)
+        report.traced = tracemalloc.get_traced_memory()
+        report.top_files = [(site(stat.traceback).rsplit(':', 1)[0], stat.size)
+                            for stat in snapshot.statistics('filename')[:top]]
+        report.growth = tracker.growth
+        report.suspects = tracker.suspects()
+
+    units = [unit for squad in game_state.squads for unit in squad.units]
+    report.units = len(units)
+    seen = {id(game_state)}  # Services point back at the game state: don't walk it again
+    subsystems = [
+        ('units', units),
+        ('squads', [game_state.squads]),
+        ('combat log', [game_state.combat_log]),
+        ('terrain', [game_state.terrain]),
+        ('history', [game_state.history]),
+        ('services', [getattr(game_state, name) for name in SERVICES if hasattr(game_state, name)]),
+        ('game state', [vars(game_state)]),
+    ]
+    if ui:
+        subsystems.append(('ui', list(ui.values())))
+    for name, roots in subsystems:
+        report.subsystems[name] = deep_size(roots, seen)
+
+    if include_save:
+        data = game_state.to_dict()
+        report.save_buffer = deep_size([data], set())[0] + sys.getsizeof(json.dumps(data, indent=2))
+    return report
@@ -0,0 +1,142 @@
+import numpy as np
+from typing import Dict, List, Tuple
+from utils.constants import IMPASSABLE_COST
+
+
+class Footprint:
+    """The cells a squad covers relative to its anchor, as a boolean mask over their bounding box."""
+
+    def __init__(self, offsets: List[Tuple[int, int]]):
+        self.offsets = offsets
+        if offsets:
+            self.min_dx = min(dx for dx, _ in offsets)
+            self.min_dy = min(dy for _, dy in offsets)
+            width = max(dx for dx, _ in offsets) - self.min_dx + 1
+            height = max(dy for _, dy in offsets) - self.min_dy + 1
+        else:
+            self.min_dx = self.min_dy = 0
+            width = height = 0
+        self.mask = np.zeros((height, width), dtype=bool)
+        for dx, dy in offsets:
+            self.mask[dy - self.min_dy, dx - self.min_dx] = True
+
+
+class OccupancyGrid:
+    """
+    NumPy occupancy of the grid by squad formations.
+
+    Each cell counts the living units standing on it (normally 0 or 1; counts keep
+    the grid correct if squads were ever placed overlapping). Footprint masks are
+    precomputed per formation and set of living slots, so checking whether a whole
+    squad fits at a destination is O(footprint) and finding every valid destination
+    is a handful of vectorized array operations.
+    """
+
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.counts = None    # Units per cell, as [y, x]
+        self.passable = None  # Terrain that can be entered, as [y, x]
+        self.squad_cells: Dict[object, List[Tuple[int, int]]] = {}
+        self.footprints: Dict[Tuple, Footprint] = {}
+        self._squads_ref = None
+        game_state.add_listener(self.on_squad_event)
+
+    # Maintenance
+
+    def sync(self) -> None:
+        """Rebuild if the squad list was replaced (e.g. on load) or the grid was resized."""
+        shape = (self.game_state.height, self.game_state.width)
+        if self._squads_ref is not self.game_state.squads or self.counts is None or self.counts.shape != shape:
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        """Recompute occupancy and passability from scratch."""
+        self._squads_ref = self.game_state.squads
+        shape = (self.game_state.height, self.game_state.width)
+        self.counts = np.zeros(shape, dtype=np.uint16)
+        self.squad_cells.clear()
+        self.invalidate_terrain()
+        for squad in self.game_state.squads:
+            self._place(squad)
+
+    def invalidate_terrain(self) -> None:
+        """Recompute which cells can be entered after terrain changed."""
+        terrain = self.game_state.terrain
+        self.passable = np.array(
+            [[cell['movement_cost'] < IMPASSABLE_COST for cell in row] for row in terrain],
+            dtype=bool
+        ).reshape(self.game_state.height, self.game_state.width)
+
+    def on_squad_event(self, event: str, squad) -> None:
+        """GameState listener: move the squad's cells in the grid."""
+        if self._squads_ref is not self.game_state.squads or self.counts is None:
+            return  # Rebuilt lazily on the next query
+        self._remove(squad)
+        if event != 'removed':
+            self._place(squad)
+
+    def _place(self, squad) -> None:
+        cells = [(x, y) for x, y, _ in squad.get_unit_positions()
+                 if 0 <= x < self.game_state.width and 0 <= y < self.game_state.height]
+        if cells:
+            xs, ys = zip(*cells)
+            np.add.at(self.counts, (list(ys), list(xs)), 1)
+            self.squad_cells[squad] = cells
+
+    def _remove(self, squad) -> None:
+        cells = self.squad_cells.pop(squad, None)
+        if cells:
+            xs, ys = zip(*cells)
+            np.subtract.at(self.counts, (list(ys), list(xs)), 1)
+
+    # Footprints
+
+    def get_footprint(self, squad) -> Footprint:
+        """Get the (cached) footprint of a squad's living units in its formation."""
+        offsets = []
+        for i, unit in enumerate(squad.units):
+            if unit.is_alive():
+                offsets.append(tuple(squad.formation[i]) if i < len(squad.formation) else (0, 0))
+        key = tuple(sorted(set(offsets)))
+        footprint = self.footprints.get(key)
+        if footprint is None:
+            footprint = self.footprints[key] = Footprint(list(key))
+        return footprint
+
+    def fits(self, squad, x: int, y: int) -> bool:
+        """Check if the squad's whole footprint fits with its anchor at (x, y)."""
+        self.sync()
+        footprint = self.get_footprint(squad)
+        if not footprint.offsets:
+            return True
+        height, width = footprint.mask.shape
+        x0, y0 = x + footprint.min_dx, y + footprint.min_dy
+        if x0 < 0 or y0 < 0 or x0 + width > self.game_state.width or y0 + height > self.game_state.height:
+            return False
+
+        region = self.counts[y0:y0 + height, x0:x0 + width].astype(np.int32)
+        # The squad doesn't block itself
+        for cx, cy in self.squad_cells.get(squad, ()):
+            if x0 <= cx < x0 + width and y0 <= cy < y0 + height:
+                region[cy - y0, cx - x0] -= 1
+        blocked = (region > 0) | ~self.passable[y0:y0 + height, x0:x0 + width]
+        return not blocked[footprint.mask].any()
+
+    def get_valid_destinations(self, squad) -> np.ndarray:
+        """Get a [y, x] boolean map of every anchor position where the squad's footprint fits."""
+        self.sync()
+        counts = self.counts.astype(np.int32)
+        for cx, cy in self.squad_cells.get(squad, ()):
+            counts[cy, cx] -= 1
+        free = (counts <= 0) & self.passable
+
+        grid_height, grid_width = free.shape
+        valid = np.ones_like(free)
+        for dx, dy in self.get_footprint(squad).offsets:
+            # valid[y, x] requires free[y + dy, x + dx]; anchors that push the cell off the grid are invalid
+            shifted = np.zeros_like(free)
+            src_y0, src_y1 = max(0, dy), grid_height + min(0, dy)
+            src_x0, src_x1 = max(0, dx), grid_width + min(0, dx)
+            shifted[src_y0 - dy:src_y1 - dy, src_x0 - dx:src_x1 - dx] = free[src_y0:src_y1, src_x0:src_x1]
+            valid &= shifted
+        return valid
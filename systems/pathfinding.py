@@ -0,0 +1,333 @@
+import heapq
+from typing import Dict, List, Optional, Set, Tuple
+from utils.constants import IMPASSABLE_COST, FLOW_FIELD_OCCUPIED_COST
+
+INF = float('inf')
+NEIGHBORS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+
+class FlowField:
+    """
+    Distance to a goal from every cell of the grid.
+
+    One field is shared by every squad heading to the same goal: each squad just
+    steps to the neighbor with the lowest distance. Entering a cell costs its
+    terrain cost, plus a penalty if another squad stands there.
+    """
+
+    def __init__(self, goal: Tuple[int, int], width: int, height: int):
+        self.goal = goal
+        self.width = width
+        self.height = height
+        self.distance: List[float] = [INF] * (width * height)
+
+    def get_distance(self, x: int, y: int) -> float:
+        """Get the cost of the cheapest route from (x, y) to the goal."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return INF
+        return self.distance[y * self.width + x]
+
+    def get_next_step(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """Get the neighbor to step to from (x, y), or None at the goal or if unreachable."""
+        best = None
+        best_distance = self.get_distance(x, y)
+        for dx, dy in NEIGHBORS:
+            distance = self.get_distance(x + dx, y + dy)
+            if distance < best_distance:
+                best, best_distance = (x + dx, y + dy), distance
+        return best
+
+
+class Pathfinder:
+    """
+    Pathfinding over the game grid with terrain costs.
+
+    Single squads get exact A* routes around other squads. Squads sharing a
+    destination use a cached FlowField for it. Occupancy is tracked through
+    GameState squad events, and cached fields are repaired locally when cells are
+    vacated or occupied instead of being recomputed.
+    """
+
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.occupied: Dict[Tuple[int, int], object] = {}  # Cell -> squad standing there
+        self.squad_cells: Dict[object, Set[Tuple[int, int]]] = {}
+        self.fields: Dict[Tuple[int, int], FlowField] = {}
+        self._squads_ref = None  # The squad list the occupancy was built from
+        game_state.add_listener(self.on_squad_event)
+
+    # Occupancy
+
+    def sync(self) -> None:
+        """Rebuild everything if the game state's squad list was replaced (e.g. on load)."""
+        if self._squads_ref is not self.game_state.squads:
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        """Recompute occupancy from every squad and drop all cached flow fields."""
+        self._squads_ref = self.game_state.squads
+        self.occupied.clear()
+        self.squad_cells.clear()
+        self.fields.clear()
+        for squad in self.game_state.squads:
+            self._set_squad_cells(squad, self._get_squad_cells(squad))
+
+    def on_squad_event(self, event: str, squad) -> None:
+        """GameState listener: update occupancy and repair flow fields around changed cells."""
+        if self._squads_ref is not self.game_state.squads:
+            return  # Rebuilt lazily on the next query
+        old_cells = self.squad_cells.get(squad, set())
+        new_cells = set() if event == 'removed' else self._get_squad_cells(squad)
+        if old_cells == new_cells:
+            return
+
+        # Apply the change one cell at a time so each field repair sees consistent costs
+        for cell in old_cells - new_cells:
+            old_cost = self.get_field_cost(*cell)
+            if self.occupied.get(cell) is squad:
+                del self.occupied[cell]
+            self._repair_fields(cell, old_cost)
+        for cell in new_cells - old_cells:
+            old_cost = self.get_field_cost(*cell)
+            self.occupied[cell] = squad
+            self._repair_fields(cell, old_cost)
+
+        if new_cells:
+            self.squad_cells[squad] = new_cells
+        else:
+            self.squad_cells.pop(squad, None)
+
+    @staticmethod
+    def _get_squad_cells(squad) -> Set[Tuple[int, int]]:
+        return {(x, y) for x, y, _ in squad.get_unit_positions()}
+
+    def _set_squad_cells(self, squad, cells: Set[Tuple[int, int]]) -> None:
+        for cell in self.squad_cells.pop(squad, set()):
+            if self.occupied.get(cell) is squad:
+                del self.occupied[cell]
+        if cells:
+            self.squad_cells[squad] = cells
+            for cell in cells:
+                self.occupied[cell] = squad
+
+    def get_squad_at(self, x: int, y: int):
+        """Get the squad occupying a cell, if any."""
+        self.sync()
+        return self.occupied.get((x, y))
+
+    # Costs
+
+    def get_terrain_cost(self, x: int, y: int) -> Optional[int]:
+        """Get the cost of entering a cell, or None if it is off the grid or impassable."""
+        if not (0 <= x < self.game_state.width and 0 <= y < self.game_state.height):
+            return None
+        cost = self.game_state.terrain[y][x]['movement_cost']
+        return None if cost >= IMPASSABLE_COST else cost
+
+    def get_field_cost(self, x: int, y: int) -> Optional[int]:
+        """Cost of entering a cell in a flow field: terrain plus a penalty if occupied."""
+        cost = self.get_terrain_cost(x, y)
+        if cost is not None and (x, y) in self.occupied:
+            cost += FLOW_FIELD_OCCUPIED_COST
+        return cost
+
+    def invalidate_terrain(self) -> None:
+        """Drop cached flow fields after terrain changed."""
+        self.fields.clear()
+
+    # A*
+
+    def find_path(self, squad, goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Find the cheapest route for a squad's anchor cell to the goal with A*.
+        Anchor cells where the squad's formation would overlap other squads are
+        avoided, except the goal itself (an enemy there is the target). Returns the cells to step through, excluding
+        the start, or None if the goal cannot be reached.
+        """
+        self.sync()
+        start = (squad.x, squad.y)
+        if start == goal:
+            return []
+        if self.get_terrain_cost(*goal) is None:
+            return None
+
+        # Anchor cells where the squad's whole formation fits
+        valid = self.game_state.occupancy.get_valid_destinations(squad)
+        gx, gy = goal
+        open_heap = [(abs(start[0] - gx) + abs(start[1] - gy), 0, start)]
+        came_from = {start: None}
+        best_cost = {start: 0}
+        while open_heap:
+            _, cost, cell = heapq.heappop(open_heap)
+            if cell == goal:
+                path = []
+                while cell != start:
+                    path.append(cell)
+                    cell = came_from[cell]
+                return path[::-1]
+            if cost > best_cost[cell]:
+                continue
+
+            x, y = cell
+            for dx, dy in NEIGHBORS:
+                nx, ny = x + dx, y + dy
+                step_cost = self.get_terrain_cost(nx, ny)
+                if step_cost is None:
+                    continue
+                if not valid[ny, nx] and (nx, ny) != goal:
+                    continue
+                new_cost = cost + step_cost
+                if new_cost < best_cost.get((nx, ny), INF):
+                    best_cost[(nx, ny)] = new_cost
+                    came_from[(nx, ny)] = cell
+                    # Every step costs at least 1, so Manhattan distance is admissible
+                    heuristic = abs(nx - gx) + abs(ny - gy)
+                    heapq.heappush(open_heap, (new_cost + heuristic, new_cost, (nx, ny)))
+        return None
+
+    def get_reachable_cells(self, squad, move_points: int) -> Dict[Tuple[int, int], int]:
+        """
+        Get every cell a squad's anchor can reach this turn and what it costs to get there,
+        avoiding positions where its formation would overlap other squads. Includes the squad's current cell at cost 0.
+        """
+        self.sync()
+        start = (squad.x, squad.y)
+        valid = self.game_state.occupancy.get_valid_destinations(squad)
+        best_cost = {start: 0}
+        heap = [(0, start)]
+        while heap:
+            cost, (x, y) = heapq.heappop(heap)
+            if cost > best_cost[(x, y)]:
+                continue
+            for dx, dy in NEIGHBORS:
+                nx, ny = x + dx, y + dy
+                step_cost = self.get_terrain_cost(nx, ny)
+                if step_cost is None or cost + step_cost > move_points:
+                    continue
+                if not valid[ny, nx]:
+                    continue
+                if cost + step_cost < best_cost.get((nx, ny), INF):
+                    best_cost[(nx, ny)] = cost + step_cost
+                    heapq.heappush(heap, (cost + step_cost, (nx, ny)))
+        return best_cost
+
+    # Flow fields
+
+    def get_flow_field(self, goal: Tuple[int, int]) -> FlowField:
+        """Get the (cached) flow field towards a goal cell."""
+        self.sync()
+        field = self.fields.get(goal)
+        if field is None:
+            field = FlowField(goal, self.game_state.width, self.game_state.height)
+            if self.get_terrain_cost(*goal) is not None:
+                field.distance[goal[1] * field.width + goal[0]] = 0
+                self._propagate(field, [(0, goal)])
+            self.fields[goal] = field
+        return field
+
+    def _propagate(self, field: FlowField, heap: List[Tuple[float, Tuple[int, int]]]) -> None:
+        """Dijkstra outwards from the cells in the heap, lowering distances where possible."""
+        width = field.width
+        distance = field.distance
+        heapq.heapify(heap)
+        while heap:
+            d, (x, y) = heapq.heappop(heap)
+            if d > distance[y * width + x]:
+                continue
+            # Neighbors reach the goal by entering this cell
+            enter_cost = self.get_field_cost(x, y)
+            if enter_cost is None:
+                continue
+            nd = d + enter_cost
+            for dx, dy in NEIGHBORS:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < width and 0 <= ny < field.height and nd < distance[ny * width + nx]:
+                    if self.get_terrain_cost(nx, ny) is None:
+                        continue
+                    distance[ny * width + nx] = nd
+                    heapq.heappush(heap, (nd, (nx, ny)))
+
+    def _repair_fields(self, cell: Tuple[int, int], old_cost: Optional[int]) -> None:
+        new_cost = self.get_field_cost(*cell)
+        if new_cost != old_cost:
+            for field in self.fields.values():
+                self._repair_field(field, cell, old_cost, new_cost)
+
+    def _repair_field(self, field: FlowField, cell: Tuple[int, int],
+                      old_cost: Optional[int], new_cost: Optional[int]) -> None:
+        """Update a flow field after the cost of entering one cell changed."""
+        width = field.width
+        distance = field.distance
+        cx, cy = cell
+        base = distance[cy * width + cx]
+        if base == INF:
+            return
+
+        if new_cost is not None and (old_cost is None or new_cost < old_cost):
+            # Cheaper: routes through the cell can only improve
+            self._propagate(field, [(base, cell)])
+            return
+
+        # More expensive: every cell whose route entered this cell must be recomputed.
+        # Collect them by following the route backwards (a neighbor used a cell if its
+        # distance is exactly that cell's distance plus the cost of entering it).
+        affected = set()
+        frontier = [(cell, old_cost)]
+        while frontier:
+            (x, y), enter_cost = frontier.pop()
+            if enter_cost is None:
+                continue
+            through = distance[y * width + x] + enter_cost
+            for dx, dy in NEIGHBORS:
+                nx, ny = x + dx, y + dy
+                if (0 <= nx < width and 0 <= ny < field.height and (nx, ny) not in affected
+                        and (nx, ny) != field.goal and distance[ny * width + nx] == through):
+                    affected.add((nx, ny))
+                    frontier.append(((nx, ny), self.get_field_cost(nx, ny)))
+
+        for x, y in affected:
+            distance[y * width + x] = INF
+
+        # Re-seed the affected cells from their unaffected neighbors and propagate
+        heap = []
+        for x, y in affected:
+            for dx, dy in NEIGHBORS:
+                nx, ny = x + dx, y + dy
+                if (nx, ny) in affected or not (0 <= nx < width and 0 <= ny < field.height):
+                    continue
+                enter_cost = self.get_field_cost(nx, ny)
+                if enter_cost is not None and distance[ny * width + nx] != INF:
+                    heap.append((distance[ny * width + nx], (nx, ny)))
+        self._propagate(field, heap)
+
+    # Movement
+
+    def advance_squad(self, squad, path: List[Tuple[int, int]], move_points: int) -> int:
+        """
+        Walk a squad's anchor along a path, spending terrain costs from its move points.
+        Stops early where its formation would overlap other squads. Returns the number of steps taken.
+        """
+        steps = 0
+        for x, y in path:
+            cost = self.get_terrain_cost(x, y)
+            if cost is None or cost > move_points:
+                break
+            if not self.game_state.occupancy.fits(squad, x, y):
+                break
+            move_points -= cost
+            squad.x, squad.y = x, y
+            steps += 1
+        return steps
+
+    def get_field_path(self, squad, max_steps: int = 100) -> List[Tuple[int, int]]:
+        """Get the cells a squad would walk through following its destination's flow field."""
+        field = self.get_flow_field(squad.destination)
+        path = []
+        x, y = squad.x, squad.y
+        for _ in range(max_steps):
+            step = field.get_next_step(x, y)
+            if step is None:
+                break
+            path.append(step)
+            x, y = step
+        return path
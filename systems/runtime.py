@@ -0,0 +1,187 @@
+import asyncio
+import time
+import traceback
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from utils.constants import SIM_TICK_RATE
+
+# Changes the game state when the simulation applies it
+Command = Callable[[], Any]
+# Called on the loop with a job's result once it finishes
+JobCallback = Callable[[Any], None]
+# Called as listener(event, job label) when a job starts or finishes
+JobListener = Callable[[str, str], None]
+
+
+class RuntimeMetrics:
+    """Tick and command latency counters for a SimulationRuntime."""
+
+    def __init__(self, window: int = 1000):
+        self.started = time.perf_counter()
+        self.ticks = 0
+        self.commands = 0
+        self.jobs = 0
+        self.command_latency = deque(maxlen=window)  # Seconds from submit to applied
+        self.tick_time = deque(maxlen=window)        # Seconds spent applying a tick's commands
+
+    @staticmethod
+    def _percentile(samples, fraction: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def report(self) -> Dict[str, float]:
+        """Get a summary of throughput and latency (milliseconds)."""
+        return {
+            'uptime': time.perf_counter() - self.started,
+            'ticks': self.ticks,
+            'commands': self.commands,
+            'jobs': self.jobs,
+            'latency_p50_ms': self._percentile(self.command_latency, 0.5) * 1000,
+            'latency_p95_ms': self._percentile(self.command_latency, 0.95) * 1000,
+            'tick_p50_ms': self._percentile(self.tick_time, 0.5) * 1000,
+            'tick_p95_ms': self._percentile(self.tick_time, 0.95) * 1000,
+        }
+
+
+class SimulationRuntime:
+    """
+    Runs a GameState on an asyncio event loop, advancing the simulation on its own
+    fixed-timestep task, apart from input handling and rendering.
+
+    Input handlers submit commands instead of changing the game state themselves, and
+    every tick applies the commands queued since the last one, in order. Work that takes
+    longer than a frame runs as a job: ending a turn runs the turn pipeline phase by phase
+    with the battles fought off the loop (GameState.end_turn_async), and saving writes the
+    file in a worker thread. offload runs other read-only work (e.g. combat forecasts) in
+    a worker thread.
+
+    The game state is only changed on the loop's thread, and a tick or a job step always
+    runs to completion before the next frame is drawn, so rendering reads a consistent
+    state without locks or copies. A job owns the game state while it runs: commands
+    wait in the queue until it is done.
+    """
+
+    def __init__(self, game_state, tick_rate: int = SIM_TICK_RATE):
+        self.game_state = game_state
+        self.tick_interval = 1.0 / tick_rate
+        self.commands: Deque[Tuple[float, Command]] = deque()  # (submit time, command)
+        self.job: Optional[asyncio.Task] = None
+        self.job_label: Optional[str] = None
+        self.listeners: List[JobListener] = []
+        self.metrics = RuntimeMetrics()
+        self._tick_task: Optional[asyncio.Task] = None
+
+    def bind(self, game_state) -> None:
+        """Run another game state (e.g. after loading one)."""
+        self.game_state = game_state
+
+    def add_listener(self, callback: JobListener) -> None:
+        """Register a callback invoked as callback(event, label), with event 'job_started' or 'job_finished'."""
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def notify(self, event: str, label: str) -> None:
+        for callback in list(self.listeners):
+            callback(event, label)
+
+    @property
+    def busy(self) -> bool:
+        """Whether a job owns the game state."""
+        return self.job is not None
+
+    async def start(self) -> None:
+        self._tick_task = asyncio.create_task(self.run_ticks())
+
+    async def stop(self) -> None:
+        """Stop ticking, once a running job (e.g. a save) is done."""
+        if self.job is not None:
+            await self.job
+        if self._tick_task:
+            self._tick_task.cancel()
+            try:
+                await self._tick_task
+            except asyncio.CancelledError:
+                pass
+
+    # Commands
+
+    def submit(self, command: Command) -> None:
+        """Queue a command for the next tick."""
+        self.commands.append((time.perf_counter(), command))
+
+    def tick(self) -> int:
+        """Apply the queued commands, stopping after one that starts a job. Returns how many ran."""
+        started = time.perf_counter()
+        applied = 0
+        while self.commands and not self.busy:
+            submitted, command = self.commands.popleft()
+            try:
+                command()
+            except Exception:
+                traceback.print_exc()  # A failed command must not stop the simulation
+            self.metrics.command_latency.append(time.perf_counter() - submitted)
+            applied += 1
+        self.metrics.ticks += 1
+        self.metrics.commands += applied
+        self.metrics.tick_time.append(time.perf_counter() - started)
+        return applied
+
+    async def run_ticks(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            self.tick()
+            next_tick += self.tick_interval
+            delay = next_tick - loop.time()
+            if delay < 0:
+                next_tick = loop.time()  # Fell behind: don't try to catch up with a burst of ticks
+                delay = 0
+            await asyncio.sleep(delay)
+
+    # Jobs
+
+    def start_job(self, label: str, work: Callable[[], Awaitable], on_done: Optional[JobCallback] = None) -> bool:
+        """
+        Run work() (a coroutine function) as a job, unless one is already running. on_done
+        is called with its result once it finishes. Meant to be called from a command, so
+        the job starts after the commands submitted before it.
+        """
+        if self.busy:
+            return False
+        self.job_label = label
+        self.job = asyncio.get_running_loop().create_task(self._run_job(work, on_done))
+        self.metrics.jobs += 1
+        self.notify('job_started', label)
+        return True
+
+    async def _run_job(self, work: Callable[[], Awaitable], on_done: Optional[JobCallback]) -> None:
+        try:
+            result = await work()
+            if on_done is not None:
+                on_done(result)
+        except Exception:
+            traceback.print_exc()
+        finally:
+            label = self.job_label
+            self.job = None
+            self.job_label = None
+            self.notify('job_finished', label)
+
+    def end_turn(self, on_done: Optional[JobCallback] = None) -> None:
+        """Queue the end of the turn, run as a job. on_done gets the turn report."""
+        self.submit(lambda: self.start_job("Ending turn", self.game_state.end_turn_async, on_done))
+
+    def save(self, filename: str, on_done: Optional[JobCallback] = None) -> None:
+        """Queue a save, run as a job. on_done gets whether it succeeded."""
+        self.submit(lambda: self.start_job("Saving", lambda: self._save(filename), on_done))
+
+    async def _save(self, filename: str) -> bool:
+        # The save data shares lists with the game state: the job holds it until written
+        game_state = self.game_state
+        return await self.offload(game_state.write_file, filename, game_state.to_dict())
+
+    async def offload(self, function: Callable, *args) -> Any:
+        """Run a function that doesn't change the game state in a worker thread and await its result."""
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
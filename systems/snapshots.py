@@ -0,0 +1,214 @@
+import json
+import os
+from typing import Dict, List
+import numpy as np
+from utils.constants import UnitType, UNIT_STATS
+
+UNIT_TYPES = list(UNIT_STATS)
+TYPE_ORDINAL = {unit_type: i for i, unit_type in enumerate(UNIT_TYPES)}
+
+# Columns of each table: name -> dtype. Positions are grid cells (a unit's cell in its formation).
+UNIT_COLUMNS = {
+    'turn': np.int32, 'unit_id': np.int64, 'squad_id': np.int64, 'type': np.int8, 'level': np.int16,
+    'hp': np.int32, 'max_hp': np.int32, 'strength': np.int32, 'agility': np.int32, 'intelligence': np.int32,
+    'experience': np.int32, 'future_points': np.int32, 'kills': np.int32, 'x': np.int32, 'y': np.int32,
+}
+SQUAD_COLUMNS = {
+    'turn': np.int32, 'squad_id': np.int64, 'x': np.int32, 'y': np.int32,
+    'faction': np.int32,  # Color packed as 0xRRGGBB (a faction is its color)
+    'units': np.int16, 'has_acted': np.bool_, 'dest_x': np.int32, 'dest_y': np.int32,  # -1 without orders
+}
+# Turn index: the rows of turn i are [unit_start[i], unit_start[i] + unit_rows[i]) and likewise for squads
+TURN_COLUMNS = {'turn': np.int32, 'unit_start': np.int64, 'unit_rows': np.int64,
+                'squad_start': np.int64, 'squad_rows': np.int64}
+
+
+class ColumnFile:
+    """
+    A 1-D .npy file that grows by appending.
+
+    Data is appended after the header, and the header's shape is rewritten in place on
+    every flush (numpy pads .npy headers so the shape can grow without moving the data),
+    so the file is a valid .npy that np.load can memory-map at any time after a flush.
+    """
+
+    def __init__(self, path: str, dtype):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.rows = 0
+        self.file = open(path, 'w+b')
+        self.header_size = self._write_header()
+        self.file.flush()  # Readable (as an empty array) before the first rows arrive
+
+    def _write_header(self) -> int:
+        self.file.seek(0)
+        np.lib.format.write_array_header_1_0(
+            self.file, {'descr': np.lib.format.dtype_to_descr(self.dtype), 'fortran_order': False, 'shape': (self.rows,)}
+        )
+        return self.file.tell()
+
+    def append(self, values: np.ndarray) -> None:
+        self.file.seek(0, os.SEEK_END)
+        self.file.write(np.ascontiguousarray(values, dtype=self.dtype).tobytes())
+        self.rows += len(values)
+
+    def flush(self) -> None:
+        if self._write_header() != self.header_size:
+            raise ValueError(f"{self.path}: the .npy header can't grow to {self.rows} rows")
+        self.file.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self.file.close()
+
+
+class Table:
+    """Columns of one table, held in memory until flushed."""
+
+    def __init__(self, directory: str, columns: Dict[str, type]):
+        os.makedirs(directory, exist_ok=True)
+        self.files = {name: ColumnFile(os.path.join(directory, name + '.npy'), dtype)
+                      for name, dtype in columns.items()}
+        self.pending: Dict[str, List[np.ndarray]] = {name: [] for name in columns}
+        self.rows = 0
+
+    def append(self, columns: Dict[str, np.ndarray]) -> None:
+        count = len(next(iter(columns.values())))
+        for name, values in columns.items():
+            self.pending[name].append(values)
+        self.rows += count
+
+    def flush(self) -> None:
+        for name, chunks in self.pending.items():
+            if chunks:
+                self.files[name].append(np.concatenate(chunks))
+            self.files[name].flush()
+            chunks.clear()
+
+    def close(self) -> None:
+        self.flush()
+        for column in self.files.values():
+            column.close()
+
+
+def capture_units(game_state) -> Dict[str, np.ndarray]:
+    """One row per living unit, at its cell in its squad's formation."""
+    rows = [
+        (game_state.current_turn, unit.id, squad.id, TYPE_ORDINAL[unit.unit_type], unit.level,
+         unit.current_hp, unit.max_hp, unit.strength, unit.agility, unit.intelligence,
+         unit.experience, unit.future_points, unit.kills, x, y)
+        for squad in game_state.squads for x, y, unit in squad.get_unit_positions()
+    ]
+    return _columns(rows, UNIT_COLUMNS)
+
+
+def capture_squads(game_state) -> Dict[str, np.ndarray]:
+    rows = []
+    for squad in game_state.squads:
+        r, g, b = squad.color[:3]
+        dest_x, dest_y = squad.destination if squad.destination else (-1, -1)
+        rows.append((game_state.current_turn, squad.id, squad.x, squad.y, (r << 16) | (g << 8) | b,
+                     sum(1 for unit in squad.units if unit.is_alive()), squad.has_acted, dest_x, dest_y))
+    return _columns(rows, SQUAD_COLUMNS)
+
+
+def _columns(rows: List[tuple], columns: Dict[str, type]) -> Dict[str, np.ndarray]:
+    if not rows:
+        return {name: np.zeros(0, dtype=dtype) for name, dtype in columns.items()}
+    matrix = np.array(rows, dtype=np.int64)
+    return {name: matrix[:, i].astype(dtype) for i, (name, dtype) in enumerate(columns.items())}
+
+
+class SnapshotWriter:
+    """
+    Streams per-turn columnar snapshots of every unit and squad to a directory.
+
+    Each column of the units, squads and turns tables is its own growing .npy file (see
+    ColumnFile), and every recorded turn is appended and flushed right away, so memory
+    stays bounded however long the simulation runs and readers see every turn recorded
+    so far. Add writer.phase to the turn pipeline
+    (game_state.turns.add_phase('snapshot', writer.phase)) to record every turn, and
+    read the result back with load_snapshots.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.units = Table(os.path.join(directory, 'units'), UNIT_COLUMNS)
+        self.squads = Table(os.path.join(directory, 'squads'), SQUAD_COLUMNS)
+        self.turns = Table(os.path.join(directory, 'turns'), TURN_COLUMNS)
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump({'unit_types': [unit_type.value for unit_type in UNIT_TYPES]}, f)
+
+    def record(self, game_state) -> int:
+        """Append a snapshot of the current turn. Returns the number of unit rows."""
+        units = capture_units(game_state)
+        squads = capture_squads(game_state)
+        self.turns.append({
+            'turn': np.array([game_state.current_turn]),
+            'unit_start': np.array([self.units.rows]), 'unit_rows': np.array([len(units['turn'])]),
+            'squad_start': np.array([self.squads.rows]), 'squad_rows': np.array([len(squads['turn'])]),
+        })
+        self.units.append(units)
+        self.squads.append(squads)
+        self.flush()
+        return len(units['turn'])
+
+    def phase(self, game_state) -> Dict[str, float]:
+        """Turn pipeline phase recording every turn."""
+        return {'rows': self.record(game_state)}
+
+    def flush(self) -> None:
+        """Write the buffered rows. The turn index goes last, so it never points past the data."""
+        self.units.flush()
+        self.squads.flush()
+        self.turns.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self.units.close()
+        self.squads.close()
+        self.turns.close()
+
+
+class SnapshotSeries:
+    """Memory-mapped columns of a snapshot directory (see load_snapshots)."""
+
+    def __init__(self, directory: str):
+        def load(table: str, columns: Dict[str, type]) -> Dict[str, np.ndarray]:
+            return {name: np.load(os.path.join(directory, table, name + '.npy'), mmap_mode='r')
+                    for name in columns}
+
+        with open(os.path.join(directory, 'meta.json')) as f:
+            self.unit_types = [UnitType(value) for value in json.load(f)['unit_types']]
+        self.turns = load('turns', TURN_COLUMNS)
+        # Only keep rows covered by the turn index (a writer may still be running)
+        unit_rows = int((self.turns['unit_start'] + self.turns['unit_rows']).max(initial=0))
+        squad_rows = int((self.turns['squad_start'] + self.turns['squad_rows']).max(initial=0))
+        self.units = {name: column[:unit_rows] for name, column in load('units', UNIT_COLUMNS).items()}
+        self.squads = {name: column[:squad_rows] for name, column in load('squads', SQUAD_COLUMNS).items()}
+
+    def turn_numbers(self) -> np.ndarray:
+        return np.asarray(self.turns['turn'])
+
+    def _turn_index(self, turn: int) -> int:
+        matches = np.flatnonzero(self.turns['turn'] == turn)
+        if len(matches) == 0:
+            raise KeyError(f"No snapshot of turn {turn}")
+        return int(matches[-1])
+
+    def turn_units(self, turn: int) -> Dict[str, np.ndarray]:
+        """The unit columns of one turn, as views into the memory maps."""
+        i = self._turn_index(turn)
+        start, count = int(self.turns['unit_start'][i]), int(self.turns['unit_rows'][i])
+        return {name: column[start:start + count] for name, column in self.units.items()}
+
+    def turn_squads(self, turn: int) -> Dict[str, np.ndarray]:
+        i = self._turn_index(turn)
+        start, count = int(self.turns['squad_start'][i]), int(self.turns['squad_rows'][i])
+        return {name: column[start:start + count] for name, column in self.squads.items()}
+
+
+def load_snapshots(directory: str) -> SnapshotSeries:
+    """Memory-map the snapshots written by a SnapshotWriter for analysis."""
+    return SnapshotSeries(directory)
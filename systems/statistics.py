@@ -0,0 +1,248 @@
+import heapq
+import json
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+from utils.constants import LEADERBOARD_SIZE, STATISTICS_HISTORY
+
+# Per-unit numbers the statistics are built from: (kills, battles, damage dealt, level, experience)
+COUNTERS = ('kills', 'battles', 'damage_dealt', 'level', 'experience')
+LEADERBOARDS = ('kills', 'level', 'damage_dealt')
+
+
+class Leaderboard:
+    """
+    Units ranked by one value: a max-heap with lazy deletion.
+
+    Updating a unit pushes a new entry and leaves the old one in the heap; entries that
+    no longer match the unit's current value are dropped when they reach the top. The
+    best unit is found in O(log n) amortized and the top k in O(k log n).
+    """
+
+    def __init__(self):
+        self.values: Dict[int, int] = {}  # Unit id -> current value
+        self.heap: List[Tuple[int, int]] = []  # (-value, unit id)
+
+    def update(self, unit_id: int, value: int) -> None:
+        if self.values.get(unit_id) != value:
+            self.values[unit_id] = value
+            heapq.heappush(self.heap, (-value, unit_id))
+            if len(self.heap) > 2 * len(self.values) + 64:
+                self._compact()
+
+    def remove(self, unit_id: int) -> None:
+        self.values.pop(unit_id, None)
+
+    def _compact(self) -> None:
+        self.heap = [(-value, unit_id) for unit_id, value in self.values.items()]
+        heapq.heapify(self.heap)
+
+    def top(self, k: int) -> List[Tuple[int, int]]:
+        """Get the k best (unit id, value) pairs, best first (ties by lowest id)."""
+        result = []
+        kept = []
+        seen = set()
+        while self.heap and len(result) < k:
+            entry = heapq.heappop(self.heap)
+            value, unit_id = -entry[0], entry[1]
+            if self.values.get(unit_id) != value or unit_id in seen:
+                continue  # Outdated or duplicate entry: drop it for good
+            seen.add(unit_id)
+            result.append((unit_id, value))
+            kept.append(entry)
+        for entry in kept:
+            heapq.heappush(self.heap, entry)
+        return result
+
+
+class UnitRecord:
+    """What the statistics last saw of a unit."""
+    __slots__ = ('unit', 'squad', 'unit_type', 'faction', 'counters')
+
+    def __init__(self, unit, squad):
+        self.unit = unit
+        self.squad = squad
+        self.unit_type = unit.unit_type.value
+        self.faction = tuple(squad.color)
+        self.counters = (unit.kills, unit.battles, unit.damage_dealt, unit.level, unit.experience)
+
+
+def _empty_totals() -> Dict[str, int]:
+    totals = {name: 0 for name in COUNTERS}
+    totals.update(units=0, fallen=0)
+    return totals
+
+
+class StatisticsService:
+    """
+    Running totals, per-type and per-faction aggregates and top-K leaderboards of units.
+
+    The service listens to squad events and compares each changed squad's units with
+    what it saw last, so kills, battles, damage, experience, level ups, promotions,
+    recruits and deaths are counted from the differences without scanning other squads.
+    Units that leave their squad have fallen: they keep counting towards totals and
+    aggregates, but leave the leaderboards.
+    Undoing an action reverses its differences too. Like the other services it rebuilds
+    lazily when the squad list is replaced (e.g. on load).
+    """
+
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.living: Dict[int, UnitRecord] = {}  # Unit id -> record
+        self.fallen: Dict[int, UnitRecord] = {}
+        self.squad_units: Dict[object, List[int]] = {}  # Squad -> ids of its tracked units
+        self.totals = _empty_totals()
+        self.by_type: Dict[str, Dict[str, int]] = {}
+        self.by_faction: Dict[Tuple[int, int, int], Dict[str, int]] = {}
+        self.events = {'recruits': 0, 'level_ups': 0, 'promotions': 0, 'deaths': 0}
+        self.leaderboards = {name: Leaderboard() for name in LEADERBOARDS}
+        self.turns: Deque[dict] = deque(maxlen=STATISTICS_HISTORY)  # Snapshots of the latest recorded turns
+        self._squads_ref = None
+        game_state.add_listener(self.on_squad_event)
+
+    # Maintenance
+
+    def sync(self) -> None:
+        """Rebuild if the squad list was replaced."""
+        if self._squads_ref is not self.game_state.squads:
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        """Recompute everything from the current squads (fallen units are forgotten)."""
+        self._squads_ref = self.game_state.squads
+        self.living.clear()
+        self.fallen.clear()
+        self.squad_units.clear()
+        self.totals = _empty_totals()
+        self.by_type.clear()
+        self.by_faction.clear()
+        self.events = dict.fromkeys(self.events, 0)
+        self.leaderboards = {name: Leaderboard() for name in LEADERBOARDS}
+        for squad in self.game_state.squads:
+            self._observe(squad, count_events=False)
+
+    def on_squad_event(self, event: str, squad) -> None:
+        """GameState listener: apply the differences of the squad's units."""
+        if self._squads_ref is not self.game_state.squads:
+            return  # Rebuilt lazily on the next query
+        if event == 'removed':
+            for unit_id in self.squad_units.pop(squad, []):
+                record = self.living.pop(unit_id, None)
+                if record is not None:
+                    self._apply(record, -1, fallen=False)
+                    self._unrank(unit_id)
+        elif event != 'moved':
+            self._observe(squad, count_events=True)
+
+    def _apply(self, record: UnitRecord, sign: int, fallen: bool) -> None:
+        for totals in (self.totals,
+                       self.by_type.setdefault(record.unit_type, _empty_totals()),
+                       self.by_faction.setdefault(record.faction, _empty_totals())):
+            for name, value in zip(COUNTERS, record.counters):
+                totals[name] += sign * value
+            totals['fallen' if fallen else 'units'] += sign
+
+    def _rank(self, unit_id: int, record: UnitRecord) -> None:
+        kills, _, damage, level, _ = record.counters
+        self.leaderboards['kills'].update(unit_id, kills)
+        self.leaderboards['level'].update(unit_id, level)
+        self.leaderboards['damage_dealt'].update(unit_id, damage)
+
+    def _unrank(self, unit_id: int) -> None:
+        for leaderboard in self.leaderboards.values():
+            leaderboard.remove(unit_id)
+
+    def _observe(self, squad, count_events: bool) -> None:
+        """Bring the records of a squad's units up to date."""
+        current = {}
+        for unit in squad.units:
+            if unit.current_hp > 0:
+                current[unit.id] = unit
+
+        # Units only leave squads by dying (a unit that shows up again is revived below)
+        for unit_id in self.squad_units.get(squad, []):
+            if unit_id in current:
+                continue
+            record = self.living.get(unit_id)
+            if record is None or record.squad is not squad:
+                continue  # Already gone, or now tracked in another squad
+            del self.living[unit_id]
+            self._apply(record, -1, fallen=False)
+            self._unrank(unit_id)
+            self.fallen[unit_id] = record
+            self._apply(record, 1, fallen=True)
+            if count_events:
+                self.events['deaths'] += 1
+
+        for unit_id, unit in current.items():
+            old = self.living.get(unit_id)
+            if old is None:
+                revived = self.fallen.pop(unit_id, None)  # Brought back by undo
+                if revived is not None:
+                    self._apply(revived, -1, fallen=True)
+                    if count_events:
+                        self.events['deaths'] -= 1
+                elif count_events:
+                    self.events['recruits'] += 1
+            record = UnitRecord(unit, squad)
+            if old is not None:
+                if old.counters == record.counters and old.unit_type == record.unit_type \
+                        and old.faction == record.faction:
+                    continue
+                self._apply(old, -1, fallen=False)
+                if count_events:
+                    self.events['level_ups'] += record.counters[3] - old.counters[3]
+                    self.events['promotions'] += (record.unit_type != old.unit_type)
+            self.living[unit_id] = record
+            self._apply(record, 1, fallen=False)
+            self._rank(unit_id, record)
+        self.squad_units[squad] = list(current)
+
+    # Queries
+
+    def top(self, metric: str, k: int = LEADERBOARD_SIZE) -> List[Tuple[object, object, int]]:
+        """Get the k living units with the most kills, highest 'level' or most 'damage_dealt',
+        as (unit, squad, value), best first."""
+        self.sync()
+        return [(self.living[unit_id].unit, self.living[unit_id].squad, value)
+                for unit_id, value in self.leaderboards[metric].top(k)]
+
+    def get_totals(self) -> Dict[str, int]:
+        self.sync()
+        return dict(self.totals, **self.events)
+
+    def get_type_stats(self) -> Dict[str, Dict[str, int]]:
+        self.sync()
+        return {name: dict(totals) for name, totals in self.by_type.items() if totals['units'] or totals['fallen']}
+
+    def get_faction_stats(self) -> Dict[Tuple[int, int, int], Dict[str, int]]:
+        self.sync()
+        return {faction: dict(totals) for faction, totals in self.by_faction.items()
+                if totals['units'] or totals['fallen']}
+
+    # Export
+
+    def snapshot(self, k: int = LEADERBOARD_SIZE) -> dict:
+        """JSON-compatible summary of the current statistics and leaderboards."""
+        return {
+            'turn': self.game_state.current_turn,
+            'totals': self.get_totals(),
+            'types': self.get_type_stats(),
+            'factions': [dict(faction=list(faction), **totals) for faction, totals in self.get_faction_stats().items()],
+            'leaderboards': {
+                metric: [{'unit': unit.id, 'type': unit.unit_type.value, 'squad': squad.name, 'value': value}
+                         for unit, squad, value in self.top(metric, k)]
+                for metric in LEADERBOARDS
+            },
+        }
+
+    def record_turn(self) -> dict:
+        """Keep a snapshot of this turn for export (only the latest STATISTICS_HISTORY are kept)."""
+        snapshot = self.snapshot()
+        self.turns.append(snapshot)
+        return snapshot
+
+    def export(self, filename: str, turns: Optional[Iterable[dict]] = None) -> None:
+        """Write the recorded turn snapshots as JSON lines."""
+        with open(filename, 'w') as f:
+            for snapshot in self.turns if turns is None else turns:
+                f.write(json.dumps(snapshot) + '\n')
@@ -0,0 +1,213 @@
+import asyncio
+import inspect
+import random
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from utils.constants import HEAL_PER_TURN, AUTOSAVE_INTERVAL, AUTOSAVE_FILE
+
+# A phase takes the game state and returns stats for the turn report (or None)
+Phase = Callable[[object], Optional[Dict[str, float]]]
+
+
+class TurnReport:
+    """Timings and stats of one run of the turn pipeline."""
+
+    def __init__(self, turn: int):
+        self.turn = turn
+        self.timings: Dict[str, float] = {}  # Seconds spent in each phase, in order
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def total(self) -> float:
+        return sum(self.timings.values())
+
+    def format(self) -> str:
+        lines = [f"Turn {self.turn}: {self.total * 1000:.1f} ms"]
+        for name, seconds in self.timings.items():
+            stats = ", ".join(f"{key} {value:g}" for key, value in self.stats.get(name, {}).items())
+            lines.append(f"  {name:<10} {seconds * 1000:8.2f} ms  {stats}")
+        return "\n".join(lines)
+
+
+def upkeep_phase(game_state) -> Dict[str, float]:
+    """Advance the turn counter and give every squad its action back."""
+    game_state.current_turn += 1
+    print(f"\n=== TURN {game_state.current_turn} ===")
+    reset = [squad for squad in game_state.squads if squad.has_acted]
+    for squad in reset:
+        squad.has_acted = False
+        game_state.notify('changed', squad)
+    return {'reset': len(reset)}
+
+
+def healing_phase(game_state, amount: int = HEAL_PER_TURN) -> Dict[str, float]:
+    """
+    Heal every living unit by `amount`, up to its max HP, as Squad.heal does.
+    HP is gathered into arrays so the healing itself is one vectorized operation.
+    """
+    units = [(squad, unit) for squad in game_state.squads for unit in squad.units if unit.current_hp > 0]
+    if not units or amount <= 0:
+        return {'healed': 0}
+    current = np.fromiter((unit.current_hp for _, unit in units), dtype=np.int64, count=len(units))
+    maximum = np.fromiter((unit.max_hp for _, unit in units), dtype=np.int64, count=len(units))
+    healed = np.minimum(maximum, current + amount)
+
+    changed_squads = {}
+    for index, hp in zip(np.flatnonzero(healed != current).tolist(), healed[healed != current].tolist()):
+        squad, unit = units[index]
+        unit.current_hp = hp
+        changed_squads[id(squad)] = squad
+    for squad in changed_squads.values():
+        game_state.notify('changed', squad)
+    return {'healed': int((healed - current).sum()), 'squads': len(changed_squads)}
+
+
+def orders_phase(game_state) -> Dict[str, float]:
+    """Move squads along their march orders."""
+    marching = sum(1 for squad in game_state.squads if squad.destination is not None)
+    game_state.advance_orders()
+    return {'marching': marching}
+
+
+def combat_phase(game_state) -> Dict[str, float]:
+    """
+    Resolve the battles queued with GameState.queue_attack during the turn, concurrently
+    where they share no squads (see BattleResolver). The turn seed comes from the random
+    module, so random.seed still makes turns repeatable.
+    """
+    battles = game_state.pending_battles
+    game_state.pending_battles = []
+    turn_seed = random.getrandbits(64)
+    return {'battles': game_state.battle_resolver.resolve(game_state, battles, turn_seed)}
+
+
+async def combat_phase_async(game_state) -> Dict[str, float]:
+    """combat_phase with the battles fought off the event loop (see BattleResolver.resolve_async)."""
+    battles = game_state.pending_battles
+    game_state.pending_battles = []
+    turn_seed = random.getrandbits(64)
+    return {'battles': await game_state.battle_resolver.resolve_async(game_state, battles, turn_seed)}
+
+
+def promotion_phase(game_state) -> Dict[str, float]:
+    """
+    Collect the units ready to promote into game_state.promotion_ready, from the unit index.
+    Experience and levels are already granted as battles are resolved.
+    """
+    game_state.promotion_ready = game_state.unit_index.promotable()
+    return {'ready': len(game_state.promotion_ready)}
+
+
+def statistics_phase(game_state) -> Dict[str, float]:
+    """Record the turn's statistics and leaderboards (see StatisticsService)."""
+    totals = game_state.statistics.record_turn()['totals']
+    return {'units': totals['units'], 'kills': totals['kills']}
+
+
+def autosave_phase(game_state, interval: int = AUTOSAVE_INTERVAL,
+                   filename: str = AUTOSAVE_FILE) -> Dict[str, float]:
+    """Save the game every `interval` turns."""
+    if interval <= 0 or game_state.current_turn % interval:
+        return {'saved': 0}
+    return {'saved': int(game_state.save_to_file(filename))}
+
+
+async def autosave_phase_async(game_state, interval: int = AUTOSAVE_INTERVAL,
+                               filename: str = AUTOSAVE_FILE) -> Dict[str, float]:
+    """autosave_phase writing the file in a worker thread (the save data is taken on the loop)."""
+    if interval <= 0 or game_state.current_turn % interval:
+        return {'saved': 0}
+    data = game_state.to_dict()
+    loop = asyncio.get_running_loop()
+    return {'saved': int(await loop.run_in_executor(None, game_state.write_file, filename, data))}
+
+
+# Phases replaced by their async variant when the pipeline runs on an event loop
+ASYNC_PHASES: Dict[Phase, Phase] = {
+    combat_phase: combat_phase_async,
+    autosave_phase: autosave_phase_async,
+}
+
+
+class TurnPipeline:
+    """
+    The ordered phases run when a turn ends, each timed separately.
+
+    The default phases are upkeep, healing, orders (march movement), combat, promotion,
+    statistics and autosave. Each works on all squads in one batch. Phases can be added, replaced
+    or removed by name, and the report of the last run is kept in last_report.
+    """
+
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.phases: List[Tuple[str, Phase]] = [
+            ('upkeep', upkeep_phase),
+            ('healing', healing_phase),
+            ('orders', orders_phase),
+            ('combat', combat_phase),
+            ('promotion', promotion_phase),
+            ('statistics', statistics_phase),
+            ('autosave', autosave_phase),
+        ]
+        self.last_report: Optional[TurnReport] = None
+
+    def _index(self, name: str) -> int:
+        for index, (phase_name, _) in enumerate(self.phases):
+            if phase_name == name:
+                return index
+        raise KeyError(f"No turn phase named {name!r}")
+
+    def add_phase(self, name: str, phase: Phase, before: str = None, after: str = None) -> None:
+        """Add a phase at the end, or before/after the named phase."""
+        if before is not None:
+            index = self._index(before)
+        elif after is not None:
+            index = self._index(after) + 1
+        else:
+            index = len(self.phases)
+        self.phases.insert(index, (name, phase))
+
+    def replace_phase(self, name: str, phase: Phase) -> None:
+        self.phases[self._index(name)] = (name, phase)
+
+    def remove_phase(self, name: str) -> None:
+        del self.phases[self._index(name)]
+
+    def run(self) -> TurnReport:
+        """Run every phase in order."""
+        report = TurnReport(self.game_state.current_turn)
+        for name, phase in self.phases:
+            started = time.perf_counter()
+            stats = phase(self.game_state)
+            if inspect.isawaitable(stats):
+                stats.close()
+                raise TypeError(f"Turn phase {name!r} is async: run the pipeline with run_async")
+            report.timings[name] = time.perf_counter() - started
+            if stats:
+                report.stats[name] = stats
+        return self._finish(report)
+
+    async def run_async(self) -> TurnReport:
+        """
+        run for an asyncio event loop. Phases with an async variant in ASYNC_PHASES use it,
+        phases may be coroutine functions, and the loop gets control back after every phase,
+        so it keeps running (e.g. rendering frames) while a turn ends. Timings of async
+        phases are wall-clock time, including whatever the loop did meanwhile.
+        """
+        report = TurnReport(self.game_state.current_turn)
+        for name, phase in self.phases:
+            started = time.perf_counter()
+            stats = ASYNC_PHASES.get(phase, phase)(self.game_state)
+            if inspect.isawaitable(stats):
+                stats = await stats
+            report.timings[name] = time.perf_counter() - started
+            if stats:
+                report.stats[name] = stats
+            await asyncio.sleep(0)
+        return self._finish(report)
+
+    def _finish(self, report: TurnReport) -> TurnReport:
+        report.turn = self.game_state.current_turn
+        self.last_report = report
+        return report
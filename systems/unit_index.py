@@ -0,0 +1,158 @@
+from typing import Dict, List, Optional, Set, Tuple
+from utils.constants import UnitType, HP_BUCKETS
+
+# What a unit is indexed under: (unit, squad, unit type, promotable, HP bucket, level)
+IndexKey = Tuple[object, object, UnitType, bool, int, int]
+
+
+def hp_bucket(unit) -> int:
+    """Bucket of a unit's HP ratio: 0 for under 1/HP_BUCKETS of max HP, HP_BUCKETS - 1 for full."""
+    return min(HP_BUCKETS - 1, unit.current_hp * HP_BUCKETS // max(1, unit.max_hp))
+
+
+def is_promotable(unit) -> bool:
+    return unit.can_promote() and unit.future_points >= 100
+
+
+class UnitIndex:
+    """
+    Secondary indexes over living units: ready to promote, HP ratio bucket, type and level.
+
+    Each index maps its value to the set of unit ids under it. The indexes follow squad
+    events, re-indexing only the units of the squad that changed, so queries such as
+    "ready to promote" or "below 25% HP" only look at the matching units instead of the
+    whole army. Like the other services it rebuilds lazily when the squad list is replaced.
+    """
+
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.keys: Dict[int, IndexKey] = {}  # Unit id -> what it is indexed under
+        self.squad_units: Dict[object, List[int]] = {}  # Squad -> ids of its indexed units
+        self.ready: Set[int] = set()
+        self.by_bucket: List[Set[int]] = [set() for _ in range(HP_BUCKETS)]
+        self.by_type: Dict[UnitType, Set[int]] = {}
+        self.by_level: Dict[int, Set[int]] = {}
+        self._squads_ref = None
+        game_state.add_listener(self.on_squad_event)
+
+    # Maintenance
+
+    def sync(self) -> None:
+        """Rebuild if the squad list was replaced."""
+        if self._squads_ref is not self.game_state.squads:
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        """Re-index every unit from scratch."""
+        self._squads_ref = self.game_state.squads
+        self.keys.clear()
+        self.squad_units.clear()
+        self.ready.clear()
+        self.by_bucket = [set() for _ in range(HP_BUCKETS)]
+        self.by_type.clear()
+        self.by_level.clear()
+        for squad in self.game_state.squads:
+            self.update_squad(squad)
+
+    def on_squad_event(self, event: str, squad) -> None:
+        """GameState listener: re-index the units of the squad that changed."""
+        if self._squads_ref is not self.game_state.squads:
+            return  # Rebuilt lazily on the next query
+        if event == 'removed':
+            for unit_id in self.squad_units.pop(squad, []):
+                if self.keys.get(unit_id, (None, None))[1] is squad:
+                    self._remove(unit_id)
+        elif event != 'moved':
+            self.update_squad(squad)
+
+    def _add(self, unit_id: int, key: IndexKey) -> None:
+        _, _, unit_type, promotable, bucket, level = key
+        self.keys[unit_id] = key
+        if promotable:
+            self.ready.add(unit_id)
+        self.by_bucket[bucket].add(unit_id)
+        self.by_type.setdefault(unit_type, set()).add(unit_id)
+        self.by_level.setdefault(level, set()).add(unit_id)
+
+    def _remove(self, unit_id: int) -> None:
+        _, _, unit_type, _, bucket, level = self.keys.pop(unit_id)
+        self.ready.discard(unit_id)
+        self.by_bucket[bucket].discard(unit_id)
+        self.by_type[unit_type].discard(unit_id)
+        self.by_level[level].discard(unit_id)
+        if not self.by_level[level]:
+            del self.by_level[level]
+
+    def update_squad(self, squad) -> None:
+        """Re-index a squad's units, dropping the ones that left it or died."""
+        current = {unit.id: unit for unit in squad.units if unit.current_hp > 0}
+        for unit_id in self.squad_units.get(squad, []):
+            if unit_id not in current and self.keys.get(unit_id, (None, None))[1] is squad:
+                self._remove(unit_id)
+        for unit_id, unit in current.items():
+            key = (unit, squad, unit.unit_type, is_promotable(unit), hp_bucket(unit), unit.level)
+            old = self.keys.get(unit_id)
+            if old != key:
+                if old is not None:
+                    self._remove(unit_id)
+                self._add(unit_id, key)
+        self.squad_units[squad] = list(current)
+
+    # Queries
+
+    def _resolve(self, unit_ids) -> List[Tuple[object, object]]:
+        """Get (squad, unit) pairs for unit ids, in id order."""
+        return [(self.keys[unit_id][1], self.keys[unit_id][0]) for unit_id in sorted(unit_ids)]
+
+    def _below(self, ratio: float) -> Set[int]:
+        """Ids of units with current HP below ratio * max HP."""
+        boundary = min(HP_BUCKETS, int(ratio * HP_BUCKETS))
+        unit_ids = set().union(*self.by_bucket[:boundary])
+        if boundary < HP_BUCKETS:
+            # The bucket the ratio falls in is only partly below it: check its units
+            for unit_id in self.by_bucket[boundary]:
+                unit = self.keys[unit_id][0]
+                if unit.current_hp < ratio * unit.max_hp:
+                    unit_ids.add(unit_id)
+        return unit_ids
+
+    def _levels(self, min_level: Optional[int], max_level: Optional[int]) -> Set[int]:
+        low = min_level if min_level is not None else float('-inf')
+        high = max_level if max_level is not None else float('inf')
+        return set().union(*(ids for level, ids in self.by_level.items() if low <= level <= high))
+
+    def query(self, unit_type: Optional[UnitType] = None, min_level: Optional[int] = None,
+              max_level: Optional[int] = None, below_hp: Optional[float] = None,
+              promotable: bool = False) -> List[Tuple[object, object]]:
+        """
+        Get (squad, unit) of every living unit matching all the given conditions, in unit
+        id order. below_hp is a ratio of max HP: 0.25 finds units under 25% HP.
+        """
+        self.sync()
+        candidates: List[Set[int]] = []
+        if promotable:
+            candidates.append(self.ready)
+        if unit_type is not None:
+            candidates.append(self.by_type.get(unit_type, set()))
+        if min_level is not None or max_level is not None:
+            candidates.append(self._levels(min_level, max_level))
+        if below_hp is not None:
+            candidates.append(self._below(below_hp))
+        if not candidates:
+            return self._resolve(self.keys)
+        candidates.sort(key=len)
+        return self._resolve(candidates[0].intersection(*candidates[1:]))
+
+    def promotable(self) -> List[Tuple[object, object]]:
+        """Units ready to promote."""
+        return self.query(promotable=True)
+
+    def wounded(self, below: float = 0.25) -> List[Tuple[object, object]]:
+        """Units under the given ratio of their max HP."""
+        return self.query(below_hp=below)
+
+    def of_type(self, unit_type: UnitType) -> List[Tuple[object, object]]:
+        return self.query(unit_type=unit_type)
+
+    def in_levels(self, min_level: Optional[int] = None, max_level: Optional[int] = None) -> List[Tuple[object, object]]:
+        return self.query(min_level=min_level, max_level=max_level)
@@ -0,0 +1,147 @@
+import numpy as np
+from typing import Dict, List, Tuple
+from utils.constants import SIGHT_RANGE
+
+Faction = Tuple[int, int, int]
+
+
+class VisibilityMap:
+    """
+    Per-faction fog of war over the grid, backed by NumPy arrays.
+
+    Every living unit stamps a disk of its sight range around its cell (from
+    Squad.get_unit_positions). Each faction keeps a count of how many of its
+    units see each cell, so when a squad moves or loses units only its own
+    disks are subtracted and re-added. Squads belong to the faction of their
+    color, as in move_squad.
+    """
+
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.counts: Dict[Faction, np.ndarray] = {}  # Units of each faction seeing each cell, as [y, x]
+        # Squad -> (faction, [(x, y, sight range), ...]) it is currently stamped with
+        self.stamps: Dict[object, Tuple[Faction, List[Tuple[int, int, int]]]] = {}
+        self.kernels: Dict[int, np.ndarray] = {}
+        self.version = 0  # Bumped whenever any faction's visibility changes
+        self._squads_ref = None
+        self._shape = None
+        game_state.add_listener(self.on_squad_event)
+
+    @staticmethod
+    def get_faction(squad) -> Faction:
+        """Get the faction a squad belongs to."""
+        return tuple(squad.color)
+
+    @staticmethod
+    def get_sight_range(unit) -> int:
+        """Get how many cells a unit can see."""
+        return SIGHT_RANGE + max(0, unit.range - 1)
+
+    def get_kernel(self, radius: int) -> np.ndarray:
+        """Get the (cached) disk of cells within a Euclidean radius, as a 0/1 array."""
+        kernel = self.kernels.get(radius)
+        if kernel is None:
+            offsets = np.arange(-radius, radius + 1)
+            kernel = ((offsets[:, None] ** 2 + offsets[None, :] ** 2) <= radius * radius).astype(np.uint16)
+            self.kernels[radius] = kernel
+        return kernel
+
+    # Maintenance
+
+    def sync(self) -> None:
+        """Rebuild if the squad list was replaced (e.g. on load) or the grid was resized."""
+        shape = (self.game_state.height, self.game_state.width)
+        if self._squads_ref is not self.game_state.squads or self._shape != shape:
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        """Restamp every squad from scratch."""
+        self._squads_ref = self.game_state.squads
+        self._shape = (self.game_state.height, self.game_state.width)
+        self.counts.clear()
+        self.stamps.clear()
+        for squad in self.game_state.squads:
+            self.update_squad(squad)
+        self.version += 1
+
+    def on_squad_event(self, event: str, squad) -> None:
+        """GameState listener: restamp the squad that changed."""
+        if self._squads_ref is not self.game_state.squads or self._shape is None:
+            return  # Rebuilt lazily on the next query
+        if event == 'removed':
+            self.remove_squad(squad)
+        else:
+            self.update_squad(squad)
+
+    def update_squad(self, squad) -> None:
+        """Replace a squad's sight stamps if its units moved, died or changed range."""
+        faction = self.get_faction(squad)
+        disks = [(x, y, self.get_sight_range(unit)) for x, y, unit in squad.get_unit_positions()]
+        old = self.stamps.get(squad)
+        if old == (faction, disks):
+            return
+        if old is not None:
+            self._apply(old, -1)
+        if disks:
+            self.stamps[squad] = (faction, disks)
+            self._apply(self.stamps[squad], 1)
+        else:
+            self.stamps.pop(squad, None)
+        self.version += 1
+
+    def remove_squad(self, squad) -> None:
+        """Remove a dead or removed squad's sight."""
+        old = self.stamps.pop(squad, None)
+        if old is not None:
+            self._apply(old, -1)
+            self.version += 1
+
+    def _apply(self, stamp: Tuple[Faction, List[Tuple[int, int, int]]], sign: int) -> None:
+        faction, disks = stamp
+        counts = self.counts.get(faction)
+        if counts is None:
+            counts = self.counts[faction] = np.zeros(self._shape, dtype=np.int32)
+        height, width = self._shape
+        for x, y, radius in disks:
+            # Clip the disk to the grid
+            x0, x1 = max(0, x - radius), min(width, x + radius + 1)
+            y0, y1 = max(0, y - radius), min(height, y + radius + 1)
+            if x0 >= x1 or y0 >= y1:
+                continue
+            kernel = self.get_kernel(radius)[y0 - (y - radius):y1 - (y - radius), x0 - (x - radius):x1 - (x - radius)]
+            if sign > 0:
+                counts[y0:y1, x0:x1] += kernel
+            else:
+                counts[y0:y1, x0:x1] -= kernel
+
+    # Queries
+
+    def get_visible(self, faction: Faction) -> np.ndarray:
+        """Get a [y, x] boolean map of the cells a faction can see."""
+        self.sync()
+        counts = self.counts.get(faction)
+        if counts is None:
+            return np.zeros(self._shape, dtype=bool)
+        return counts > 0
+
+    def is_visible(self, x: int, y: int, faction: Faction) -> bool:
+        """Check if a faction can see a cell."""
+        self.sync()
+        counts = self.counts.get(faction)
+        if counts is None or not (0 <= x < self._shape[1] and 0 <= y < self._shape[0]):
+            return False
+        return counts[y, x] > 0
+
+    def is_squad_visible(self, squad, faction: Faction) -> bool:
+        """Check if a faction can see any living unit of a squad (always true for its own squads)."""
+        if self.get_faction(squad) == faction:
+            return True
+        self.sync()
+        counts = self.counts.get(faction)
+        if counts is None:
+            return False
+        height, width = self._shape
+        return any(
+            0 <= x < width and 0 <= y < height and counts[y, x] > 0
+            for x, y, _ in squad.get_unit_positions()
+        )
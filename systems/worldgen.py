@@ -0,0 +1,203 @@
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from squad import Squad
+from systems.factory import UNIT_TYPES, TYPE_INDEX, create_squads
+from utils.constants import UnitType, TERRAIN_TYPES, IMPASSABLE_COST
+
+TERRAIN_NAMES = list(TERRAIN_TYPES)
+STARTING_CLASSES = [UnitType.RECRUIT, UnitType.APPRENTICE, UnitType.SCOUT]
+DEFAULT_FORMATION = Squad._get_default_formation()
+
+
+def value_noise(width: int, height: int, scale: float, octaves: int, rng: np.random.Generator,
+                persistence: float = 0.5) -> np.ndarray:
+    """
+    Fractal value noise over a height x width grid, normalized to 0..1.
+
+    Each octave is a lattice of random values every `scale` cells (halved per octave),
+    smoothly interpolated over the whole grid at once.
+    """
+    field = np.zeros((height, width))
+    amplitude = 1.0
+    for _ in range(octaves):
+        step = max(1.0, scale)
+        lattice = rng.random((int(height / step) + 2, int(width / step) + 2))
+        ys, xs = np.arange(height) / step, np.arange(width) / step
+        y0, x0 = ys.astype(np.int64), xs.astype(np.int64)
+        # Smoothstep weights hide the lattice's grid lines
+        ty, tx = ys - y0, xs - x0
+        ty, tx = (ty * ty * (3 - 2 * ty))[:, None], (tx * tx * (3 - 2 * tx))[None, :]
+        top = lattice[y0][:, x0] * (1 - tx) + lattice[y0][:, x0 + 1] * tx
+        bottom = lattice[y0 + 1][:, x0] * (1 - tx) + lattice[y0 + 1][:, x0 + 1] * tx
+        field += amplitude * (top * (1 - ty) + bottom * ty)
+        amplitude *= persistence
+        scale /= 2
+    field -= field.min()
+    return field / max(field.max(), 1e-12)
+
+
+class WorldGenerator:
+    """
+    Seeded generator of large scenario maps: terrain plus factions of squads.
+
+    Terrain comes from two noise fields, elevation and moisture, cut at quantiles so
+    every map has the same share of each terrain type. Squads are spread with
+    Poisson-disc spacing, and a spatial hash of placed squads guarantees that no two
+    formation footprints overlap. Everything is drawn from one generator seeded with
+    `seed`, so the same seed and settings always give the same world.
+    """
+
+    # Share of the map below which / above which elevation becomes each terrain
+    WATER_SHARE = 0.12
+    HILLS_SHARE = 0.12
+    MOUNTAIN_SHARE = 0.05
+    FOREST_SHARE = 0.3  # Of the remaining land, the wettest share is forest
+
+    def __init__(self, width: int, height: int, seed: int = 0, scale: float = 64.0, octaves: int = 4):
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.scale = scale
+        self.octaves = octaves
+        self.rng = np.random.default_rng(seed)
+
+    # Terrain
+
+    def terrain_indices(self) -> np.ndarray:
+        """Get the terrain of every cell as [y, x] indices into TERRAIN_NAMES."""
+        elevation = value_noise(self.width, self.height, self.scale, self.octaves, self.rng)
+        moisture = value_noise(self.width, self.height, self.scale, self.octaves, self.rng)
+        water, hills, mountains = np.quantile(
+            elevation, [self.WATER_SHARE, 1 - self.HILLS_SHARE - self.MOUNTAIN_SHARE, 1 - self.MOUNTAIN_SHARE]
+        )
+        land = (elevation >= water) & (elevation < hills)
+        wet = np.quantile(moisture[land], 1 - self.FOREST_SHARE) if land.any() else 1.0
+
+        indices = np.full(elevation.shape, TERRAIN_NAMES.index('plains'), dtype=np.int8)
+        indices[land & (moisture >= wet)] = TERRAIN_NAMES.index('forest')
+        indices[elevation >= hills] = TERRAIN_NAMES.index('hills')
+        indices[elevation >= mountains] = TERRAIN_NAMES.index('mountains')
+        indices[elevation < water] = TERRAIN_NAMES.index('water')
+        return indices
+
+    @staticmethod
+    def terrain_cells(indices: np.ndarray) -> List[List[dict]]:
+        """Convert terrain indices to GameState.terrain rows (cells share the TERRAIN_TYPES dicts)."""
+        cells = [TERRAIN_TYPES[name] for name in TERRAIN_NAMES]
+        return [[cells[i] for i in row] for row in indices.tolist()]
+
+    # Squad placement
+
+    def fitting_anchors(self, passable: np.ndarray, formation: Sequence[Tuple[int, int]]) -> np.ndarray:
+        """Get a [y, x] mask of anchors where the whole formation stands on passable cells."""
+        fits = np.zeros_like(passable)
+        min_dx, max_dx = min(dx for dx, _ in formation), max(dx for dx, _ in formation)
+        min_dy, max_dy = min(dy for _, dy in formation), max(dy for _, dy in formation)
+        inner = fits[-min_dy:self.height - max_dy, -min_dx:self.width - max_dx]
+        inner[...] = True
+        for dx, dy in formation:
+            inner &= passable[dy - min_dy:self.height - max_dy + dy, dx - min_dx:self.width - max_dx + dx]
+        return fits
+
+    def poisson_disc(self, count: int, spacing: float, allowed: np.ndarray,
+                     formation: Sequence[Tuple[int, int]] = DEFAULT_FORMATION,
+                     max_attempts: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        Pick up to `count` anchors among allowed cells, at least `spacing` apart.
+
+        Random candidates are checked against a spatial hash of the anchors placed so
+        far (buckets `spacing` wide, so only the 3x3 surrounding buckets are searched).
+        A candidate is also rejected if its formation's bounding box would touch another
+        one's, even when spacing is too small to rule that out on its own.
+        """
+        span_x = max(dx for dx, _ in formation) - min(dx for dx, _ in formation)
+        span_y = max(dy for _, dy in formation) - min(dy for _, dy in formation)
+        bucket = max(spacing, span_x + 1, span_y + 1)
+        min_distance = spacing * spacing
+
+        candidates = np.flatnonzero(allowed)
+        if len(candidates) == 0:
+            return []
+        max_attempts = max_attempts or count * 30
+        hash_grid: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        anchors = []
+        attempts = 0
+        while len(anchors) < count and attempts < max_attempts:
+            # Draw candidates in batches; the checks themselves are cheap dictionary lookups
+            batch = self.rng.choice(candidates, size=min(4096, max_attempts - attempts))
+            for y, x in zip(*np.divmod(batch, self.width)):
+                attempts += 1
+                x, y = int(x), int(y)
+                bx, by = int(x // bucket), int(y // bucket)
+                clear = True
+                for nx in (bx - 1, bx, bx + 1):
+                    for ny in (by - 1, by, by + 1):
+                        for ox, oy in hash_grid.get((nx, ny), ()):
+                            dx, dy = ox - x, oy - y
+                            if dx * dx + dy * dy < min_distance or (abs(dx) <= span_x and abs(dy) <= span_y):
+                                clear = False
+                                break
+                        if not clear:
+                            break
+                    if not clear:
+                        break
+                if clear:
+                    hash_grid.setdefault((bx, by), []).append((x, y))
+                    anchors.append((x, y))
+                    if len(anchors) == count:
+                        break
+        return anchors
+
+    def assign_factions(self, anchors: Sequence[Tuple[int, int]], factions: int) -> np.ndarray:
+        """Group anchors into territories: each joins the faction of the nearest capital."""
+        points = np.array(anchors, dtype=np.float64).reshape(-1, 2)
+        capitals = points[self.rng.choice(len(points), size=min(factions, len(points)), replace=False)]
+        owners = np.empty(len(points), dtype=np.int64)
+        for start in range(0, len(points), 1024):
+            chunk = points[start:start + 1024]
+            distances = ((chunk[:, None, :] - capitals[None, :, :]) ** 2).sum(axis=2)
+            owners[start:start + 1024] = distances.argmin(axis=1)
+        return owners
+
+    def faction_colors(self, factions: int) -> List[Tuple[int, int, int]]:
+        """Distinct colors in the range Squad picks from, one per faction (a faction is its color)."""
+        colors = []
+        seen = set()
+        while len(colors) < factions:
+            for color in map(tuple, self.rng.integers(50, 201, size=(factions, 3)).tolist()):
+                if color not in seen and len(colors) < factions:
+                    seen.add(color)
+                    colors.append(color)
+        return colors
+
+    def generate_squads(self, anchors: Sequence[Tuple[int, int]], factions: int,
+                        unit_types: Sequence[UnitType] = STARTING_CLASSES, max_units: int = 9,
+                        max_level: int = 3) -> List[Squad]:
+        """Create a squad of 1..max_units random units at every anchor, grouped into factions."""
+        count = len(anchors)
+        owners = self.assign_factions(anchors, factions)
+        colors = self.faction_colors(factions)
+        sizes = self.rng.integers(1, max_units + 1, size=count)
+        types = self.rng.choice([TYPE_INDEX[t] for t in unit_types], size=int(sizes.sum())).tolist()
+        levels = self.rng.integers(1, max_level + 1, size=len(types)).tolist()
+
+        compositions = []
+        start = 0
+        for size in sizes.tolist():
+            compositions.append([(UNIT_TYPES[t], level) for t, level in
+                                 zip(types[start:start + size], levels[start:start + size])])
+            start += size
+        faction_sizes = [0] * factions
+        names = []
+        for owner in owners.tolist():
+            faction_sizes[owner] += 1
+            names.append(f"Faction {owner + 1} Squad {faction_sizes[owner]}")
+        return create_squads(compositions, anchors, [colors[owner] for owner in owners.tolist()], names, self.rng)
+
+    def generate(self, squads: int, factions: int, spacing: float = 6.0) -> Tuple[np.ndarray, List[Squad]]:
+        """Generate the terrain indices and the squads of a whole world."""
+        indices = self.terrain_indices()
+        passable = np.array([TERRAIN_TYPES[name]['movement_cost'] < IMPASSABLE_COST for name in TERRAIN_NAMES])[indices]
+        anchors = self.poisson_disc(squads, spacing, self.fitting_anchors(passable, DEFAULT_FORMATION))
+        return indices, self.generate_squads(anchors, factions) if anchors else []
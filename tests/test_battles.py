@@ -0,0 +1,70 @@
+import asyncio
+import copy
+import json
+import os
+import random
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from game_state import GameState
+from systems.battles import BattleResolver, plan_waves
+
+TURN_SEED = 1234
+
+
+def full_state(game_state) -> dict:
+    """Everything a save holds, with the whole combat log, as it would be written (tuples as lists)."""
+    return json.loads(json.dumps(dict(game_state.to_dict(), combat_log=game_state.combat_log)))
+
+
+class BattleResolverTest(unittest.TestCase):
+    """Resolving the same battles with the same seed gives the same outcome however they are run."""
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(0)
+        world = GameState()
+        world.generate_world(60, 60, 80, 4, seed=0)
+        cls.saved = full_state(world)
+
+    def fight(self, resolver: BattleResolver, run_async: bool = False) -> dict:
+        # Copies of one saved game keep the squad and unit ids, so the results compare directly
+        # (from_dict keeps lists of the data it is given, so each copy gets its own)
+        game_state = GameState.from_dict(copy.deepcopy(self.saved))
+        rng = random.Random(0)
+        squads = game_state.squads
+        # Squads fight several battles each, so waves have to keep them in order
+        battles = [tuple(rng.sample(squads, 2)) for _ in range(120)]
+        try:
+            if run_async:
+                fought = asyncio.run(resolver.resolve_async(game_state, battles, TURN_SEED))
+            else:
+                fought = resolver.resolve(game_state, battles, TURN_SEED)
+        finally:
+            resolver.close()
+        self.assertGreater(fought, 0)
+        return full_state(game_state)
+
+    def test_workers_match_serial(self):
+        serial = self.fight(BattleResolver(workers=1))
+        self.assertEqual(self.fight(BattleResolver(workers=2, min_parallel=1)), serial)
+        self.assertEqual(self.fight(BattleResolver(workers=3, min_parallel=1)), serial)
+
+    def test_async_matches_serial(self):
+        serial = self.fight(BattleResolver(workers=1))
+        self.assertEqual(self.fight(BattleResolver(workers=1), run_async=True), serial)
+        self.assertEqual(self.fight(BattleResolver(workers=2, min_parallel=1), run_async=True), serial)
+
+    def test_waves_keep_squads_apart(self):
+        a, b, c, d = object(), object(), object(), object()
+        battles = [(a, b), (c, d), (a, c), (b, d), (a, b)]
+        waves = plan_waves(battles)
+        self.assertEqual(waves, [[0, 1], [2, 3], [4]])
+        for wave in waves:
+            squads = [squad for index in wave for squad in battles[index]]
+            self.assertEqual(len(squads), len(set(map(id, squads))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from squad import Squad
+from systems.combat_model import CombatModel
+from systems.factory import create_units
+from utils.constants import UnitType
+
+
+def make_squad(unit_types, level=3):
+    squad = Squad(0, 0)
+    for unit in create_units(unit_types, level):
+        squad.add_unit(unit)
+    return squad
+
+
+class CombatForecastTest(unittest.TestCase):
+    """Memoized forecasts shared between callers."""
+
+    def test_forecast_arrays_are_read_only(self):
+        model = CombatModel()
+        attacker = make_squad([UnitType.SOLDIER, UnitType.SCOUT])
+        defender = make_squad([UnitType.RECRUIT, UnitType.RECRUIT, UnitType.APPRENTICE])
+        forecast = model.forecast(attacker, defender)
+        survival = forecast.survival.copy()
+        for array in (forecast.survival, forecast.expected_hp, forecast.attacker_kills):
+            with self.assertRaises(ValueError):
+                array[0] = 0
+        again = model.forecast(attacker, defender)
+        self.assertIs(again, forecast)
+        self.assertEqual(list(again.survival), list(survival))
+
+
+if __name__ == '__main__':
+    unittest.main()
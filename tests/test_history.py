@@ -0,0 +1,80 @@
+import json
+import os
+import random
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from game_state import GameState
+
+
+def full_state(game_state) -> dict:
+    """Everything a save holds, with the whole combat log, as it would be written (tuples as lists)."""
+    return json.loads(json.dumps(dict(game_state.to_dict(), combat_log=game_state.combat_log)))
+
+
+class UndoHistoryTest(unittest.TestCase):
+    """Undo and redo restore the exact state around each committed action."""
+
+    def setUp(self):
+        random.seed(0)
+        self.game_state = GameState()
+        self.history = self.game_state.history
+
+    def play(self) -> list:
+        """Commit a few actions, returning the state before each one and after the last."""
+        game_state = self.game_state
+        first, second, third = game_state.squads[:3]
+        states = [full_state(game_state)]
+
+        first.x += 1
+        first.has_acted = True
+        game_state.notify('moved', first)
+        self.history.commit("Move")
+        states.append(full_state(game_state))
+
+        game_state.start_combat(second, first)
+        self.history.commit("Attack")
+        states.append(full_state(game_state))
+
+        reinforcements = game_state.create_random_squad(5, 5, "Reinforcements")
+        game_state.squads.append(reinforcements)
+        game_state.notify('added', reinforcements)
+        game_state.squads.remove(third)
+        game_state.notify('removed', third)
+        self.history.commit("Reinforce")
+        states.append(full_state(game_state))
+        return states
+
+    def test_undo_redo(self):
+        states = self.play()
+        for expected in reversed(states[:-1]):
+            self.assertIsNotNone(self.history.undo())
+            self.assertEqual(full_state(self.game_state), expected)
+        self.assertIsNone(self.history.undo())
+
+        for expected in states[1:]:
+            self.assertIsNotNone(self.history.redo())
+            self.assertEqual(full_state(self.game_state), expected)
+        self.assertIsNone(self.history.redo())
+
+    def test_new_action_clears_redo(self):
+        self.play()
+        self.history.undo()
+        squad = self.game_state.squads[0]
+        squad.y += 1
+        self.game_state.notify('moved', squad)
+        self.assertIsNotNone(self.history.commit("Move"))
+        self.assertFalse(self.history.can_redo())
+
+    def test_uncommitted_changes_are_undone_first(self):
+        states = self.play()
+        squad = self.game_state.squads[0]
+        squad.y += 1
+        self.game_state.notify('moved', squad)
+        self.assertEqual(self.history.undo(), "Unrecorded changes")
+        self.assertEqual(full_state(self.game_state), states[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from game_state import GameState
+from squad import Squad
+from systems.factory import create_units
+from utils.constants import TERRAIN_TYPES, UnitType
+
+SIZE = 20
+
+
+def make_squad(x: int, y: int, units: int) -> Squad:
+    squad = Squad(x, y)
+    for unit in create_units([UnitType.RECRUIT] * units, 1):
+        squad.add_unit(unit)
+    return squad
+
+
+class OccupancyFitsTest(unittest.TestCase):
+    """Whole-formation placement checks on an open plain with one water cell."""
+
+    def setUp(self):
+        self.game_state = GameState()
+        self.game_state.width = self.game_state.height = SIZE
+        self.game_state.terrain = [[TERRAIN_TYPES['plains']] * SIZE for _ in range(SIZE)]
+        self.game_state.terrain[10][15] = TERRAIN_TYPES['water']
+        self.full = make_squad(5, 5, 9)    # Covers (4..6, 4..6)
+        self.small = make_squad(12, 5, 3)  # Top row of its formation only: (11..13, 4)
+        self.game_state.squads = [self.full, self.small]
+        self.occupancy = self.game_state.occupancy
+
+    def test_own_cells_do_not_block(self):
+        self.assertTrue(self.occupancy.fits(self.full, 5, 5))
+        self.assertTrue(self.occupancy.fits(self.full, 6, 6))  # Overlaps where it stands now
+
+    def test_other_squads_block(self):
+        self.assertTrue(self.occupancy.fits(self.full, 8, 5))    # Right next to both
+        self.assertFalse(self.occupancy.fits(self.full, 10, 5))  # Would cover (11, 4)
+        self.assertFalse(self.occupancy.fits(self.small, 7, 5))  # Would cover (6, 4)
+
+    def test_only_living_slots_count(self):
+        # The small squad only covers the top row, so only that row has to be free
+        self.assertTrue(self.occupancy.fits(self.small, 12, 8))
+        self.assertTrue(self.occupancy.fits(self.small, 5, 8))   # Top row just below the full squad
+        self.assertFalse(self.occupancy.fits(self.small, 5, 7))  # Top row on (4..6, 6)
+        self.assertTrue(self.occupancy.fits(self.full, 12, 6))   # Covers (11..13, 5..7), below the small squad's row
+
+    def test_impassable_terrain_blocks(self):
+        self.assertFalse(self.occupancy.fits(self.full, 15, 10))
+        self.assertFalse(self.occupancy.fits(self.full, 14, 11))
+        self.assertTrue(self.occupancy.fits(self.full, 15, 13))
+
+    def test_map_edges(self):
+        self.assertFalse(self.occupancy.fits(self.full, 0, 5))
+        self.assertTrue(self.occupancy.fits(self.full, 1, 1))
+        self.assertFalse(self.occupancy.fits(self.full, SIZE - 1, 5))
+        self.assertTrue(self.occupancy.fits(self.full, SIZE - 2, SIZE - 2))
+
+    def test_follows_moves_and_losses(self):
+        self.small.x, self.small.y = 12, 15  # Now covers (11..13, 14)
+        self.game_state.notify('moved', self.small)
+        self.assertTrue(self.occupancy.fits(self.full, 10, 5))
+        self.assertFalse(self.occupancy.fits(self.full, 12, 15))
+
+        for unit in self.small.units:
+            unit.current_hp = 0
+        self.game_state.notify('changed', self.small)
+        self.assertTrue(self.occupancy.fits(self.full, 12, 15))
+
+    def test_matches_valid_destinations(self):
+        valid = self.occupancy.get_valid_destinations(self.full)
+        for y in range(SIZE):
+            for x in range(SIZE):
+                self.assertEqual(bool(valid[y, x]), self.occupancy.fits(self.full, x, y), (x, y))
+
+
+if __name__ == '__main__':
+    unittest.main()
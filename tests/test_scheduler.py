@@ -0,0 +1,45 @@
+import asyncio
+import os
+import time
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from ui.scheduler import FrameScheduler
+
+
+class NextFrameTest(unittest.IsolatedAsyncioTestCase):
+    """Pacing of the asyncio frame loop."""
+
+    def setUp(self):
+        pygame.display.init()
+        pygame.display.set_mode((16, 16))
+        pygame.event.get()
+        self.scheduler = FrameScheduler(target_fps=60, idle_fps=4, idle_after=0.0)
+        self.scheduler.dirty = False
+
+    def tearDown(self):
+        pygame.display.quit()
+
+    async def timed_frame(self) -> float:
+        started = time.monotonic()
+        await self.scheduler.next_frame()
+        return time.monotonic() - started
+
+    async def test_idle_frame_sleeps_longer(self):
+        self.assertGreater(await self.timed_frame(), 0.2)
+
+    async def test_input_wakes_idle_frame(self):
+        asyncio.get_running_loop().call_later(
+            0.05, lambda: pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a)))
+        self.assertLess(await self.timed_frame(), 0.15)
+        self.assertTrue(self.scheduler.get_events(block=False))
+
+    async def test_invalidate_wakes_idle_frame(self):
+        asyncio.get_running_loop().call_later(0.05, self.scheduler.invalidate)
+        self.assertLess(await self.timed_frame(), 0.15)
+
+
+if __name__ == '__main__':
+    unittest.main()
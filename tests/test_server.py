@@ -0,0 +1,91 @@
+import asyncio
+import os
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from game_state import GameState
+from net.client import GameClient
+from net.server import GameServer
+
+
+class ServerMoveTest(unittest.IsolatedAsyncioTestCase):
+    """Moves sent by a local client over a real connection."""
+
+    async def asyncSetUp(self):
+        self.game_state = GameState()
+        self.server = GameServer(self.game_state, host='127.0.0.1', port=0)
+        await self.server.start()
+        self.client = GameClient('127.0.0.1', self.server.port)
+        await self.client.connect()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.stop()
+
+    def find_move(self, squad):
+        """A reachable cell other than the squad's own where its formation fits."""
+        reachable = self.game_state.pathfinder.get_reachable_cells(squad, squad.get_effective_move_range())
+        for cell in sorted(reachable, key=reachable.get, reverse=True):
+            if cell != (squad.x, squad.y) and self.game_state.occupancy.fits(squad, *cell):
+                return cell
+        return None
+
+    async def test_squad_ids(self):
+        # The wire uses the stable Squad.id saves, state_diff and snapshots use
+        self.assertEqual(set(self.client.squads), {squad.id for squad in self.game_state.squads if squad.is_alive()})
+
+    async def test_move(self):
+        for squad in self.game_state.squads:
+            target = self.find_move(squad)
+            if target is not None:
+                break
+        else:
+            self.skipTest("No squad can move")
+        squad_id = self.server.encoder.get_id(squad)
+
+        reply = await self.client.send('move', squad=squad_id, x=target[0], y=target[1])
+        self.assertTrue(reply['ok'], reply)
+        self.assertEqual((squad.x, squad.y), target)
+        self.assertTrue(squad.has_acted)
+        await self.client.sync()
+        record = self.client.squads[squad_id]
+        self.assertEqual((record['x'], record['y']), target)
+
+    async def test_second_move_refused(self):
+        squad = next((squad for squad in self.game_state.squads if self.find_move(squad)), None)
+        if squad is None:
+            self.skipTest("No squad can move")
+        squad_id = self.server.encoder.get_id(squad)
+        start = (squad.x, squad.y)
+        target = self.find_move(squad)
+        self.assertTrue((await self.client.send('move', squad=squad_id, x=target[0], y=target[1]))['ok'])
+
+        # Moving back would be in range, but the squad has used its action for this turn
+        moved_to = (squad.x, squad.y)
+        reply = await self.client.send('move', squad=squad_id, x=start[0], y=start[1])
+        self.assertFalse(reply['ok'])
+        self.assertEqual(reply['error'], "Squad has already acted")
+        self.assertEqual((squad.x, squad.y), moved_to)
+
+    async def test_end_turn(self):
+        turn = self.game_state.current_turn
+        ticks = self.server.tick
+        reply = await self.client.send('end_turn')
+        self.assertTrue(reply['ok'], reply)
+        self.assertEqual(reply['turn'], turn + 1)
+        self.assertGreater(self.server.tick, ticks)
+        await self.client.sync()
+        self.assertEqual(self.client.turn, turn + 1)
+
+    async def test_move_out_of_range(self):
+        squad = self.game_state.squads[0]
+        start = (squad.x, squad.y)
+        far = (self.game_state.width - 1 - start[0], self.game_state.height - 1 - start[1])
+        reply = await self.client.send('move', squad=self.server.encoder.get_id(squad), x=far[0], y=far[1])
+        self.assertFalse(reply['ok'])
+        self.assertEqual((squad.x, squad.y), start)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import random
+import tempfile
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+from game_state import GameState
+from systems.snapshots import UNIT_TYPES, SnapshotWriter, capture_squads, capture_units, load_snapshots
+
+
+class SnapshotRoundTripTest(unittest.TestCase):
+    """What SnapshotWriter records is what load_snapshots reads back."""
+
+    def setUp(self):
+        random.seed(0)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'snapshots')
+        self.game_state = GameState()
+        self.game_state.turns.remove_phase('autosave')
+        self.writer = SnapshotWriter(self.path)
+        self.addCleanup(self.directory.cleanup)
+
+    def record_turns(self, turns: int) -> dict:
+        """Record and play turns, returning the captured columns of each recorded turn."""
+        expected = {}
+        for _ in range(turns):
+            first, second = self.game_state.squads[:2]
+            self.game_state.start_combat(first, second)
+            first.x += 1
+            self.game_state.notify('moved', first)
+            expected[self.game_state.current_turn] = (capture_units(self.game_state), capture_squads(self.game_state))
+            self.writer.record(self.game_state)
+            self.game_state.end_turn()
+        return expected
+
+    def assertColumnsEqual(self, loaded, captured):
+        self.assertEqual(set(loaded), set(captured))
+        for name, values in captured.items():
+            np.testing.assert_array_equal(loaded[name], values, err_msg=name)
+            self.assertEqual(loaded[name].dtype, values.dtype, name)
+
+    def test_empty(self):
+        series = load_snapshots(self.path)
+        self.assertEqual(len(series.turn_numbers()), 0)
+        self.assertEqual(series.unit_types, UNIT_TYPES)
+        self.writer.close()
+
+    def test_round_trip_while_writing(self):
+        # Every recorded turn is readable right away, without closing the writer
+        expected = self.record_turns(3)
+        series = load_snapshots(self.path)
+        self.assertEqual(list(series.turn_numbers()), list(expected))
+        for turn, (units, squads) in expected.items():
+            self.assertColumnsEqual(series.turn_units(turn), units)
+            self.assertColumnsEqual(series.turn_squads(turn), squads)
+        self.writer.close()
+
+    def test_round_trip_after_close(self):
+        expected = self.record_turns(2)
+        self.writer.close()
+        series = load_snapshots(self.path)
+        for turn, (units, squads) in expected.items():
+            self.assertColumnsEqual(series.turn_units(turn), units)
+            self.assertColumnsEqual(series.turn_squads(turn), squads)
+        with self.assertRaises(KeyError):
+            series.turn_units(max(expected) + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import os
+import random
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from game_state import GameState
+from state_diff import apply_patch, capture_state, diff_states
+
+
+def full_state(game_state) -> dict:
+    """Everything a save holds, with the whole combat log, as it would be written (tuples as lists)."""
+    return json.loads(json.dumps(dict(game_state.to_dict(), combat_log=game_state.combat_log)))
+
+
+def change_game(game_state) -> None:
+    """Make one of every kind of change a patch can carry."""
+    first, second, third = game_state.squads[:3]
+    game_state.start_combat(first, second)  # Unit HP, experience and the combat log
+    first.x += 1
+    game_state.notify('moved', first)
+    reinforcements = game_state.create_random_squad(5, 5, "Reinforcements")
+    game_state.squads.append(reinforcements)
+    game_state.notify('added', reinforcements)
+    game_state.squads.append(game_state.squads.pop(0))  # Reorder
+    game_state.squads.remove(third)
+    game_state.notify('removed', third)
+    game_state.selected_squad = second
+    game_state.current_turn += 1
+
+
+class StateDiffTest(unittest.TestCase):
+    """diff_states and apply_patch between two copies of one game."""
+
+    def setUp(self):
+        random.seed(0)
+        self.game_state = GameState()
+        self.copy = GameState.from_dict(full_state(self.game_state))
+
+    def test_copies_do_not_differ(self):
+        self.assertEqual(diff_states(self.copy, self.game_state), {})
+
+    def test_round_trip(self):
+        before = capture_state(self.game_state)
+        change_game(self.game_state)
+        patch = diff_states(before, self.game_state)
+        self.assertLessEqual({'game', 'log', 'add', 'remove', 'squads'}, set(patch))
+
+        # Patches are JSON-compatible, so they survive being sent or journaled
+        apply_patch(self.copy, json.loads(json.dumps(patch)))
+        self.assertEqual(full_state(self.copy), full_state(self.game_state))
+        self.assertEqual(diff_states(self.copy, self.game_state), {})
+
+    def test_reverse_patch(self):
+        before = capture_state(self.game_state)
+        original = full_state(self.game_state)
+        change_game(self.game_state)
+        apply_patch(self.game_state, diff_states(self.game_state, before))
+        self.assertEqual(full_state(self.game_state), original)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1 @@
+"""Command-line balance and analysis tools. Run each from the repository root as python -m tools.<name>."""
@@ -0,0 +1,65 @@
+import argparse
+import json
+import random
+import time
+from game_state import GameState
+from systems.memory import MemoryTracker, memory_report
+
+
+def queue_battles(game_state: GameState, battles: int, rng: random.Random) -> int:
+    """Queue up to `battles` attacks between random squads of different factions."""
+    queued = 0
+    for _ in range(battles * 4):
+        if queued == battles or len(game_state.squads) < 2:
+            break
+        attacker, defender = rng.sample(game_state.squads, 2)
+        if tuple(attacker.color) != tuple(defender.color) and game_state.queue_attack(attacker, defender):
+            queued += 1
+    return queued
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report memory use by subsystem over a headless campaign. Run from the repository root as: python -m tools.memory_report"
+    )
+    parser.add_argument('--size', type=int, default=500, help="Width and height of the generated world")
+    parser.add_argument('--squads', type=int, default=2000)
+    parser.add_argument('--factions', type=int, default=8)
+    parser.add_argument('--turns', type=int, default=10)
+    parser.add_argument('--battles', type=int, default=100, help="Battles queued per turn")
+    parser.add_argument('--every', type=int, default=5, help="Print a full report every N turns")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-trace', action='store_true', help="Only count objects, without tracemalloc")
+    parser.add_argument('--json', help="Write every full report to this file as JSON lines")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    random.seed(args.seed)
+    rng = random.Random(args.seed)
+    game_state = GameState()
+    game_state.generate_world(args.size, args.size, args.squads, args.factions, seed=args.seed)
+    game_state.turns.remove_phase('autosave')  # Saves are measured by the report instead
+    tracker = None
+    if not args.no_trace:
+        tracker = MemoryTracker()
+        game_state.turns.add_phase('memory', tracker.phase)
+        tracker.take(game_state.current_turn)
+
+    reports = [memory_report(game_state)]
+    print(reports[-1].format())
+    for turn in range(1, args.turns + 1):
+        queue_battles(game_state, args.battles, rng)
+        game_state.end_turn()
+        if turn % args.every == 0 or turn == args.turns:
+            reports.append(memory_report(game_state, tracker=tracker))
+            print(reports[-1].format())
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            for report in reports:
+                f.write(json.dumps(report.to_dict()) + '\n')
+    print(f"\nDone in {time.perf_counter() - started:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
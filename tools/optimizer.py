@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+from squad import Squad
+from unit import Unit
+from tools.tournament import Composition, describe, parse_composition, play_battle
+from utils.constants import UnitType, UNIT_STATS, BATTLE_MAX_ROUNDS
+
+Key = Tuple[Tuple[str, int], ...]  # Sorted (unit type value, level) pairs: order doesn't affect combat
+Evaluation = Tuple[float, float, float]  # (score, win rate, rated power)
+
+
+def composition_key(composition: Composition) -> Key:
+    return tuple(sorted((unit_type.value, level) for unit_type, level in composition))
+
+
+def key_to_composition(key: Key) -> Composition:
+    return [(UnitType(value), level) for value, level in key]
+
+
+def rated_power(composition: Composition) -> float:
+    """
+    Squad.get_total_power of the composition with average base stats, scaled up by the
+    sum of its formation and commander bonuses.
+    """
+    squad = Squad(0, 0, color=(0, 0, 0), name="Rated")
+    for unit_type, level in composition:
+        stats = UNIT_STATS[unit_type]
+        base_stats = {
+            'max_hp': stats['base_hp'], 'strength': stats['base_str'], 'agility': stats['base_agi'],
+            'intelligence': stats['base_int'], 'move': stats['move'], 'range': stats['range']
+        }
+        squad.add_unit(Unit(unit_type, level, base_stats=base_stats))
+    bonus = sum(squad.get_formation_bonus().values()) + sum(squad.get_commander_bonus().values())
+    return squad.get_total_power() * (1 + bonus)
+
+
+class CompositionEvaluator:
+    """
+    Memoized scoring of compositions against a fixed set of reference opponents.
+
+    The score is the simulated win rate (draws count half) plus power_weight times the
+    rated power relative to the opponents' average. Battles against the n-th opponent
+    always use the same seed, so every composition faces the same dice.
+    """
+
+    def __init__(self, opponents: Sequence[Composition], games: int = 10, seed: int = 0,
+                 power_weight: float = 0.1, max_rounds: int = BATTLE_MAX_ROUNDS):
+        self.opponents = list(opponents)
+        self.games = games
+        self.seed = seed
+        self.power_weight = power_weight
+        self.max_rounds = max_rounds
+        self.reference_power = sum(map(rated_power, self.opponents)) / len(self.opponents)
+        self.cache: Dict[Key, Evaluation] = {}
+
+    def evaluate(self, composition: Composition) -> Evaluation:
+        key = composition_key(composition)
+        evaluation = self.cache.get(key)
+        if evaluation is None:
+            evaluation = self.cache[key] = self._evaluate(key_to_composition(key))
+        return evaluation
+
+    def _evaluate(self, composition: Composition) -> Evaluation:
+        score = 0.0
+        for index, opponent in enumerate(self.opponents):
+            # play_battle rolls unit stats from the global random module
+            random.seed(f"{self.seed}:{index}")
+            for game in range(self.games):
+                score += play_battle(composition, opponent, random, a_first=game % 2 == 0, max_rounds=self.max_rounds)
+        win_rate = score / (len(self.opponents) * self.games)
+        power = rated_power(composition)
+        return (win_rate + self.power_weight * power / self.reference_power, win_rate, power)
+
+
+def search_worker(args) -> Dict[Key, Evaluation]:
+    """
+    Worker task: hill-climb from random starts until the time budget runs out.
+    Returns every composition it evaluated.
+    """
+    (worker_seed, budget, size, level, unit_types, opponents, games, seed, power_weight,
+     max_rounds, patience) = args
+    deadline = time.perf_counter() + budget
+    rng = random.Random(worker_seed)
+    evaluator = CompositionEvaluator(opponents, games, seed, power_weight, max_rounds)
+
+    while time.perf_counter() < deadline:
+        current = [(rng.choice(unit_types), level) for _ in range(size)]
+        current_score = evaluator.evaluate(current)[0]
+        stale = 0
+        while stale < patience and time.perf_counter() < deadline:
+            # Neighbor: swap one unit for another type
+            candidate = list(current)
+            candidate[rng.randrange(size)] = (rng.choice(unit_types), level)
+            score = evaluator.evaluate(candidate)[0]
+            if score > current_score:
+                current, current_score, stale = candidate, score, 0
+            else:
+                stale += 1
+    return evaluator.cache
+
+
+def optimize(opponents: Sequence[Composition], budget: float = 10.0, top: int = 10, size: int = 9,
+             level: int = 1, unit_types: Sequence[UnitType] = None, games: int = 10, seed: int = 0,
+             power_weight: float = 0.1, max_rounds: int = BATTLE_MAX_ROUNDS, patience: int = 40,
+             workers: int = None) -> List[Tuple[Composition, Evaluation]]:
+    """
+    Search for the best compositions of `size` units at `level` within `budget` seconds.
+
+    Each worker process hill-climbs from its own random starts with its own memo cache;
+    the caches are merged and the `top` best compositions returned with their
+    (score, win rate, rated power), best first.
+    """
+    unit_types = list(unit_types or UNIT_STATS)
+    workers = workers or os.cpu_count()
+    tasks = [
+        (seed * 1000 + worker, budget, size, level, unit_types, list(opponents), games, seed,
+         power_weight, max_rounds, patience)
+        for worker in range(workers)
+    ]
+    evaluations: Dict[Key, Evaluation] = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for cache in executor.map(search_worker, tasks):
+            evaluations.update(cache)
+    ranked = sorted(evaluations.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    return [(key_to_composition(key), evaluation) for key, evaluation in ranked]
+
+
+def reference_opponents(count: int, size: int, level: int, seed: int = 0) -> List[Composition]:
+    """Random full squads at the given level, used when no opponents are given."""
+    rng = random.Random(seed)
+    unit_types = list(UNIT_STATS)
+    return [[(rng.choice(unit_types), level) for _ in range(size)] for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Search for the strongest squad compositions. Run from the repository root as: python -m tools.optimizer"
+    )
+    parser.add_argument('--budget', type=float, default=10.0, help="Search time in seconds")
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--size', type=int, default=9, help="Units per squad")
+    parser.add_argument('--level', type=int, default=1, help="Level of every unit")
+    parser.add_argument('--opponents', help="JSON file with reference compositions (default: random squads)")
+    parser.add_argument('--games', type=int, default=10, help="Battles against each opponent")
+    parser.add_argument('--power-weight', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+    if not 1 <= args.size <= 9:
+        parser.error("--size must be between 1 and 9")
+
+    if args.opponents:
+        with open(args.opponents) as f:
+            opponents = [parse_composition(data) for data in json.load(f)]
+    else:
+        opponents = reference_opponents(8, args.size, args.level, args.seed)
+
+    results = optimize(opponents, args.budget, args.top, args.size, args.level, games=args.games,
+                       seed=args.seed, power_weight=args.power_weight, workers=args.workers)
+    print(f"{'Score':>6} {'Win%':>6} {'Power':>7}  Composition")
+    for composition, (score, win_rate, power) in results:
+        print(f"{score:6.3f} {win_rate * 100:5.1f}% {power:7.1f}  {describe(composition)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+import argparse
+import time
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from utils.constants import UnitType, UNIT_STATS
+
+# Stats that grow with level: (base stat key, variation key, growth key, halved growth)
+# mirroring Unit._generate_base_stats and Unit.update_stats
+GROWING_STATS = {
+    'max_hp': ('base_hp', 'hp_var', 'growth_hp', False),
+    'strength': ('base_str', 'str_var', 'growth_str', True),
+    'agility': ('base_agi', 'agi_var', 'growth_agi', True),
+    'intelligence': ('base_int', 'int_var', 'growth_int', True),
+}
+UNIT_TYPES = list(UNIT_STATS)
+TYPE_INDEX = {unit_type: i for i, unit_type in enumerate(UNIT_TYPES)}
+
+
+def _stat_column(key: str) -> np.ndarray:
+    return np.array([UNIT_STATS[unit_type][key] for unit_type in UNIT_TYPES], dtype=np.int64)
+
+
+def variation_bounds(variation) -> tuple:
+    """Bounds of the random.randint(-var//2, var//2) roll in _generate_base_stats."""
+    return (-variation) // 2, variation // 2
+
+
+def grown_stat(base, level, growth, halved: bool):
+    """Unit.update_stats for one stat: base plus level growth, at least 1 (works on arrays)."""
+    growth_total = (level - 1) * growth
+    if halved:
+        growth_total = growth_total // 2
+    return np.maximum(1, base + growth_total)
+
+
+def xp_to_next_level(level):
+    """Unit.get_exp_to_next_level (works on arrays)."""
+    return 100 + level * 20
+
+
+def stat_table(unit_type: UnitType, max_level: int = 20) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Get exact per-level distributions of a unit type's growing stats.
+
+    Base stats are uniform integer rolls (see variation_bounds) and growth is deterministic,
+    so for each stat and level 1..max_level this returns the 'mean', 'std', 'min' and 'max'
+    as arrays indexed by level - 1. Level 1 of the 'min'/'max' is the range of fresh recruits.
+    """
+    stats = UNIT_STATS[unit_type]
+    levels = np.arange(1, max_level + 1)
+    table = {}
+    for name, (base_key, variation_key, growth_key, halved) in GROWING_STATS.items():
+        low, high = variation_bounds(stats[variation_key])
+        rolls = stats[base_key] + np.arange(low, high + 1)
+        # Every roll is equally likely: evaluate the stat for each (level, roll) and reduce
+        values = grown_stat(rolls[None, :], levels[:, None], stats[growth_key], halved)
+        table[name] = {
+            'mean': values.mean(axis=1),
+            'std': values.std(axis=1),
+            'min': values.min(axis=1),
+            'max': values.max(axis=1),
+        }
+    table['xp_to_next'] = {'mean': xp_to_next_level(levels).astype(float)}
+    table['xp_total'] = {'mean': np.concatenate(([0], np.cumsum(xp_to_next_level(levels[:-1])))).astype(float)}
+    return table
+
+
+class ProgressionSimulator:
+    """
+    Projects level, XP, FP and stat trajectories of many units over many battles at once.
+
+    Each battle a unit kills an enemy with probability kill_chance, earning
+    50 + 10 * enemy_level XP, and its side wins with probability win_rate, earning the 25 XP
+    victory bonus, as in start_combat. Every XP grant goes through the add_experience rule:
+    a level up once experience reaches 100 + 20 * level, resetting experience to 0.
+
+    The add_experience the game calls (the later definition in Unit) grants no future
+    points; the FP accrual is only in the first, shadowed definition. So FP stay at 0 and
+    units never promote unless accrue_fp is set, which applies that shadowed rule: 1 FP
+    per 10 XP of each grant (at least 1, as add_future_points), capped at 100, and only
+    while the unit has a promotion ahead. UNIT_STATS currently has no 'promotes_to'
+    entries, so a promotion path can be given explicitly: the unit promotes into the next
+    type of the path once it has 100 FP, keeping its base stats (as promote does) and
+    starting again from 0 FP.
+    """
+
+    def __init__(self, path: Sequence[UnitType], count: int = 1000, kill_chance: float = 0.3,
+                 win_rate: float = 0.5, enemy_level: int = 1, seed: Optional[int] = None,
+                 accrue_fp: bool = False):
+        self.path = np.array([TYPE_INDEX[unit_type] for unit_type in path], dtype=np.int64)
+        self.accrue_fp = accrue_fp
+        self.count = count
+        self.kill_chance = kill_chance
+        self.win_rate = win_rate
+        self.enemy_level = enemy_level
+        self.rng = np.random.default_rng(seed)
+
+        # Base stats are rolled once, for the starting type (promote keeps them)
+        start = UNIT_STATS[path[0]]
+        self.base = {}
+        for name, (base_key, variation_key, _, _) in GROWING_STATS.items():
+            low, high = variation_bounds(start[variation_key])
+            self.base[name] = start[base_key] + self.rng.integers(low, high + 1, size=count)
+        self.growth = {name: _stat_column(keys[2]) for name, keys in GROWING_STATS.items()}
+
+        self.level = np.ones(count, dtype=np.int64)
+        self.experience = np.zeros(count, dtype=np.int64)
+        self.future_points = np.zeros(count, dtype=np.int64)
+        self.stage = np.zeros(count, dtype=np.int64)  # Index into path
+        self.battles = 0
+
+    @property
+    def unit_type(self) -> np.ndarray:
+        """Type index (into UNIT_TYPES) of every unit."""
+        return self.path[self.stage]
+
+    def stats(self) -> Dict[str, np.ndarray]:
+        """Current growing stats of every unit."""
+        unit_type = self.unit_type
+        return {
+            name: grown_stat(self.base[name], self.level, self.growth[name][unit_type], keys[3])
+            for name, keys in GROWING_STATS.items()
+        }
+
+    def _grant(self, xp: int, mask: np.ndarray) -> None:
+        self.experience[mask] += xp
+        leveled = mask & (self.experience >= xp_to_next_level(self.level))
+        self.level[leveled] += 1
+        self.experience[leveled] = 0
+
+        if not self.accrue_fp:
+            return
+        can_promote = mask & (self.stage < len(self.path) - 1)
+        self.future_points[can_promote] = np.minimum(100, self.future_points[can_promote] + max(1, xp // 10))
+
+    def step(self) -> None:
+        """Fight one battle with every unit."""
+        kills = self.rng.random(self.count) < self.kill_chance
+        wins = self.rng.random(self.count) < self.win_rate
+        self._grant(50 + self.enemy_level * 10, kills)
+        self._grant(25, wins)
+
+        promoting = (self.future_points >= 100) & (self.stage < len(self.path) - 1)
+        self.stage[promoting] += 1
+        self.future_points[promoting] = 0
+        self.battles += 1
+
+    def run(self, battles: int, record_every: int = 1) -> Dict[str, np.ndarray]:
+        """
+        Fight `battles` battles, recording a [sample, unit] trajectory of every quantity
+        after each record_every battles (sample 0 is the starting state).
+        """
+        samples: Dict[str, List[np.ndarray]] = {'battle': [], 'level': [], 'experience': [],
+                                                'future_points': [], 'unit_type': []}
+        samples.update({name: [] for name in GROWING_STATS})
+
+        def record():
+            samples['battle'].append(np.array(self.battles))
+            samples['level'].append(self.level.copy())
+            samples['experience'].append(self.experience.copy())
+            samples['future_points'].append(self.future_points.copy())
+            samples['unit_type'].append(self.unit_type.copy())
+            for name, values in self.stats().items():
+                samples[name].append(values)
+
+        record()
+        for battle in range(1, battles + 1):
+            self.step()
+            if battle % record_every == 0 or battle == battles:
+                record()
+        return {name: np.stack(values) for name, values in samples.items()}
+
+
+def summarize(trajectory: Dict[str, np.ndarray], fields: Sequence[str]) -> List[str]:
+    """Format mean and 10th/90th percentiles of fields at each recorded battle."""
+    lines = [f"{'Battle':>6}" + "".join(f" {field[:12]:>20}" for field in fields)]
+    for sample, battle in enumerate(trajectory['battle']):
+        cells = []
+        for field in fields:
+            values = trajectory[field][sample]
+            low, high = np.percentile(values, [10, 90])
+            cells.append(f" {values.mean():8.1f} [{low:4.0f}-{high:4.0f}]")
+        lines.append(f"{int(battle):6d}" + "".join(cells))
+    return lines
+
+
+def parse_path(text: str) -> List[UnitType]:
+    names = [name.strip() for name in text.split(',') if name.strip()]
+    return [UnitType[name.upper()] if name.upper() in UnitType.__members__ else UnitType(name) for name in names]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Project unit progression curves. Run from the repository root as: python -m tools.progression"
+    )
+    parser.add_argument('--levels', type=int, default=10, help="Levels in the per-type stat tables")
+    parser.add_argument('--type', dest='unit_type', help="Only print the stat table of this type")
+    parser.add_argument('--path', help="Simulate units along a promotion path, e.g. Recruit,Soldier,Veteran")
+    parser.add_argument('--units', type=int, default=5000)
+    parser.add_argument('--battles', type=int, default=100)
+    parser.add_argument('--every', type=int, default=10, help="Report every N battles")
+    parser.add_argument('--kill-chance', type=float, default=0.3)
+    parser.add_argument('--win-rate', type=float, default=0.5)
+    parser.add_argument('--enemy-level', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--accrue-fp', action='store_true',
+                        help="Grant 1 FP per 10 XP and promote along the path at 100 FP "
+                             "(the game's add_experience currently grants no FP)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    unit_types = parse_path(args.unit_type) if args.unit_type else UNIT_TYPES
+    for unit_type in unit_types:
+        table = stat_table(unit_type, args.levels)
+        print(f"\n{unit_type.value}")
+        print(f"{'Lv':>3} {'HP':>12} {'Str':>12} {'Agi':>12} {'Int':>12} {'XP next':>8}")
+        for i in range(args.levels):
+            cells = "".join(
+                f" {table[name]['mean'][i]:6.1f}±{table[name]['std'][i]:4.1f}" for name in GROWING_STATS
+            )
+            print(f"{i + 1:3d}{cells} {table['xp_to_next']['mean'][i]:8.0f}")
+
+    if args.path:
+        path = parse_path(args.path)
+        simulator = ProgressionSimulator(path, args.units, args.kill_chance, args.win_rate,
+                                         args.enemy_level, args.seed, args.accrue_fp)
+        trajectory = simulator.run(args.battles, args.every)
+        print(f"\n{args.units} units along {' -> '.join(t.value for t in path)}")
+        print("\n".join(summarize(trajectory, ['level', 'future_points', 'max_hp', 'strength'])))
+        final_types = np.bincount(trajectory['unit_type'][-1], minlength=len(UNIT_TYPES))
+        print("Final classes: " + ", ".join(
+            f"{UNIT_TYPES[i].value} {count}" for i, count in enumerate(final_types) if count
+        ))
+    print(f"\nDone in {time.perf_counter() - started:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
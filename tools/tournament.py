@@ -0,0 +1,244 @@
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from squad import Squad
+from unit import Unit
+from systems.combat import resolve_attack
+from utils.constants import UnitType, UNIT_STATS, BATTLE_MAX_ROUNDS
+
+Composition = List[Tuple[UnitType, int]]  # (unit type, level) for each unit, at most 9
+PairResult = Tuple[int, int, int, int, int]  # (i, j, wins of i, wins of j, draws)
+
+
+def parse_composition(data) -> Composition:
+    """Read a composition from JSON: a list of [unit type name or value, level]."""
+    composition = []
+    for unit_type, level in data:
+        unit_type = UnitType[unit_type] if unit_type in UnitType.__members__ else UnitType(unit_type)
+        composition.append((unit_type, int(level)))
+    if not 1 <= len(composition) <= 9:
+        raise ValueError(f"A composition needs 1 to 9 units, got {len(composition)}")
+    return composition
+
+
+def describe(composition: Composition) -> str:
+    """Short label such as '2x Soldier L3, Mage L1'."""
+    counts: Dict[Tuple[UnitType, int], int] = {}
+    for unit in composition:
+        counts[unit] = counts.get(unit, 0) + 1
+    return ", ".join(
+        f"{count}x {unit_type.value} L{level}" if count > 1 else f"{unit_type.value} L{level}"
+        for (unit_type, level), count in counts.items()
+    )
+
+
+def random_compositions(count: int, seed: int = 0, max_level: int = 5) -> List[Composition]:
+    """Generate random compositions of 3-9 units of any type."""
+    rng = random.Random(seed)
+    unit_types = list(UNIT_STATS)
+    return [
+        [(rng.choice(unit_types), rng.randint(1, max_level)) for _ in range(rng.randint(3, 9))]
+        for _ in range(count)
+    ]
+
+
+def build_squad(composition: Composition, color: Tuple[int, int, int], name: str) -> Squad:
+    """Create a fresh squad (with newly rolled base stats) from a composition."""
+    squad = Squad(0, 0, color=color, name=name)
+    for unit_type, level in composition:
+        squad.add_unit(Unit(unit_type, level))
+    return squad
+
+
+def play_battle(composition_a: Composition, composition_b: Composition, rng=random,
+                a_first: bool = True, max_rounds: int = BATTLE_MAX_ROUNDS) -> float:
+    """
+    Fight two fresh squads, attacking in turns with the start_combat rules.
+    Returns A's score: 1 for a win, 0 for a loss, 0.5 if both survive max_rounds.
+    """
+    a = build_squad(composition_a, (200, 60, 60), "A")
+    b = build_squad(composition_b, (60, 60, 200), "B")
+    first, second = (a, b) if a_first else (b, a)
+    for _ in range(max_rounds):
+        resolve_attack(first, second, rng=rng)
+        if not second.is_alive():
+            break
+        resolve_attack(second, first, rng=rng)
+        if not first.is_alive():
+            break
+    if a.is_alive() == b.is_alive():
+        return 0.5
+    return 1.0 if a.is_alive() else 0.0
+
+
+def play_pair(args) -> PairResult:
+    """Worker task: play every game between compositions i and j (sides alternate)."""
+    i, j, composition_a, composition_b, games, seed, max_rounds = args
+    # Unit stats are rolled from the global random module, so seed it per pair: results
+    # then don't depend on which worker plays the pair or in what order
+    random.seed(f"{seed}:{i}:{j}")
+    wins_a = wins_b = draws = 0
+    for game in range(games):
+        score = play_battle(composition_a, composition_b, random, a_first=game % 2 == 0, max_rounds=max_rounds)
+        if score == 1.0:
+            wins_a += 1
+        elif score == 0.0:
+            wins_b += 1
+        else:
+            draws += 1
+    return (i, j, wins_a, wins_b, draws)
+
+
+class Tournament:
+    """
+    Round-robin between compositions, played across processes with checkpointing.
+
+    Every pair plays `games` battles. Finished pairs are written to the checkpoint file
+    (if any) every checkpoint_interval seconds and at the end, and a tournament started
+    with the same settings and checkpoint skips the pairs already played.
+    """
+
+    def __init__(self, compositions: Sequence[Composition], games: int = 20, seed: int = 0,
+                 max_rounds: int = BATTLE_MAX_ROUNDS, checkpoint: Optional[str] = None,
+                 checkpoint_interval: float = 10.0):
+        self.compositions = list(compositions)
+        self.games = games
+        self.seed = seed
+        self.max_rounds = max_rounds
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.results: Dict[Tuple[int, int], PairResult] = {}
+        self.battles_per_second = 0.0
+        if checkpoint and os.path.exists(checkpoint):
+            self.load_checkpoint()
+
+    def _settings(self) -> dict:
+        return {
+            'compositions': [[[unit_type.value, level] for unit_type, level in c] for c in self.compositions],
+            'games': self.games, 'seed': self.seed, 'max_rounds': self.max_rounds
+        }
+
+    def load_checkpoint(self) -> None:
+        with open(self.checkpoint) as f:
+            data = json.load(f)
+        if data['settings'] != self._settings():
+            raise ValueError(f"Checkpoint {self.checkpoint} was written for a different tournament")
+        self.results = {(r[0], r[1]): tuple(r) for r in data['results']}
+
+    def save_checkpoint(self) -> None:
+        # Write to a temporary file first so an interrupted save never corrupts the checkpoint
+        temp = self.checkpoint + '.tmp'
+        with open(temp, 'w') as f:
+            json.dump({'settings': self._settings(), 'results': sorted(self.results.values())}, f)
+        os.replace(temp, self.checkpoint)
+
+    def pending_pairs(self) -> List[Tuple[int, int]]:
+        count = len(self.compositions)
+        return [(i, j) for i in range(count) for j in range(i + 1, count) if (i, j) not in self.results]
+
+    def run(self, workers: int = None) -> None:
+        """Play every pending pair on `workers` processes (all cores by default)."""
+        pending = self.pending_pairs()
+        if not pending:
+            return
+        tasks = [
+            (i, j, self.compositions[i], self.compositions[j], self.games, self.seed, self.max_rounds)
+            for i, j in pending
+        ]
+        started = last_save = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            futures = [executor.submit(play_pair, task) for task in tasks]
+            for future in as_completed(futures):
+                result = future.result()
+                self.results[(result[0], result[1])] = result
+                if self.checkpoint and time.perf_counter() - last_save >= self.checkpoint_interval:
+                    self.save_checkpoint()
+                    last_save = time.perf_counter()
+        elapsed = time.perf_counter() - started
+        if self.checkpoint:
+            self.save_checkpoint()
+        self.battles_per_second = len(tasks) * self.games / elapsed if elapsed > 0 else 0.0
+
+    def score_matrix(self) -> np.ndarray:
+        """Get [i, j] = i's average score against j (1 win, 0.5 draw), NaN where unplayed."""
+        count = len(self.compositions)
+        scores = np.full((count, count), np.nan)
+        for i, j, wins_i, wins_j, draws in self.results.values():
+            games = wins_i + wins_j + draws
+            scores[i, j] = (wins_i + 0.5 * draws) / games
+            scores[j, i] = (wins_j + 0.5 * draws) / games
+        return scores
+
+    def elo_ratings(self, iterations: int = 200) -> np.ndarray:
+        """
+        Fit Elo ratings (mean 1500) to all results with a Bradley-Terry model.
+
+        Unlike sequential Elo updates, the fit doesn't depend on the order pairs were played
+        in. Every composition gets one virtual draw against every other, so unbeaten or
+        winless compositions still get finite ratings.
+        """
+        count = len(self.compositions)
+        wins = np.zeros((count, count))
+        for i, j, wins_i, wins_j, draws in self.results.values():
+            wins[i, j] += wins_i + 0.5 * draws + 0.5
+            wins[j, i] += wins_j + 0.5 * draws + 0.5
+        games = wins + wins.T
+        total_wins = wins.sum(axis=1)
+        strength = np.ones(count)
+        for _ in range(iterations):
+            # Minorization-maximization update of the Bradley-Terry strengths
+            denominator = (games / (strength[:, None] + strength[None, :])).sum(axis=1)
+            strength = np.where(denominator > 0, total_wins / np.maximum(denominator, 1e-12), strength)
+            strength /= math.exp(np.log(strength).mean())
+        ratings = 400 * np.log10(strength)
+        return ratings - ratings.mean() + 1500
+
+    def report(self, top: int = None) -> str:
+        """Format the standings, best first."""
+        ratings = self.elo_ratings()
+        scores = self.score_matrix()
+        order = np.argsort(-ratings)[:top]
+        lines = [f"{'Elo':>6} {'Win%':>6}  Composition"]
+        for i in order:
+            lines.append(f"{ratings[i]:6.0f} {np.nanmean(scores[i]) * 100:5.1f}%  {describe(self.compositions[i])}")
+        lines.append(f"{len(self.results)} pairs played")
+        if self.battles_per_second:
+            lines.append(f"{self.battles_per_second:.0f} battles/s this run")
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Round-robin tournament between squad compositions. Run from the repository root as: python -m tools.tournament"
+    )
+    parser.add_argument('--pool', help="JSON file with a list of compositions ([[unit type, level], ...])")
+    parser.add_argument('--random', type=int, default=0, metavar='N', help="Add N random compositions")
+    parser.add_argument('--games', type=int, default=20, help="Battles per pair")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-rounds', type=int, default=BATTLE_MAX_ROUNDS)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--checkpoint', help="Resume from / save progress to this file")
+    parser.add_argument('--top', type=int, default=None, help="Only list the best N compositions")
+    args = parser.parse_args()
+
+    compositions = []
+    if args.pool:
+        with open(args.pool) as f:
+            compositions.extend(parse_composition(data) for data in json.load(f))
+    compositions.extend(random_compositions(args.random, args.seed))
+    if len(compositions) < 2:
+        parser.error("Need at least two compositions (use --pool and/or --random)")
+
+    tournament = Tournament(compositions, args.games, args.seed, args.max_rounds, args.checkpoint)
+    tournament.run(args.workers)
+    print(tournament.report(args.top))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+from typing import Tuple
+from utils.constants import CELL_SIZE, GRID_SIZE, ZOOM_LEVELS
+
+
+class Camera:
+    """Maps grid coordinates to screen pixels for a zoomable, pannable view of the grid."""
+
+    def __init__(self, screen_size: Tuple[int, int], grid_size: Tuple[int, int] = (GRID_SIZE, GRID_SIZE)):
+        self.screen_width, self.screen_height = screen_size
+        self.grid_width, self.grid_height = grid_size
+        self.cell_size = CELL_SIZE
+        self.offset_x = 0  # Screen position of the top-left corner of cell (0, 0)
+        self.offset_y = 0
+
+    def set_grid_size(self, width: int, height: int) -> None:
+        """Show a grid of another size (e.g. after loading a game), keeping it on screen."""
+        self.grid_width, self.grid_height = width, height
+        self.clamp()
+
+    def grid_to_screen(self, x: int, y: int) -> Tuple[int, int]:
+        """Get the top-left screen pixel of a grid cell."""
+        return (x * self.cell_size + self.offset_x, y * self.cell_size + self.offset_y)
+
+    def cell_center(self, x: int, y: int) -> Tuple[int, int]:
+        """Get the screen pixel at the center of a grid cell."""
+        sx, sy = self.grid_to_screen(x, y)
+        half = self.cell_size // 2
+        return (sx + half, sy + half)
+
+    def screen_to_grid(self, px: int, py: int) -> Tuple[int, int]:
+        """Get the grid cell under a screen pixel."""
+        return ((px - self.offset_x) // self.cell_size, (py - self.offset_y) // self.cell_size)
+
+    def get_visible_bounds(self) -> Tuple[int, int, int, int]:
+        """Get the (min_x, min_y, max_x, max_y) grid cells on screen, clamped to the grid (max exclusive)."""
+        min_x, min_y = self.screen_to_grid(0, 0)
+        max_x, max_y = self.screen_to_grid(self.screen_width - 1, self.screen_height - 1)
+        return (
+            max(0, min_x),
+            max(0, min_y),
+            min(self.grid_width, max_x + 1),
+            min(self.grid_height, max_y + 1)
+        )
+
+    def is_visible(self, x: int, y: int, margin: int = 0) -> bool:
+        """Check if a grid cell (with an optional margin in cells) is on screen."""
+        min_x, min_y, max_x, max_y = self.get_visible_bounds()
+        return min_x - margin <= x < max_x + margin and min_y - margin <= y < max_y + margin
+
+    def zoom(self, steps: int, anchor: Tuple[int, int] = None) -> bool:
+        """
+        Zoom in (positive steps) or out (negative steps) through ZOOM_LEVELS.
+        The grid point under the anchor pixel (screen center by default) stays in place.
+        Returns True if the zoom level changed.
+        """
+        current = min(range(len(ZOOM_LEVELS)), key=lambda i: abs(ZOOM_LEVELS[i] - self.cell_size))
+        index = max(0, min(len(ZOOM_LEVELS) - 1, current + steps))
+        new_size = ZOOM_LEVELS[index]
+        if new_size == self.cell_size:
+            return False
+
+        ax, ay = anchor or (self.screen_width // 2, self.screen_height // 2)
+        # Grid position (in fractional cells) under the anchor before zooming
+        gx = (ax - self.offset_x) / self.cell_size
+        gy = (ay - self.offset_y) / self.cell_size
+        self.cell_size = new_size
+        self.offset_x = int(round(ax - gx * new_size))
+        self.offset_y = int(round(ay - gy * new_size))
+        self.clamp()
+        return True
+
+    def pan(self, dx: int, dy: int) -> None:
+        """Move the view by a number of screen pixels."""
+        self.offset_x += dx
+        self.offset_y += dy
+        self.clamp()
+
+    def clamp(self) -> None:
+        """Keep the grid on screen, centering it when it is smaller than the view."""
+        map_width = self.grid_width * self.cell_size
+        map_height = self.grid_height * self.cell_size
+        if map_width <= self.screen_width:
+            self.offset_x = (self.screen_width - map_width) // 2
+        else:
+            self.offset_x = max(self.screen_width - map_width, min(0, self.offset_x))
+        if map_height <= self.screen_height:
+            self.offset_y = (self.screen_height - map_height) // 2
+        else:
+            self.offset_y = max(self.screen_height - map_height, min(0, self.offset_y))
@@ -0,0 +1,183 @@
+import pygame
+from typing import Callable, Dict, Tuple, Optional, Set
+from squad import Squad
+from ui.camera import Camera
+from utils.constants import GRID_SIZE, HEAT_CELL_SIZE, LOD_DETAIL_MIN_CELL, LOD_MARKER_MIN_CELL
+
+# Level-of-detail modes for the grid view
+LOD_HEATMAP = 'heatmap'  # Aggregated density/ownership cells
+LOD_MARKERS = 'markers'  # One marker per squad
+LOD_DETAIL = 'detail'    # Every unit with level and HP bar
+
+
+class SquadAggregateLayer:
+    """
+    Aggregates living units into coarse heat cells, per owner color.
+
+    The layer listens to GameState squad events and only touches the heat cells a
+    squad left or entered, so moving or losing a squad never triggers a full rescan.
+    Binding a game state sizes the heat map to its world.
+    """
+
+    def __init__(self, grid_size: Tuple[int, int] = (GRID_SIZE, GRID_SIZE), heat_cell_size: int = HEAT_CELL_SIZE):
+        self.heat_cell_size = heat_cell_size
+        self.resize(*grid_size)
+        self.game_state = None
+        # Last known (heat cell, owner color, living units) for each squad on the map
+        self.squads: Dict[Squad, Tuple[Tuple[int, int], Tuple[int, int, int], int]] = {}
+        # Living unit counts per owner color for each heat cell
+        self.cells: Dict[Tuple[int, int], Dict[Tuple[int, int, int], int]] = {}
+        self.dirty_cells: Set[Tuple[int, int]] = set()
+        self.version = 0  # Bumped whenever any heat cell changes
+        self.surface: Optional[pygame.Surface] = None  # One pixel per heat cell
+
+    def bind(self, game_state) -> None:
+        """Attach to a game state, detaching from the previous one, and rebuild."""
+        if self.game_state is not None:
+            self.game_state.remove_listener(self.on_squad_event)
+        self.game_state = game_state
+        game_state.add_listener(self.on_squad_event)
+        self.resize(game_state.width, game_state.height)
+        self.rebuild()
+
+    def resize(self, width: int, height: int) -> None:
+        """Cover a grid of width x height cells (call rebuild afterwards)."""
+        self.cols = (width + self.heat_cell_size - 1) // self.heat_cell_size
+        self.rows = (height + self.heat_cell_size - 1) // self.heat_cell_size
+        self.surface = None
+
+    def rebuild(self) -> None:
+        """Recompute every heat cell from scratch."""
+        self.squads.clear()
+        self.cells.clear()
+        self.surface = None
+        self.version += 1
+        if self.game_state is not None:
+            for squad in self.game_state.squads:
+                self.update_squad(squad)
+
+    def on_squad_event(self, event: str, squad: Squad) -> None:
+        """GameState listener: keep the aggregate in sync with squad changes."""
+        if event == 'removed':
+            self.remove_squad(squad)
+        else:
+            self.update_squad(squad)
+
+    def get_heat_cell(self, x: int, y: int) -> Tuple[int, int]:
+        """Get the heat cell containing a grid position."""
+        return (x // self.heat_cell_size, y // self.heat_cell_size)
+
+    def update_squad(self, squad: Squad) -> None:
+        """Re-aggregate a single squad after it moved, took losses or gained units."""
+        living = sum(1 for unit in squad.units if unit.is_alive())
+        if living == 0:
+            self.remove_squad(squad)
+            return
+
+        entry = (self.get_heat_cell(squad.x, squad.y), tuple(squad.color), living)
+        if self.squads.get(squad) == entry:
+            return
+        self.remove_squad(squad)
+        self.squads[squad] = entry
+        self._add_to_cell(*entry)
+
+    def remove_squad(self, squad: Squad) -> None:
+        """Drop a squad (dead or removed) from the aggregate."""
+        entry = self.squads.pop(squad, None)
+        if entry is not None:
+            self._add_to_cell(entry[0], entry[1], -entry[2])
+
+    def _add_to_cell(self, cell: Tuple[int, int], owner: Tuple[int, int, int], count: int) -> None:
+        owners = self.cells.setdefault(cell, {})
+        owners[owner] = owners.get(owner, 0) + count
+        if owners[owner] <= 0:
+            del owners[owner]
+        if not owners:
+            del self.cells[cell]
+        self.dirty_cells.add(cell)
+        self.version += 1
+
+    def get_cell_color(self, cell: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        """Get the RGBA color of a heat cell: dominant owner's color, alpha by unit density."""
+        owners = self.cells.get(cell)
+        if not owners:
+            return (0, 0, 0, 0)
+        owner = max(owners, key=owners.get)
+        density = sum(owners.values()) / (self.heat_cell_size * self.heat_cell_size)
+        alpha = int(80 + 175 * min(1.0, density * 2))
+        return (*owner, alpha)
+
+    def get_surface(self) -> pygame.Surface:
+        """Get the heat map surface (one pixel per heat cell), refreshing only dirty cells."""
+        if self.surface is None:
+            self.surface = pygame.Surface((self.cols, self.rows), pygame.SRCALPHA)
+            self.surface.fill((0, 0, 0, 0))
+            self.dirty_cells = set(self.cells)
+        for cell in self.dirty_cells:
+            cx, cy = cell
+            if 0 <= cx < self.cols and 0 <= cy < self.rows:
+                self.surface.set_at(cell, self.get_cell_color(cell))
+        self.dirty_cells.clear()
+        return self.surface
+
+
+class LODRenderer:
+    """Draws squads at low zoom levels as heat cells or squad markers."""
+
+    def __init__(self, camera: Camera, layer: SquadAggregateLayer = None):
+        self.camera = camera
+        self.layer = layer or SquadAggregateLayer((camera.grid_width, camera.grid_height))
+        self._scaled: Optional[pygame.Surface] = None
+        self._scaled_key = None
+
+    def get_level(self) -> str:
+        """Get the level of detail for the current zoom."""
+        if self.camera.cell_size >= LOD_DETAIL_MIN_CELL:
+            return LOD_DETAIL
+        if self.camera.cell_size >= LOD_MARKER_MIN_CELL:
+            return LOD_MARKERS
+        return LOD_HEATMAP
+
+    def draw(self, screen: pygame.Surface, selected_squad: Optional[Squad] = None,
+             is_visible: Callable[[Squad], bool] = None) -> None:
+        """
+        Draw the aggregate view for the current level (nothing at detail level).
+        Squad markers are skipped for squads is_visible rejects (e.g. hidden by fog of war).
+        """
+        level = self.get_level()
+        if level == LOD_HEATMAP:
+            self.draw_heatmap(screen)
+        elif level == LOD_MARKERS:
+            self.draw_markers(screen, is_visible)
+        else:
+            return
+
+        # Keep the selected squad findable at any zoom
+        if selected_squad and selected_squad in self.layer.squads:
+            x, y = self.camera.cell_center(selected_squad.x, selected_squad.y)
+            radius = max(4, self.camera.cell_size * 2)
+            pygame.draw.circle(screen, (255, 255, 0), (x, y), radius, 2)
+
+    def draw_heatmap(self, screen: pygame.Surface) -> None:
+        """Draw the heat cells scaled to the current zoom."""
+        surface = self.layer.get_surface()
+        cell_px = self.layer.heat_cell_size * self.camera.cell_size
+        key = (cell_px, self.layer.version)
+        if self._scaled_key != key:
+            size = (self.layer.cols * cell_px, self.layer.rows * cell_px)
+            self._scaled = pygame.transform.scale(surface, size)
+            self._scaled_key = key
+        screen.blit(self._scaled, self.camera.grid_to_screen(0, 0))
+
+    def draw_markers(self, screen: pygame.Surface, is_visible: Callable[[Squad], bool] = None) -> None:
+        """Draw one square per squad covering its 3x3 formation footprint."""
+        cell = self.camera.cell_size
+        for squad, (_, color, _) in self.layer.squads.items():
+            if not self.camera.is_visible(squad.x, squad.y, margin=1):
+                continue
+            if is_visible is not None and not is_visible(squad):
+                continue
+            x, y = self.camera.grid_to_screen(squad.x - 1, squad.y - 1)
+            marker = pygame.Rect(x, y, cell * 3, cell * 3)
+            pygame.draw.rect(screen, color, marker)
+            pygame.draw.rect(screen, (255, 255, 255), marker, 1)
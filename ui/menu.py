@@ -2,6 +2,8 @@ import pygame
 import json
 from typing import List, Tuple, Optional, Callable, Dict, Any
 from utils.constants import MENU_BG, MENU_TEXT, MENU_HIGHLIGHT, SQUAD_BG, WHITE, BLACK
+from ui.widgets import Panel, Overlay, draw_box
+from ui.roster import RosterIndex, RosterView
 
 class Menu:
     def __init__(self, options: List[Tuple[str, Optional[Callable]]]):
@@ -9,57 +11,65 @@ class Menu:
         self.selected_option = 0
         self.visible = False
         self.item_rects: List[pygame.Rect] = []
+        self.font = None
+        self.panel: Optional[Panel] = None
+        self.screen_size = None
     
-    def draw(self, screen: pygame.Surface) -> None:
-        """Draw the menu on the screen."""
-        if not self.visible:
-            return
-        
-        # Calculate menu dimensions
-        font = pygame.font.Font(None, 36)
-        padding = 20
-        item_height = 40
-        max_width = 0
-        
-        # Calculate maximum text width
-        for option, _ in self.options:
-            text_surface = font.render(option, True, MENU_TEXT)
-            max_width = max(max_width, text_surface.get_width())
-        
-        menu_width = max_width + 2 * padding
-        menu_height = len(self.options) * item_height + 2 * padding
+    def layout(self, screen_size: Tuple[int, int]) -> None:
+        """Size and center the menu for the screen and build its cached panel."""
+        self.font = self.font or pygame.font.Font(None, 36)
+        self.screen_size = screen_size
+        self.padding = 20
+        self.item_height = 40
+        self.text_surfaces = [self.font.render(option, True, MENU_TEXT) for option, _ in self.options]
+        max_width = max((text.get_width() for text in self.text_surfaces), default=0)
+        
+        menu_width = max_width + 2 * self.padding
+        menu_height = len(self.options) * self.item_height + 2 * self.padding
         
         # Center the menu on screen
-        screen_width, screen_height = screen.get_size()
-        menu_x = (screen_width - menu_width) // 2
-        menu_y = (screen_height - menu_height) // 2
-        
-        # Draw menu background
-        menu_rect = pygame.Rect(menu_x, menu_y, menu_width, menu_height)
-        pygame.draw.rect(screen, MENU_BG, menu_rect, border_radius=10)
-        pygame.draw.rect(screen, WHITE, menu_rect, 2, border_radius=10)
-        
-        # Draw menu items
+        screen_width, screen_height = screen_size
+        menu_rect = pygame.Rect(
+            (screen_width - menu_width) // 2,
+            (screen_height - menu_height) // 2,
+            menu_width,
+            menu_height
+        )
+        
+        # Item hit boxes in screen coordinates
         self.item_rects = []
-        for i, (option, _) in enumerate(self.options):
-            text_surface = font.render(option, True, MENU_TEXT)
+        for i, text_surface in enumerate(self.text_surfaces):
             text_rect = text_surface.get_rect(
                 centerx=screen_width // 2,
-                top=menu_y + padding + i * item_height
+                top=menu_rect.y + self.padding + i * self.item_height
             )
+            self.item_rects.append(text_rect.inflate(20, 10))
+        
+        self.panel = Panel(menu_rect, self.render, lambda: self.selected_option)
+    
+    def render(self, surface: pygame.Surface) -> None:
+        """Render the menu background and items onto its panel surface."""
+        menu_width = surface.get_width()
+        draw_box(surface, surface.get_rect(), MENU_BG, WHITE)
+        
+        for i, text_surface in enumerate(self.text_surfaces):
+            top = self.padding + i * self.item_height
             
             # Highlight selected item
             if i == self.selected_option:
-                highlight_rect = pygame.Rect(
-                    menu_x + 5, 
-                    menu_y + padding + i * item_height - 5,
-                    menu_width - 10,
-                    item_height - 5
-                )
-                pygame.draw.rect(screen, MENU_HIGHLIGHT, highlight_rect, border_radius=5)
+                highlight_rect = pygame.Rect(5, top - 5, menu_width - 10, self.item_height - 5)
+                pygame.draw.rect(surface, MENU_HIGHLIGHT, highlight_rect, border_radius=5)
             
-            screen.blit(text_surface, text_rect)
-            self.item_rects.append(text_rect.inflate(20, 10))
+            surface.blit(text_surface, text_surface.get_rect(centerx=menu_width // 2, top=top))
+    
+    def draw(self, screen: pygame.Surface) -> None:
+        """Draw the menu on the screen."""
+        if not self.visible:
+            return
+        
+        if self.panel is None or self.screen_size != screen.get_size():
+            self.layout(screen.get_size())
+        self.panel.draw(screen)
     
     def handle_event(self, event: pygame.event.Event) -> bool:
         """Handle pygame events for the menu."""
@@ -121,6 +131,9 @@ class SaveDialog:
         self.load_save_slots()
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
+        self.panel: Optional[Panel] = None
+        self.screen_size = None
+        self.slot_rects: List[pygame.Rect] = []
         
     def load_save_slots(self):
         """Load save slot information."""
@@ -134,70 +147,32 @@ class SaveDialog:
             except (FileNotFoundError, json.JSONDecodeError):
                 self.save_slots[i] = f"Slot {i+1}: Empty"
     
-    def draw(self, screen):
-        if not self.visible:
-            return
-            
-        # Semi-transparent overlay
-        overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        screen.blit(overlay, (0, 0))
+    def layout(self, screen_rect: pygame.Rect) -> None:
+        """Position the dialog, slots and buttons for the screen and build its cached panel."""
+        self.screen_size = screen_rect.size
         
         # Dialog box - make it taller to fit the new button
         dialog_rect = pygame.Rect(0, 0, 500, 450)
-        dialog_rect.center = screen.get_rect().center
-        pygame.draw.rect(screen, (50, 50, 70), dialog_rect, border_radius=10)
-        pygame.draw.rect(screen, WHITE, dialog_rect, 2, border_radius=10)
-        
-        # Title
-        title = self.font.render("Save Game", True, WHITE)
-        title_rect = title.get_rect(centerx=dialog_rect.centerx, top=dialog_rect.top + 20)
-        screen.blit(title, title_rect)
-        
-        # Save slots
-        for i in range(3):
-            slot_rect = pygame.Rect(0, 0, 400, 60)
-            slot_rect.centerx = dialog_rect.centerx
-            slot_rect.top = dialog_rect.top + 80 + i * 80
-            
-            # Highlight selected slot
-            if i == self.selected_slot:
-                pygame.draw.rect(screen, (100, 100, 140), slot_rect, border_radius=5)
-            pygame.draw.rect(screen, WHITE, slot_rect, 2, border_radius=5)
-            
-            # Slot text
-            slot_text = self.small_font.render(self.save_slots[i], True, WHITE)
-            text_rect = slot_text.get_rect(center=slot_rect.center)
-            screen.blit(slot_text, text_rect)
+        dialog_rect.center = screen_rect.center
         
         # Buttons
         button_width = 150
         button_height = 40
-        button_spacing = 20
         
         # Don't Save button
         quit_rect = pygame.Rect(0, 0, button_width, button_height)
         quit_rect.bottom = dialog_rect.bottom - 20
         quit_rect.left = dialog_rect.left + 20
-        pygame.draw.rect(screen, (150, 50, 50), quit_rect, border_radius=5)
-        quit_text = self.small_font.render("Don't Save", True, WHITE)
-        screen.blit(quit_text, quit_text.get_rect(center=quit_rect.center))
         
         # Cancel button
         cancel_rect = pygame.Rect(0, 0, button_width, button_height)
         cancel_rect.bottom = dialog_rect.bottom - 20
         cancel_rect.centerx = dialog_rect.centerx
-        pygame.draw.rect(screen, (150, 100, 50), cancel_rect, border_radius=5)
-        cancel_text = self.small_font.render("Cancel", True, WHITE)
-        screen.blit(cancel_text, cancel_text.get_rect(center=cancel_rect.center))
         
         # Save button
         save_rect = pygame.Rect(0, 0, button_width, button_height)
         save_rect.bottom = dialog_rect.bottom - 20
         save_rect.right = dialog_rect.right - 20
-        pygame.draw.rect(screen, (50, 150, 50), save_rect, border_radius=5)
-        save_text = self.small_font.render("Save", True, WHITE)
-        screen.blit(save_text, save_text.get_rect(center=save_rect.center))
         
         # Store button rects for click detection
         self.slot_rects = [
@@ -209,6 +184,51 @@ class SaveDialog:
         self.quit_rect = quit_rect
         self.cancel_rect = cancel_rect
         self.save_rect = save_rect
+        
+        self.panel = Panel(dialog_rect, self.render, lambda: (self.selected_slot, tuple(self.save_slots)))
+    
+    def render(self, surface: pygame.Surface) -> None:
+        """Render the dialog box, save slots and buttons onto its panel surface."""
+        origin = self.panel.rect.topleft
+        draw_box(surface, surface.get_rect(), (50, 50, 70), WHITE)
+        
+        # Title
+        title = self.font.render("Save Game", True, WHITE)
+        surface.blit(title, title.get_rect(centerx=surface.get_width() // 2, top=20))
+        
+        # Save slots
+        for i, slot_rect in enumerate(self.slot_rects):
+            slot_rect = slot_rect.move(-origin[0], -origin[1])
+            
+            # Highlight selected slot
+            if i == self.selected_slot:
+                pygame.draw.rect(surface, (100, 100, 140), slot_rect, border_radius=5)
+            pygame.draw.rect(surface, WHITE, slot_rect, 2, border_radius=5)
+            
+            # Slot text
+            slot_text = self.small_font.render(self.save_slots[i], True, WHITE)
+            surface.blit(slot_text, slot_text.get_rect(center=slot_rect.center))
+        
+        for rect, color, label in [
+            (self.quit_rect, (150, 50, 50), "Don't Save"),
+            (self.cancel_rect, (150, 100, 50), "Cancel"),
+            (self.save_rect, (50, 150, 50), "Save")
+        ]:
+            button_rect = rect.move(-origin[0], -origin[1])
+            pygame.draw.rect(surface, color, button_rect, border_radius=5)
+            text = self.small_font.render(label, True, WHITE)
+            surface.blit(text, text.get_rect(center=button_rect.center))
+    
+    def draw(self, screen):
+        if not self.visible:
+            return
+            
+        # Semi-transparent overlay
+        Overlay.draw(screen, (0, 0, 0, 180))
+        
+        if self.panel is None or self.screen_size != screen.get_size():
+            self.layout(screen.get_rect())
+        self.panel.draw(screen)
     
     def handle_event(self, event):
         if not self.visible:
@@ -265,142 +285,226 @@ class SaveDialog:
         self.visible = False
 
 class ArmyInterface:
-    def __init__(self, game_state):
-        self.game_state = game_state
+    """
+    Squad and unit browser. Browsing changes only the interface and happens right away;
+    actions that change the game (promoting) go through submit, e.g. SimulationRuntime.submit
+    (by default they are applied immediately).
+    """
+
+    def __init__(self, game_state, submit: Optional[Callable[[Callable[[], Any]], None]] = None):
+        self.game_state = None
+        self.submit = submit or (lambda command: command())
         self.visible = False
         self.viewing_squad = 0
         self.viewing_unit = 0
+        self.stats_version = 0  # Bumped whenever any squad or unit changes
         self.font_small = pygame.font.Font(None, 24)
         self.font_medium = pygame.font.Font(None, 28)
         self.font_large = pygame.font.Font(None, 36)
+        self.panels: List[Panel] = []
+        self.screen_size = None
+        self.roster = RosterIndex()
+        self.roster_view = RosterView(self.roster, pygame.Rect(50, 70, 700, 650), self.font_small)
+        self.showing_roster = False
+        self.bind(game_state)
     
-    def draw(self, screen: pygame.Surface) -> None:
-        """Draw the army management interface."""
-        if not self.visible or not self.game_state.squads:
-            return
-        
-        # Create semi-transparent overlay
-        overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 200))
-        screen.blit(overlay, (0, 0))
-        
-        # Draw header
+    def bind(self, game_state) -> None:
+        """Show a (new) game state, e.g. after loading a save."""
+        if self.game_state is not None:
+            self.game_state.remove_listener(self.on_squad_event)
+        self.game_state = game_state
+        game_state.add_listener(self.on_squad_event)
+        self.roster.bind(game_state)
+        self.stats_version += 1
+    
+    def on_squad_event(self, event: str, squad) -> None:
+        """GameState listener: any squad change may change what the panels show."""
+        self.stats_version += 1
+    
+    def get_selection_state(self) -> tuple:
+        """State the unit list and detail panels are bound to."""
+        return (self.viewing_squad, self.viewing_unit, self.stats_version)
+    
+    def layout(self, screen_size: Tuple[int, int]) -> None:
+        """Build the cached panels for the screen size."""
+        self.screen_size = screen_size
+        screen_width = screen_size[0]
         header_text = self.font_large.render("ARMY MANAGEMENT", True, (255, 255, 255))
-        screen.blit(header_text, (screen.get_width() // 2 - header_text.get_width() // 2, 20))
-        
-        # Draw squad info
-        squad = self.game_state.squads[self.viewing_squad]
-        unit = squad.units[self.viewing_unit] if squad.units and len(squad.units) > self.viewing_unit else None
-        
-        # Squad info box
-        squad_rect = pygame.Rect(50, 80, 300, 100)
-        pygame.draw.rect(screen, SQUAD_BG, squad_rect, border_radius=10)
-        pygame.draw.rect(screen, WHITE, squad_rect, 2, border_radius=10)
-        
-        # Draw squad info
+        self.panels = [
+            Panel(header_text.get_rect(centerx=screen_width // 2, top=20),
+                  lambda surface: surface.blit(header_text, (0, 0))),
+            Panel(pygame.Rect(50, 80, 300, 100), self.render_squad_info,
+                  lambda: (self.viewing_squad, len(self.game_state.squads))),
+            Panel(pygame.Rect(50, 200, 200, 400), self.render_unit_list, self.get_selection_state),
+            Panel(pygame.Rect(270, 200, 400, 460), self.render_unit_details, self.get_selection_state),
+            Panel(pygame.Rect(screen_width - 200, 100, 200, 180), self.render_help)
+        ]
+        roster_help = self.font_small.render(
+            "1-7: Sort  T: Type  P: Promotable  /: Search  ENTER: Open  TAB: Back",
+            True, (200, 200, 200)
+        )
+        self.roster_panels = [
+            self.panels[0],
+            self.roster_view.panel,
+            Panel(roster_help.get_rect(centerx=screen_width // 2, top=735),
+                  lambda surface: surface.blit(roster_help, (0, 0)))
+        ]
+    
+    def render_squad_info(self, surface: pygame.Surface) -> None:
+        """Render the squad info box."""
+        draw_box(surface, surface.get_rect(), SQUAD_BG, WHITE)
         squad_text = self.font_medium.render(f"Squad {self.viewing_squad + 1}/{len(self.game_state.squads)}", True, WHITE)
-        screen.blit(squad_text, (squad_rect.x + 20, squad_rect.y + 15))
-        
-        # Draw unit list
-        unit_list_rect = pygame.Rect(50, 200, 200, 400)
-        pygame.draw.rect(screen, SQUAD_BG, unit_list_rect, border_radius=10)
-        pygame.draw.rect(screen, WHITE, unit_list_rect, 2, border_radius=10)
+        surface.blit(squad_text, (20, 15))
+    
+    def render_unit_list(self, surface: pygame.Surface) -> None:
+        """Render the list of units in the viewed squad."""
+        squad = self.game_state.squads[self.viewing_squad]
+        draw_box(surface, surface.get_rect(), SQUAD_BG, WHITE)
         
         # Draw unit names in the list
         unit_header = self.font_medium.render("UNITS", True, WHITE)
-        screen.blit(unit_header, (unit_list_rect.x + 20, unit_list_rect.y + 15))
+        surface.blit(unit_header, (20, 15))
         
         for i, unit in enumerate(squad.units):
-            y_pos = unit_list_rect.y + 50 + i * 40
+            y_pos = 50 + i * 40
             color = (100, 255, 100) if i == self.viewing_unit else WHITE
             unit_name = f"{unit.unit_type.value} Lv.{unit.level}"
             unit_text = self.font_small.render(unit_name, True, color)
-            screen.blit(unit_text, (unit_list_rect.x + 20, y_pos))
+            surface.blit(unit_text, (20, y_pos))
             
             # HP bar
             hp_pct = unit.current_hp / unit.max_hp
-            hp_bar_rect = pygame.Rect(unit_list_rect.x + 20, y_pos + 20, 100, 5)
-            pygame.draw.rect(screen, (50, 50, 50), hp_bar_rect)
-            pygame.draw.rect(screen, (255, 0, 0), 
+            hp_bar_rect = pygame.Rect(20, y_pos + 20, 100, 5)
+            pygame.draw.rect(surface, (50, 50, 50), hp_bar_rect)
+            pygame.draw.rect(surface, (255, 0, 0), 
                            (hp_bar_rect.x, hp_bar_rect.y, 
                             int(hp_bar_rect.width * hp_pct), 
                             hp_bar_rect.height))
-        
-        # Draw unit details
-        if squad.units and 0 <= self.viewing_unit < len(squad.units):
-            selected_unit = squad.units[self.viewing_unit]
-            detail_rect = pygame.Rect(270, 200, 400, 400)
-            pygame.draw.rect(screen, SQUAD_BG, detail_rect, border_radius=10)
-            pygame.draw.rect(screen, WHITE, detail_rect, 2, border_radius=10)
+    
+    def render_unit_details(self, surface: pygame.Surface) -> None:
+        """Render the stats and promotion progress of the selected unit."""
+        squad = self.game_state.squads[self.viewing_squad]
+        if not (squad.units and 0 <= self.viewing_unit < len(squad.units)):
+            return
             
-            # Unit name and level
-            name_text = self.font_medium.render(f"{selected_unit.unit_type.value} Lv.{selected_unit.level}", True, WHITE)
-            screen.blit(name_text, (detail_rect.x + 20, detail_rect.y + 20))
+        selected_unit = squad.units[self.viewing_unit]
+        draw_box(surface, pygame.Rect(0, 0, 400, 400), SQUAD_BG, WHITE)
+        
+        # Unit name and level
+        name_text = self.font_medium.render(f"{selected_unit.unit_type.value} Lv.{selected_unit.level}", True, WHITE)
+        surface.blit(name_text, (20, 20))
+        
+        # Unit stats
+        stats = selected_unit.get_stats_summary()
+        y_offset = 60
+        for stat, value in stats.items():
+            stat_text = self.font_small.render(f"{stat}: {value}", True, WHITE)
+            surface.blit(stat_text, (30, y_offset))
+            y_offset += 30
+        
+        # Promotion info
+        promo_options = selected_unit.get_promotion_options()
+        if promo_options:
+            # Show FP progress
+            fp_percent = selected_unit.get_fp_percentage()
+            fp_color = (100, 255, 100) if fp_percent >= 100 else (255, 255, 0)
+            fp_text = f"FP: {selected_unit.future_points}/100 ({fp_percent:.0f}%)"
+            fp_surface = self.font_small.render(fp_text, True, fp_color)
+            surface.blit(fp_surface, (30, 350))
             
-            # Unit stats
-            stats = selected_unit.get_stats_summary()
-            y_offset = 60
-            for stat, value in stats.items():
-                stat_text = self.font_small.render(f"{stat}: {value}", True, WHITE)
-                screen.blit(stat_text, (detail_rect.x + 30, detail_rect.y + y_offset))
-                y_offset += 30
+            # Draw FP progress bar
+            fp_bar_rect = pygame.Rect(30, 375, 200, 10)
+            pygame.draw.rect(surface, (50, 50, 50), fp_bar_rect)
+            filled_width = int(fp_bar_rect.width * (fp_percent / 100))
+            pygame.draw.rect(surface, fp_color, 
+                           (fp_bar_rect.x, fp_bar_rect.y, 
+                            min(filled_width, fp_bar_rect.width), 
+                            fp_bar_rect.height))
             
-            # Promotion info
-            promo_options = selected_unit.get_promotion_options()
-            if promo_options:
-                # Show FP progress
-                fp_percent = selected_unit.get_fp_percentage()
-                fp_color = (100, 255, 100) if fp_percent >= 100 else (255, 255, 0)
-                fp_text = f"FP: {selected_unit.future_points}/100 ({fp_percent:.0f}%)"
-                fp_surface = self.font_small.render(fp_text, True, fp_color)
-                screen.blit(fp_surface, (detail_rect.x + 30, detail_rect.y + 350))
-                
-                # Draw FP progress bar
-                fp_bar_rect = pygame.Rect(detail_rect.x + 30, detail_rect.y + 375, 200, 10)
-                pygame.draw.rect(screen, (50, 50, 50), fp_bar_rect)
-                filled_width = int(fp_bar_rect.width * (fp_percent / 100))
-                pygame.draw.rect(screen, fp_color, 
-                               (fp_bar_rect.x, fp_bar_rect.y, 
-                                min(filled_width, fp_bar_rect.width), 
-                                fp_bar_rect.height))
+            # Show promotion info if FP is 100%
+            if fp_percent >= 100:
+                promo_text = self.font_small.render("PROMOTION AVAILABLE!", True, (255, 255, 0))
+                surface.blit(promo_text, (30, 400))
                 
-                # Show promotion info if FP is 100%
-                if fp_percent >= 100:
-                    promo_text = self.font_small.render("PROMOTION AVAILABLE!", True, (255, 255, 0))
-                    screen.blit(promo_text, (detail_rect.x + 30, detail_rect.y + 400))
-                    
-                    if len(promo_options) == 1:
-                        promo_help = self.font_small.render(
-                            f"Press P to promote to {promo_options[0].value}", 
-                            True, (200, 200, 255)
-                        )
-                        screen.blit(promo_help, (detail_rect.x + 30, detail_rect.y + 430))
-                else:
-                    # Show FP needed for promotion
-                    needed_fp = 100 - selected_unit.future_points
-                    needed_text = self.font_small.render(
-                        f"{needed_fp} more FP needed to promote", 
-                        True, (200, 200, 200)
+                if len(promo_options) == 1:
+                    promo_help = self.font_small.render(
+                        f"Press P to promote to {promo_options[0].value}", 
+                        True, (200, 200, 255)
                     )
-                    screen.blit(needed_text, (detail_rect.x + 30, detail_rect.y + 400))
-        
-        # Draw help text
+                    surface.blit(promo_help, (30, 430))
+            else:
+                # Show FP needed for promotion
+                needed_fp = 100 - selected_unit.future_points
+                needed_text = self.font_small.render(
+                    f"{needed_fp} more FP needed to promote", 
+                    True, (200, 200, 200)
+                )
+                surface.blit(needed_text, (30, 400))
+    
+    def render_help(self, surface: pygame.Surface) -> None:
+        """Render the key bindings help text."""
         help_text = [
             "A/D: Switch Squads",
             "W/S: Select Unit",
             "P: Promote Unit",
+            "N: Next Promotable",
+            "TAB: Squad Roster",
             "ESC: Back to Game"
         ]
         
         for i, text in enumerate(help_text):
             text_surface = self.font_small.render(text, True, (200, 200, 200))
-            screen.blit(text_surface, (screen.get_width() - 200, 100 + i * 30))
+            surface.blit(text_surface, (0, i * 30))
+    
+    def draw(self, screen: pygame.Surface) -> None:
+        """Draw the army management interface."""
+        if not self.visible or not self.game_state.squads:
+            return
+        
+        # Semi-transparent overlay
+        Overlay.draw(screen, (0, 0, 0, 200))
+        
+        if self.screen_size != screen.get_size():
+            self.layout(screen.get_size())
+        for panel in self.roster_panels if self.showing_roster else self.panels:
+            panel.draw(screen)
+    
+    def open_roster(self) -> None:
+        """Switch to the roster, with the viewed squad selected."""
+        self.showing_roster = True
+        squad = self.game_state.squads[self.viewing_squad]
+        result = self.roster_view.get_result()
+        for row in range(len(result)):
+            if result[row] is squad:
+                self.roster_view.select(row)
+                break
+    
+    def handle_roster_event(self, event: pygame.event.Event) -> bool:
+        """Handle events while the roster is shown."""
+        if self.roster_view.searching:
+            return self.roster_view.handle_event(event)
+        
+        if event.type == pygame.KEYDOWN:
+            if event.key in (pygame.K_TAB, pygame.K_ESCAPE):
+                self.showing_roster = False
+                return True
+            if event.key == pygame.K_RETURN:
+                squad = self.roster_view.get_selected_squad()
+                if squad is not None:
+                    self.viewing_squad = self.game_state.squads.index(squad)
+                    self.viewing_unit = 0
+                    self.showing_roster = False
+                return True
+        return self.roster_view.handle_event(event)
     
     def handle_event(self, event: pygame.event.Event) -> bool:
         """Handle events for the army interface."""
         if not self.visible:
             return False
         
+        if self.showing_roster and self.game_state.squads:
+            return self.handle_roster_event(event)
+        
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
                 self.visible = False
@@ -408,6 +512,10 @@ class ArmyInterface:
             
             if not self.game_state.squads:
                 return False
+            
+            if event.key == pygame.K_TAB:
+                self.open_roster()
+                return True
                 
             squad = self.game_state.squads[self.viewing_squad]
             
@@ -425,19 +533,42 @@ class ArmyInterface:
             elif event.key == pygame.K_s and squad.units:  # Next unit
                 self.viewing_unit = (self.viewing_unit + 1) % len(squad.units)
                 return True
+            elif event.key == pygame.K_n:  # Jump to the next unit ready to promote
+                self.select_next_promotable()
+                return True
             elif event.key == pygame.K_p and squad.units:  # Promote unit
                 unit = squad.units[self.viewing_unit]
-                if unit.can_promote() and unit.future_points >= 100:
-                    options = unit.get_promotion_options()
-                    if len(options) == 1:
-                        if unit.promote(options[0]):
-                            # Play promotion sound if available
-                            if hasattr(self.game_state, 'play_sound'):
-                                self.game_state.play_sound('promote')
-                            return True
+                self.submit(lambda: self.promote_unit(squad, unit))
+                return True
         
         return False
     
+    def promote_unit(self, squad, unit) -> bool:
+        """Promote a unit with a single promotion option, if it is (still) ready to."""
+        if unit not in squad.units or not unit.can_promote() or unit.future_points < 100:
+            return False
+        options = unit.get_promotion_options()
+        if len(options) != 1 or not unit.promote(options[0]):
+            return False
+        self.game_state.notify('changed', squad)
+        self.game_state.history.commit("Promote")
+        # Play promotion sound if available
+        if hasattr(self.game_state, 'play_sound'):
+            self.game_state.play_sound('promote')
+        return True
+    
+    def select_next_promotable(self) -> bool:
+        """View the next unit (by id) ready to promote, from the unit index. False if there is none."""
+        ready = self.game_state.unit_index.promotable()
+        if not ready:
+            return False
+        squad = self.game_state.squads[self.viewing_squad]
+        current_id = squad.units[self.viewing_unit].id if self.viewing_unit < len(squad.units) else -1
+        squad, unit = next(((s, u) for s, u in ready if u.id > current_id), ready[0])
+        self.viewing_squad = self.game_state.squads.index(squad)
+        self.viewing_unit = squad.units.index(unit)
+        return True
+    
     def toggle_visibility(self) -> None:
         """Toggle the visibility of the army interface."""
         self.visible = not self.visible
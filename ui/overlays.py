@@ -0,0 +1,98 @@
+import numpy as np
+import pygame
+from typing import Optional, Tuple
+from ui.camera import Camera
+
+
+def make_tint_surface(alpha: np.ndarray, color: Tuple[int, int, int], cell_size: int) -> pygame.Surface:
+    """Turn a [y, x] alpha map (one value per cell) into a tinted surface scaled to the cell size."""
+    height, width = alpha.shape
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    surface.fill(color)
+    pixels = pygame.surfarray.pixels_alpha(surface)
+    pixels[:] = alpha.T  # surfarray is indexed [x, y]
+    del pixels  # Unlock the surface
+    return pygame.transform.scale(surface, (width * cell_size, height * cell_size))
+
+
+class ThreatOverlay:
+    """Tints the cells enemies of the selected squad can reach and attack next turn."""
+
+    def __init__(self, camera: Camera, color=(255, 40, 40), max_alpha: int = 150):
+        self.camera = camera
+        self.color = color
+        self.max_alpha = max_alpha
+        self.visible = False
+        self._key = None
+        self._surface: Optional[pygame.Surface] = None
+
+    def toggle_visibility(self) -> None:
+        self.visible = not self.visible
+
+    def draw(self, screen: pygame.Surface, game_state) -> None:
+        squad = game_state.selected_squad
+        if not self.visible or squad is None:
+            return
+
+        influence = game_state.influence
+        faction = influence.get_faction(squad)
+        bounds = self.camera.get_visible_bounds()
+        min_x, min_y, max_x, max_y = bounds
+        if min_x >= max_x or min_y >= max_y:
+            return
+
+        # Only rebuild the tinted surface when the threat, the faction or the view changed
+        influence.sync()
+        key = (influence.version, faction, self.camera.cell_size, bounds)
+        if key != self._key:
+            danger = influence.get_danger_map(faction)[min_y:max_y, min_x:max_x]
+            peak = float(danger.max())
+            self._surface = None
+            if peak > 0:
+                alpha = (danger * (self.max_alpha / peak)).astype(np.uint8)
+                self._surface = make_tint_surface(alpha, self.color, self.camera.cell_size)
+            self._key = key
+
+        if self._surface is not None:
+            screen.blit(self._surface, self.camera.grid_to_screen(min_x, min_y))
+
+
+class FogOverlay:
+    """Blacks out every cell the selected squad's faction cannot see."""
+
+    def __init__(self, camera: Camera, color=(0, 0, 0)):
+        self.camera = camera
+        self.color = color
+        self.visible = False
+        self._key = None
+        self._surface: Optional[pygame.Surface] = None
+
+    def toggle_visibility(self) -> None:
+        self.visible = not self.visible
+
+    def get_viewer(self, game_state) -> Optional[Tuple[int, int, int]]:
+        """Get the faction whose sight is shown (the selected squad's), or None if fog is off."""
+        if not self.visible or game_state.selected_squad is None:
+            return None
+        return game_state.visibility.get_faction(game_state.selected_squad)
+
+    def draw(self, screen: pygame.Surface, game_state) -> None:
+        faction = self.get_viewer(game_state)
+        if faction is None:
+            return
+
+        visibility = game_state.visibility
+        bounds = self.camera.get_visible_bounds()
+        min_x, min_y, max_x, max_y = bounds
+        if min_x >= max_x or min_y >= max_y:
+            return
+
+        visibility.sync()
+        key = (visibility.version, faction, self.camera.cell_size, bounds)
+        if key != self._key:
+            visible = visibility.get_visible(faction)[min_y:max_y, min_x:max_x]
+            alpha = np.where(visible, 0, 255).astype(np.uint8)
+            self._surface = make_tint_surface(alpha, self.color, self.camera.cell_size)
+            self._key = key
+
+        screen.blit(self._surface, self.camera.grid_to_screen(min_x, min_y))
@@ -0,0 +1,341 @@
+import bisect
+import pygame
+from typing import Dict, List, Optional, Tuple
+from squad import Squad
+from utils.constants import UnitType, SQUAD_BG, WHITE
+from ui.widgets import Panel, draw_box
+
+# Sortable roster columns: (key, header, width in pixels)
+ROSTER_COLUMNS = [
+    ('name', "Name", 170),
+    ('units', "Units", 60),
+    ('power', "Power", 80),
+    ('level', "Avg Lv", 80),
+    ('hp', "HP %", 70),
+    ('type', "Main Type", 130),
+    ('promotable', "Promo", 60)
+]
+SORT_KEYS = [key for key, _, _ in ROSTER_COLUMNS]
+
+
+class RosterResult:
+    """A read-only sequence of squads in roster order, without copying the sorted index."""
+
+    def __init__(self, index: 'RosterIndex', items: List, descending: bool, pairs: bool = False):
+        self.index = index
+        self.items = items  # Serials, or (value, serial) pairs of a sorted column
+        self.descending = descending
+        self.pairs = pairs
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, i: int) -> Squad:
+        if not 0 <= i < len(self.items):
+            raise IndexError(i)
+        if self.descending:
+            i = len(self.items) - 1 - i
+        serial = self.items[i][1] if self.pairs else self.items[i]
+        return self.index.squads_by_serial[serial]
+
+    def get_range(self, start: int, stop: int) -> List[Squad]:
+        """Get the squads in rows [start, stop), e.g. the rows currently on screen."""
+        return [self[i] for i in range(max(0, start), min(stop, len(self)))]
+
+
+class RosterIndex:
+    """
+    Sorted and filterable index over the squads of a game state.
+
+    Each sortable column keeps its own sorted list of (value, serial) pairs. When a
+    squad changes, only its entries are moved (found with bisect), so the roster
+    stays sorted without re-sorting the whole army.
+    """
+
+    def __init__(self):
+        self.game_state = None
+        self.entries: Dict[Squad, dict] = {}  # Summary of each squad, as indexed
+        self.serials: Dict[Squad, int] = {}
+        self.squads_by_serial: Dict[int, Squad] = {}
+        self.sorted: Dict[str, List[Tuple]] = {key: [] for key in SORT_KEYS}
+        self.next_serial = 0
+        self.version = 0  # Bumped on every change to the index
+        self._query_key = None
+        self._query_serials: List[int] = []
+
+    def bind(self, game_state) -> None:
+        """Index a (new) game state and follow its squad changes."""
+        if self.game_state is not None:
+            self.game_state.remove_listener(self.on_squad_event)
+        self.game_state = game_state
+        game_state.add_listener(self.on_squad_event)
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Re-index every squad from scratch."""
+        self.entries.clear()
+        self.serials.clear()
+        self.squads_by_serial.clear()
+        for squad in self.game_state.squads if self.game_state else []:
+            serial = self.next_serial
+            self.next_serial += 1
+            self.serials[squad] = serial
+            self.squads_by_serial[serial] = squad
+            self.entries[squad] = self.describe_squad(squad)
+        for key in SORT_KEYS:
+            self.sorted[key] = sorted((entry[key], self.serials[squad]) for squad, entry in self.entries.items())
+        self.version += 1
+
+    def on_squad_event(self, event: str, squad: Squad) -> None:
+        """GameState listener: re-index the squad that changed."""
+        if event == 'removed':
+            self.remove_squad(squad)
+        else:
+            self.update_squad(squad)
+
+    @staticmethod
+    def describe_squad(squad: Squad) -> dict:
+        """Compute the sortable and filterable values of a squad."""
+        living_units = [u for u in squad.units if u.is_alive()]
+        max_hp = sum(u.max_hp for u in squad.units)
+        type_counts = {}
+        for unit in living_units:
+            type_counts[unit.unit_type] = type_counts.get(unit.unit_type, 0) + 1
+        main_type = max(type_counts, key=type_counts.get).value if type_counts else ""
+        return {
+            'name': squad.name,
+            'units': len(living_units),
+            'power': squad.get_total_power(),
+            'level': squad.get_average_level(),
+            'hp': sum(u.current_hp for u in squad.units) / max_hp if max_hp else 0.0,
+            'type': main_type,
+            'promotable': sum(1 for u in living_units if u.can_promote() and u.future_points >= 100),
+            'unit_types': frozenset(type_counts)
+        }
+
+    def update_squad(self, squad: Squad) -> None:
+        """Move a changed (or new) squad to its new place in every sorted column."""
+        serial = self.serials.get(squad)
+        if serial is None:
+            serial = self.next_serial
+            self.next_serial += 1
+            self.serials[squad] = serial
+            self.squads_by_serial[serial] = squad
+        old = self.entries.get(squad)
+        new = self.describe_squad(squad)
+        for key in SORT_KEYS:
+            if old is not None:
+                if old[key] == new[key]:
+                    continue
+                self._remove_sorted(key, (old[key], serial))
+            bisect.insort(self.sorted[key], (new[key], serial))
+        self.entries[squad] = new
+        self.version += 1
+
+    def remove_squad(self, squad: Squad) -> None:
+        """Drop a squad from the index."""
+        entry = self.entries.pop(squad, None)
+        if entry is None:
+            return
+        serial = self.serials.pop(squad)
+        del self.squads_by_serial[serial]
+        for key in SORT_KEYS:
+            self._remove_sorted(key, (entry[key], serial))
+        self.version += 1
+
+    def _remove_sorted(self, key: str, item: Tuple) -> None:
+        column = self.sorted[key]
+        i = bisect.bisect_left(column, item)
+        if i < len(column) and column[i] == item:
+            del column[i]
+
+    def query(self, sort_key: str = 'power', descending: bool = True,
+              unit_type: Optional[UnitType] = None, promotable_only: bool = False,
+              search: str = "") -> RosterResult:
+        """
+        Get the squads in roster order, optionally filtered by unit type, promotable
+        units and a case-insensitive name search. Unfiltered queries are views over the
+        sorted index; filtered ones are cached until the index or the filter changes.
+        """
+        column = self.sorted[sort_key]
+        search = search.lower()
+        if unit_type is None and not promotable_only and not search:
+            return RosterResult(self, column, descending, pairs=True)
+
+        key = (sort_key, unit_type, promotable_only, search, self.version)
+        if key != self._query_key:
+            serials = []
+            for _, serial in column:
+                entry = self.entries[self.squads_by_serial[serial]]
+                if unit_type is not None and unit_type not in entry['unit_types']:
+                    continue
+                if promotable_only and not entry['promotable']:
+                    continue
+                if search and search not in entry['name'].lower():
+                    continue
+                serials.append(serial)
+            self._query_key = key
+            self._query_serials = serials
+        return RosterResult(self, self._query_serials, descending)
+
+
+class RosterView:
+    """A virtualized, sortable roster list: only the rows on screen are rendered."""
+
+    ROW_HEIGHT = 24
+    HEADER_HEIGHT = 70
+
+    def __init__(self, index: RosterIndex, rect: pygame.Rect, font: pygame.font.Font):
+        self.index = index
+        self.font = font
+        self.sort_key = 'power'
+        self.descending = True
+        self.unit_type: Optional[UnitType] = None
+        self.promotable_only = False
+        self.search = ""
+        self.searching = False
+        self.scroll = 0  # First visible row
+        self.selected = 0  # Selected row
+        self.panel = Panel(rect, self.render, self.get_view_state)
+
+    @property
+    def visible_rows(self) -> int:
+        return (self.panel.rect.height - self.HEADER_HEIGHT - 10) // self.ROW_HEIGHT
+
+    def get_result(self) -> RosterResult:
+        """Get the squads matching the current sort and filters."""
+        return self.index.query(self.sort_key, self.descending, self.unit_type,
+                                self.promotable_only, self.search)
+
+    def get_selected_squad(self) -> Optional[Squad]:
+        result = self.get_result()
+        if not len(result):
+            return None
+        return result[min(self.selected, len(result) - 1)]
+
+    def get_view_state(self) -> tuple:
+        """State the roster panel is bound to."""
+        return (self.sort_key, self.descending, self.unit_type, self.promotable_only,
+                self.search, self.searching, self.scroll, self.selected, self.index.version)
+
+    def select(self, row: int) -> None:
+        """Select a row, scrolling just enough to keep it on screen."""
+        count = len(self.get_result())
+        self.selected = max(0, min(count - 1, row))
+        if self.selected < self.scroll:
+            self.scroll = self.selected
+        elif self.selected >= self.scroll + self.visible_rows:
+            self.scroll = self.selected - self.visible_rows + 1
+
+    def set_sort(self, sort_key: str) -> None:
+        """Sort by a column; choosing the current column again reverses the order."""
+        if sort_key == self.sort_key:
+            self.descending = not self.descending
+        else:
+            self.sort_key = sort_key
+            self.descending = sort_key not in ('name', 'type')
+        self.select(0)
+
+    def cycle_unit_type(self) -> None:
+        """Cycle the unit type filter through every UnitType and back to none."""
+        types = list(UnitType)
+        if self.unit_type is None:
+            self.unit_type = types[0]
+        else:
+            i = types.index(self.unit_type) + 1
+            self.unit_type = types[i] if i < len(types) else None
+        self.select(0)
+
+    def handle_event(self, event: pygame.event.Event) -> bool:
+        """Handle roster navigation, sorting, filtering and search input."""
+        if event.type == pygame.MOUSEWHEEL:
+            self.select(self.selected - event.y * 3)
+            return True
+        if event.type != pygame.KEYDOWN:
+            return False
+
+        if self.searching:
+            if event.key in (pygame.K_RETURN, pygame.K_ESCAPE):
+                self.searching = False
+            elif event.key == pygame.K_BACKSPACE:
+                self.search = self.search[:-1]
+            elif event.unicode and event.unicode.isprintable():
+                self.search += event.unicode
+            self.select(0)
+            return True
+
+        if event.key in (pygame.K_UP, pygame.K_w):
+            self.select(self.selected - 1)
+        elif event.key in (pygame.K_DOWN, pygame.K_s):
+            self.select(self.selected + 1)
+        elif event.key == pygame.K_PAGEUP:
+            self.select(self.selected - self.visible_rows)
+        elif event.key == pygame.K_PAGEDOWN:
+            self.select(self.selected + self.visible_rows)
+        elif event.key == pygame.K_HOME:
+            self.select(0)
+        elif event.key == pygame.K_END:
+            self.select(len(self.get_result()) - 1)
+        elif pygame.K_1 <= event.key < pygame.K_1 + len(SORT_KEYS):
+            self.set_sort(SORT_KEYS[event.key - pygame.K_1])
+        elif event.key == pygame.K_t:
+            self.cycle_unit_type()
+        elif event.key == pygame.K_p:
+            self.promotable_only = not self.promotable_only
+            self.select(0)
+        elif event.key == pygame.K_SLASH:
+            self.searching = True
+        else:
+            return False
+        return True
+
+    def render(self, surface: pygame.Surface) -> None:
+        """Render the filter line, column headers and the visible rows."""
+        draw_box(surface, surface.get_rect(), SQUAD_BG, WHITE)
+        result = self.get_result()
+
+        # Filter and search line
+        filters = [f"{len(result)} squads"]
+        if self.unit_type is not None:
+            filters.append(f"type: {self.unit_type.value}")
+        if self.promotable_only:
+            filters.append("promotable")
+        if self.search or self.searching:
+            filters.append(f"search: {self.search}" + ("_" if self.searching else ""))
+        surface.blit(self.font.render("   ".join(filters), True, (200, 200, 200)), (15, 12))
+
+        # Column headers, with the sort column marked
+        x = 15
+        for i, (key, header, width) in enumerate(ROSTER_COLUMNS):
+            label = f"{i + 1} {header}"
+            if key == self.sort_key:
+                label += " v" if self.descending else " ^"
+            color = (100, 255, 100) if key == self.sort_key else WHITE
+            surface.blit(self.font.render(label, True, color), (x, 42))
+            x += width
+
+        # Only the rows that fit on screen are looked up and rendered
+        top = self.HEADER_HEIGHT
+        rows = result.get_range(self.scroll, self.scroll + self.visible_rows)
+        for i, squad in enumerate(rows):
+            row = self.scroll + i
+            y = top + i * self.ROW_HEIGHT
+            if row == self.selected:
+                pygame.draw.rect(surface, (100, 100, 140), (5, y - 2, surface.get_width() - 10, self.ROW_HEIGHT))
+            entry = self.index.entries[squad]
+            values = [
+                entry['name'],
+                str(entry['units']),
+                f"{entry['power']:.1f}",
+                f"{entry['level']:.1f}",
+                f"{entry['hp'] * 100:.0f}%",
+                entry['type'],
+                str(entry['promotable']) if entry['promotable'] else ""
+            ]
+            x = 15
+            for value, (_, _, width) in zip(values, ROSTER_COLUMNS):
+                surface.blit(self.font.render(value, True, WHITE), (x, y))
+                x += width
+
+    def draw(self, screen: pygame.Surface) -> None:
+        self.panel.draw(screen)
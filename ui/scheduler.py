@@ -0,0 +1,95 @@
+import asyncio
+import time
+import pygame
+from typing import List
+from utils.constants import FPS, IDLE_FPS, IDLE_AFTER
+
+
+class FrameScheduler:
+    """
+    Paces the main loop: event handling, updates and rendering.
+
+    A frame is only rendered when something invalidated the screen. After
+    `idle_after` seconds without input or invalidation the loop drops to
+    `idle_fps`. A blocking loop (tick) waits on the event queue instead of
+    sleeping and an asyncio loop (next_frame) checks it every target frame
+    while sleeping, so the first input after idling is handled immediately.
+    """
+
+    def __init__(self, target_fps: int = FPS, idle_fps: int = IDLE_FPS, idle_after: float = IDLE_AFTER):
+        self.target_fps = target_fps
+        self.idle_fps = idle_fps
+        self.idle_after = idle_after
+        self.clock = pygame.time.Clock()
+        self.dirty = True  # Whether the next frame must be rendered
+        self.last_activity = time.monotonic()
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+
+    def invalidate(self, *args) -> None:
+        """
+        Request a render on the next frame and count it as activity.
+        Accepts (and ignores) arguments so it can be used as a GameState listener.
+        """
+        self.dirty = True
+        self.last_activity = time.monotonic()
+
+    def is_idle(self) -> bool:
+        """Check if nothing has happened for longer than the idle delay."""
+        return time.monotonic() - self.last_activity >= self.idle_after
+
+    def get_events(self, block: bool = True) -> List[pygame.event.Event]:
+        """
+        Get pending input events. When idle, wait for the next event for up to one
+        idle frame instead of polling, so input wakes the loop instantly (unless block
+        is False: an asyncio loop must not block, see next_frame).
+        """
+        events = []
+        if block and self.is_idle() and not self.dirty:
+            event = pygame.event.wait(1000 // max(1, self.idle_fps))
+            if event.type != pygame.NOEVENT:
+                events.append(event)
+        events.extend(pygame.event.get())
+        if events:
+            self.invalidate()
+        return events
+
+    def should_render(self) -> bool:
+        """Check if the frame needs rendering; call rendered() after drawing it."""
+        if not self.dirty:
+            self.frames_skipped += 1
+        return self.dirty
+
+    def rendered(self) -> None:
+        """Mark the current frame as drawn."""
+        self.dirty = False
+        self.frames_rendered += 1
+
+    def tick(self) -> int:
+        """End the frame, limiting to the target frame rate. Returns milliseconds since the last tick."""
+        if self.is_idle():
+            # The event wait already paced this frame
+            return self.clock.tick()
+        return self.clock.tick(self.target_fps)
+
+    async def next_frame(self) -> None:
+        """
+        tick for an asyncio loop: sleeps on the event loop until the next frame is due, so
+        other tasks (the simulation) run meanwhile. Frames are due at target_fps, or at
+        idle_fps while idle with nothing to render. An idle wait is sliced into target
+        frames and ends as soon as input is queued or something invalidates the screen,
+        since blocking on the event queue would stall the loop.
+        """
+        loop = asyncio.get_running_loop()
+        frame = 1 / self.target_fps
+        elapsed = self.clock.tick() / 1000
+        if self.is_idle() and not self.dirty:
+            deadline = loop.time() + max(0.0, 1 / max(1, self.idle_fps) - elapsed)
+            while not self.dirty and not pygame.event.peek():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(frame, remaining))
+        else:
+            await asyncio.sleep(max(0.0, frame - elapsed))
+        self.clock.tick()
@@ -0,0 +1,71 @@
+import pygame
+from typing import Dict, Tuple
+from unit import Unit
+from utils.constants import UNIT_COLORS
+
+HP_BAR_BACKGROUND = (150, 0, 0)
+HP_BAR_FILL = (0, 200, 0)
+
+
+class UnitSpriteCache:
+    """
+    Pre-rendered unit sprites: class color circle, level number and HP bar.
+
+    Sprites are keyed by (unit color, level, HP bar fill) and built once per zoom
+    level, so drawing an army is a single Surface.blits() call instead of a circle,
+    a font render and two rects per unit.
+    """
+
+    def __init__(self, font: pygame.font.Font):
+        self.font = font
+        self.cell_size = None
+        # (color, level, hp_fill) -> (sprite, offset of the sprite from the cell's top-left)
+        self.sprites: Dict[Tuple[Tuple[int, int, int], int, int], Tuple[pygame.Surface, Tuple[int, int]]] = {}
+
+    def get_hp_bar_width(self) -> int:
+        """Get the HP bar width in pixels for the current cell size."""
+        return max(2, self.cell_size - 4)
+
+    def get_hp_bucket(self, unit: Unit) -> int:
+        """Get the HP bar bucket of a unit: the number of filled pixels in its bar."""
+        hp_ratio = unit.current_hp / unit.max_hp
+        return max(2, int(hp_ratio * self.get_hp_bar_width()))
+
+    def set_cell_size(self, cell_size: int) -> None:
+        """Switch zoom level, dropping sprites built for another cell size."""
+        if cell_size != self.cell_size:
+            self.cell_size = cell_size
+            self.sprites.clear()
+
+    def get_sprite(self, unit: Unit) -> Tuple[pygame.Surface, Tuple[int, int]]:
+        """Get the sprite for a unit and its offset from the top-left of the unit's cell."""
+        color = UNIT_COLORS.get(unit.unit_type, (200, 200, 200))
+        key = (color, unit.level, self.get_hp_bucket(unit))
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self._render(*key)
+            self.sprites[key] = sprite
+        return sprite
+
+    def _render(self, color: Tuple[int, int, int], level: int, hp_fill: int) -> Tuple[pygame.Surface, Tuple[int, int]]:
+        cell = self.cell_size
+        level_text = self.font.render(str(level), True, (255, 255, 255))
+        bar_width = self.get_hp_bar_width()
+
+        # The level text may be wider or taller than the cell, and the HP bar sits just
+        # below the cell, so size the sprite to cover all three around the cell center.
+        half_w = max(cell // 2, level_text.get_width() // 2 + 1)
+        top = min(0, cell // 2 - level_text.get_height() // 2)
+        bottom = cell + 4
+        sprite = pygame.Surface((half_w * 2, bottom - top), pygame.SRCALPHA)
+        sprite.fill((0, 0, 0, 0))
+
+        # Cell center inside the sprite
+        cx, cy = half_w, cell // 2 - top
+        pygame.draw.circle(sprite, color, (cx, cy), max(1, cell // 2 - 2))
+        sprite.blit(level_text, level_text.get_rect(center=(cx, cy)))
+        bar_y = cy + cell // 2 + 2
+        pygame.draw.rect(sprite, HP_BAR_BACKGROUND, (cx - bar_width // 2, bar_y, bar_width, 2))
+        pygame.draw.rect(sprite, HP_BAR_FILL, (cx - bar_width // 2, bar_y, hp_fill, 2))
+
+        return sprite, (cell // 2 - half_w, top)
@@ -0,0 +1,63 @@
+import pygame
+from typing import Any, Callable, Dict, Tuple
+
+_UNSET = object()
+
+
+class Panel:
+    """
+    A retained-mode UI panel.
+
+    The panel keeps its rendered surface and only calls its render function again
+    when the state it is bound to changes (or it is invalidated). The render
+    function draws in panel-local coordinates onto a transparent surface.
+    """
+
+    def __init__(self, rect: pygame.Rect, render: Callable[[pygame.Surface], None],
+                 state: Callable[[], Any] = None):
+        self.rect = pygame.Rect(rect)
+        self.render = render
+        self.state = state or (lambda: None)
+        self.surface = None
+        self.state_key = _UNSET
+        self.render_count = 0  # Number of times the panel was actually re-rendered
+
+    def invalidate(self) -> None:
+        """Force a re-render on the next draw."""
+        self.state_key = _UNSET
+
+    def draw(self, screen: pygame.Surface) -> None:
+        """Blit the cached surface, re-rendering it first if the bound state changed."""
+        key = self.state()
+        if self.surface is None or self.surface.get_size() != self.rect.size or key != self.state_key:
+            if self.surface is None or self.surface.get_size() != self.rect.size:
+                self.surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            self.surface.fill((0, 0, 0, 0))
+            self.render(self.surface)
+            self.state_key = key
+            self.render_count += 1
+        screen.blit(self.surface, self.rect)
+
+
+class Overlay:
+    """Shared semi-transparent full-screen overlays, allocated once per size and color."""
+
+    _surfaces: Dict[Tuple[Tuple[int, int], Tuple[int, int, int, int]], pygame.Surface] = {}
+
+    @classmethod
+    def draw(cls, screen: pygame.Surface, color: Tuple[int, int, int, int]) -> None:
+        """Dim the whole screen with the given RGBA color."""
+        key = (screen.get_size(), color)
+        overlay = cls._surfaces.get(key)
+        if overlay is None:
+            overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+            overlay.fill(color)
+            cls._surfaces[key] = overlay
+        screen.blit(overlay, (0, 0))
+
+
+def draw_box(surface: pygame.Surface, rect: pygame.Rect, color, border_color=(255, 255, 255),
+             border_radius: int = 10) -> None:
+    """Draw a filled box with a 2px border, the common look of every panel."""
+    pygame.draw.rect(surface, color, rect, border_radius=border_radius)
+    pygame.draw.rect(surface, border_color, rect, 2, border_radius=border_radius)
@@ -7,12 +7,16 @@ from enum import Enum, auto
 from utils.constants import UnitType, UNIT_STATS
 
 class Unit:
+    _next_id = 1  # Next unused unit id
+    
     def __init__(self, unit_type: UnitType, level: int = 1, **kwargs):
+        self.id = Unit.allocate_id(kwargs.get('id'))  # Stable across saves, used to diff states
         self.unit_type = unit_type if isinstance(unit_type, UnitType) else UnitType(unit_type)
         self.level = level
         self.experience = kwargs.get('experience', 0)
         self.kills = kwargs.get('kills', 0)
         self.battles = kwargs.get('battles', 0)
+        self.damage_dealt = kwargs.get('damage_dealt', 0)  # HP taken from enemies in battle
         self.abilities = kwargs.get('abilities', [])
         self.future_points = kwargs.get('future_points', 0)  # FP for promotion
         
@@ -32,6 +36,14 @@ class Unit:
         # Initialize speed from base stats
         self.speed = self.base_stats.get('speed', 5)  # Default to 5 if not specified
     
+    @classmethod
+    def allocate_id(cls, unit_id: int = None) -> int:
+        """Get a new unit id, or reserve a saved one so new ids never collide with it."""
+        if unit_id is None:
+            unit_id = cls._next_id
+        cls._next_id = max(cls._next_id, unit_id + 1)
+        return unit_id
+    
     def _generate_base_stats(self) -> Dict[str, int]:
         """Generate base stats with random variation."""
         stats = UNIT_STATS[self.unit_type]
@@ -191,11 +203,13 @@ class Unit:
     def to_dict(self) -> dict:
         """Convert unit to a dictionary for saving."""
         return {
+            'id': self.id,
             'unit_type': self.unit_type.value,
             'level': self.level,
             'experience': self.experience,
             'kills': self.kills,
             'battles': self.battles,
+            'damage_dealt': self.damage_dealt,
             'abilities': self.abilities,
             'future_points': self.future_points,
             'base_stats': self.base_stats,
@@ -206,11 +220,13 @@ class Unit:
     def from_dict(cls, data: dict) -> 'Unit':
         """Create a Unit instance from a dictionary."""
         return cls(
+            id=data.get('id'),
             unit_type=data['unit_type'],
             level=data['level'],
             experience=data['experience'],
             kills=data['kills'],
             battles=data['battles'],
+            damage_dealt=data.get('damage_dealt', 0),
             abilities=data['abilities'],
             future_points=data['future_points'],
             base_stats=data['base_stats'],
@@ -1,10 +1,78 @@
+import os
 from enum import Enum
 
 # Game constants
 GRID_SIZE = 100  # 100x100 grid
 CELL_SIZE = 8    # Size of each cell in pixels
 SCREEN_SIZE = GRID_SIZE * CELL_SIZE
-FPS = 60
+FPS = 60         # Frame rate while active
+IDLE_FPS = 4     # Frame rate once nothing has happened for IDLE_AFTER seconds
+IDLE_AFTER = 2.0
+
+# Simulation ticks per second: queued commands are applied at this rate, independently of rendering
+SIM_TICK_RATE = 30
+
+# Camera / level-of-detail
+ZOOM_LEVELS = [1, 2, 3, 4, 6, 8, 12, 16, 24, 32]  # Cell sizes in pixels
+LOD_DETAIL_MIN_CELL = 8   # Per-unit circles, levels and HP bars from this cell size up
+LOD_MARKER_MIN_CELL = 4   # One marker per squad from this cell size up, heat cells below
+HEAT_CELL_SIZE = 5        # Grid cells per side of an aggregated heat cell
+
+# Terrain: movement cost to enter a cell and defense bonus for squads standing on it
+IMPASSABLE_COST = 99
+TERRAIN_TYPES = {
+    'plains': {'name': 'Plains', 'movement_cost': 1, 'defense_bonus': 0.0, 'color': (40, 60, 35)},
+    'forest': {'name': 'Forest', 'movement_cost': 2, 'defense_bonus': 0.2, 'color': (25, 70, 30)},
+    'hills': {'name': 'Hills', 'movement_cost': 3, 'defense_bonus': 0.3, 'color': (90, 80, 50)},
+    'mountains': {'name': 'Mountains', 'movement_cost': 5, 'defense_bonus': 0.5, 'color': (110, 105, 100)},
+    'water': {'name': 'Water', 'movement_cost': IMPASSABLE_COST, 'defense_bonus': 0.0, 'color': (30, 50, 110)}
+}
+DEFAULT_TERRAIN = 'plains'
+
+# Pathfinding
+FLOW_FIELD_MIN_SQUADS = 3    # Squads sharing a destination before a shared flow field is used
+FLOW_FIELD_OCCUPIED_COST = 5  # Extra cost of passing through an occupied cell in a flow field
+
+# Fog of war: every living unit sees SIGHT_RANGE cells, ranged units as far as they shoot past that
+SIGHT_RANGE = 6
+
+# Local game server
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8765
+SERVER_TICK_RATE = 20             # Delta broadcasts per second
+SERVER_MAX_CLIENT_BUFFER = 1 << 20  # Unsent bytes before a slow client is resynced with a snapshot
+
+# Undo history: steps kept, and approximate memory they may hold
+UNDO_LIMIT = 200
+UNDO_MEMORY_LIMIT = 32 * 1024 * 1024
+
+# Balance tools: simulated battles alternate attacks until a squad is wiped out or this many rounds pass
+BATTLE_MAX_ROUNDS = 20
+
+# Turn pipeline: HP every living unit regenerates at the end of a turn, turns between
+# autosaves (0 disables them), where they are written (a directory of its own, so running
+# the game or a tool doesn't drop saves into the working tree; OPUSBATTLE_AUTOSAVE
+# overrides it) and the turn time above which per-phase timings are printed
+HEAL_PER_TURN = 1
+AUTOSAVE_INTERVAL = 5
+AUTOSAVE_FILE = os.environ.get('OPUSBATTLE_AUTOSAVE', os.path.join('saves', 'autosave.json'))
+TURN_REPORT_THRESHOLD = 0.1
+
+# Units listed per statistics leaderboard and turn snapshots kept for export
+LEADERBOARD_SIZE = 10
+STATISTICS_HISTORY = 1000
+
+# Unit index: HP ratio buckets (of equal width) that wounded-unit queries are answered from
+HP_BUCKETS = 20
+
+# Memory report: traceback frames kept per allocation while tracing, lines listed per report
+# and consecutive turns an allocation site must grow for to be flagged as a possible leak
+MEMORY_TRACE_FRAMES = 1
+MEMORY_REPORT_TOP = 10
+MEMORY_LEAK_TURNS = 3
+
+# Queued battles are resolved in worker processes once a turn has at least this many
+BATTLE_PARALLEL_MIN = 256
 
 # Colors
 WHITE = (255, 255, 255)